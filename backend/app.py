@@ -12,10 +12,25 @@ from routes.meal_nutrition import meal_nutrition_bp
 from routes.recommended_meal import recommended_meal_bp
 from routes.user import user_bp  # 사용자 라우트 추가
 from routes.orders import orders_bp  # 주문 라우트 추가
+from routes.monitoring import monitoring_bp  # 모니터링 라우트 추가
+from routes.food_diary import food_diary_bp  # 식단일지 라우트 추가
 from config import test_db_connection
+from utils.db_pool import close_all_pools
+from services.allergen_index import index_all_allergen_masks
+from services.recipe_product_links import start_recipe_link_refresh
+from utils.logger import get_logger, init_request_logging
+from utils.request_metrics import init_request_metrics
+import atexit
+
+logger = get_logger('app')
 
 app = Flask(__name__)
 
+# 요청별 상관관계 ID(X-Request-ID)와 큐 기반 로깅 설정
+init_request_logging(app)
+# 요청별 처리 시간 / SQL 계측 (/api/monitoring/metrics)
+init_request_metrics(app)
+
 # CORS 설정 개선
 CORS(app, 
      resources={r"/api/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}}, 
@@ -36,16 +51,30 @@ app.register_blueprint(meal_nutrition_bp)
 app.register_blueprint(recommended_meal_bp)
 app.register_blueprint(user_bp)  # 사용자 라우트 등록
 app.register_blueprint(orders_bp)  # 주문 라우트 등록
+app.register_blueprint(monitoring_bp)  # 모니터링 라우트 등록
+app.register_blueprint(food_diary_bp)  # 식단일지 라우트 등록
+
+# 프로세스 종료 시 풀에 남은 연결 정리
+atexit.register(close_all_pools)
+
+# 레시피-관련 상품 연결을 백그라운드에서 증분 갱신 (WSGI 서버로 실행해도 동작하도록 모듈 로드 시 시작)
+start_recipe_link_refresh()
 
 if __name__ == '__main__':
-    print("서버 시작 중...")
+    logger.info("서버 시작 중...")
     
     # 데이터베이스 연결 테스트
     db_conn_success = test_db_connection()
     if db_conn_success:
-        print("데이터베이스 연결 확인됨. 서버를 시작합니다.")
+        logger.info("데이터베이스 연결 확인됨. 서버를 시작합니다.")
     else:
-        print("경고: 데이터베이스 연결에 실패했지만 서버를 시작합니다.")
-        print("실제 요청 시 데이터베이스 오류가 발생할 수 있습니다.")
+        logger.warning("데이터베이스 연결에 실패했지만 서버를 시작합니다. 실제 요청 시 데이터베이스 오류가 발생할 수 있습니다.")
+
+    # 새로 추가/수정된 상품의 알레르기 마스크 증분 색인
+    if db_conn_success:
+        try:
+            logger.info(f"알레르기 마스크 색인: {index_all_allergen_masks()}")
+        except Exception as e:
+            logger.warning(f"알레르기 마스크 색인 실패 (색인되지 않은 상품은 LIKE 조건으로 필터링됩니다): {e}")
     
     app.run(debug=True, port=5000)
@@ -0,0 +1,81 @@
+# 알레르기 필터 마이크로 벤치마크
+# 합성 카탈로그(기본 5만 행)에서 다음 방식의 소요 시간을 비교:
+#   1) 기존 SQL LIKE 필터 (generate_recipe_allergy_filter_sql, SQLite 인메모리 DB에서 실행)
+#   2) 동의어마다 `in` 으로 검사하는 단순 Python 필터
+#   3) Aho-Corasick 매처로 행별 마스크 계산 (색인/스냅샷 로드 시 1회 비용)
+#   4) 미리 계산된 마스크로 비트 연산 필터 (요청당 비용)
+#
+# 실행: python -m benchmarks.allergen_matcher [행 수]
+import random
+import sqlite3
+import sys
+import time
+from utils.allergy import (
+    allergy_synonyms,
+    allergy_id_name_map,
+    allergy_ids_to_mask,
+    generate_recipe_allergy_filter_sql
+)
+from utils.allergy_matcher import build_allergen_matcher
+
+_PLAIN_WORDS = ["배추", "감자", "양파", "당근", "마늘", "대파", "소금", "설탕", "참기름", "시금치",
+                "애호박", "무", "고추장", "식초", "깨", "버섯", "연근", "우엉", "김", "미역"]
+
+
+def make_catalog(n, seed=42):
+    rng = random.Random(seed)
+    synonyms = [w for words in allergy_synonyms.values() for w in words]
+    rows = []
+    for i in range(n):
+        materials = rng.sample(_PLAIN_WORDS, rng.randint(3, 8))
+        # 약 40%의 행에 알레르기 동의어를 1~2개 섞음
+        if rng.random() < 0.4:
+            materials += rng.sample(synonyms, rng.randint(1, 2))
+        rng.shuffle(materials)
+        name = f"{rng.choice(_PLAIN_WORDS)}{rng.choice(['볶음', '무침', '조림', '국', '구이'])}"
+        rows.append((f"FD{i}", name, ", ".join(f"{m} {rng.randint(1, 300)}g" for m in materials)))
+    return rows
+
+
+def naive_filter(rows, allergy_ids):
+    words = [w.lower() for aid in allergy_ids for w in allergy_synonyms[allergy_id_name_map[aid]]]
+    return [r for r in rows if not any(w in r[1].lower() or w in r[2].lower() for w in words)]
+
+
+def timed(label, fn, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<42} {best * 1000:9.1f} ms")
+    return result
+
+
+def main(n=50000):
+    rows = make_catalog(n)
+    allergy_ids = [1, 10, 14, 17]  # 난류, 우유, 대두, 밀
+    print(f"합성 카탈로그 {n}행, 알레르기 {allergy_ids}")
+
+    db = sqlite3.connect(':memory:')
+    db.execute("CREATE TABLE food (Food_id TEXT PRIMARY KEY, Food_name TEXT, Food_materials TEXT)")
+    db.executemany("INSERT INTO food VALUES (?, ?, ?)", rows)
+    like_sql = f"SELECT Food_id FROM food r WHERE {generate_recipe_allergy_filter_sql(allergy_ids)}"
+
+    sql_ids = timed("SQL LIKE (SQLite, 요청당)", lambda: [r[0] for r in db.execute(like_sql)])
+    naive_ids = timed("Python `in` 동의어 검사 (요청당)", lambda: [r[0] for r in naive_filter(rows, allergy_ids)])
+
+    matcher = timed("Aho-Corasick 컴파일 (프로세스당 1회)", build_allergen_matcher)
+    masks = timed("Aho-Corasick 마스크 계산 (로드 시 1회)",
+                  lambda: [(r[0], matcher.match_mask(r[1], r[2])) for r in rows])
+    user_mask = allergy_ids_to_mask(allergy_ids)
+    mask_ids = timed("마스크 비트 연산 필터 (요청당)",
+                     lambda: [fid for fid, m in masks if m & user_mask == 0])
+
+    assert sql_ids == naive_ids == mask_ids, "필터 결과가 서로 다릅니다"
+    print(f"  남은 행: {len(mask_ids)} / {n} (세 방식 결과 동일)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
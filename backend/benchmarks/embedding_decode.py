@@ -0,0 +1,48 @@
+# 임베딩 로딩 마이크로 벤치마크
+# 합성 임베딩(기본 3000개 x 768차원)을 다음 방식으로 디코딩하는 시간을 비교:
+#   1) 기존 텍스트 파싱 (np.fromstring(..., sep=','), 음식마다 작은 배열)
+#   2) 텍스트 split 파싱 (parse_embedding)
+#   3) 바이너리 blob (float32/float16)을 이어붙여 np.frombuffer 한 번으로 연속 행렬 생성
+#
+# 실행: python -m benchmarks.embedding_decode [개수] [차원]
+import sys
+import time
+import warnings
+import numpy as np
+from models.food_embedding import parse_embedding, encode_embedding, _build_matrix
+
+
+def timed(label, fn, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<36} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 768
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    texts = [','.join(f"{x:.6f}" for x in v) for v in vectors]
+    print(f"임베딩 {n}개 x {dim}차원, 텍스트 {sum(map(len, texts)) / 1e6:.1f}MB")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        timed("np.fromstring (기존)", lambda: {i: np.fromstring(t, sep=',') for i, t in enumerate(texts)})
+    timed("parse_embedding (텍스트)", lambda: {i: parse_embedding(t) for i, t in enumerate(texts)})
+
+    for dtype in ('f4', 'f2'):
+        rows = [(i, dtype, dim, encode_embedding(v, dtype), None) for i, v in enumerate(vectors)]
+        size = sum(len(r[3]) for r in rows) / 1e6
+        matrix = timed(f"np.frombuffer 연속 행렬 ({dtype}, {size:.1f}MB)", lambda: _build_matrix(rows))
+        err = float(np.abs(matrix.matrix - vectors).max())
+        print(f"  {'':<36} 최대 오차 {err:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# 식단 조합 최적화 벤치마크
+# 합성 카탈로그에서 무작위 탐색(기존 50개, 벡터화 4096개)과 MealOptimizer(시간 예산별)의
+# 목표 영양소 대비 가중 편차 점수와 소요 시간을 비교 (점수는 낮을수록 좋음)
+#
+# 실행: python -m benchmarks.meal_optimizer [음식 수] [반복 횟수]
+import sys
+import time
+import numpy as np
+from services.meal_scoring import ComboScorer, NUTRIENT_KEYS
+from services.meal_optimizer import optimize_meal, relative_weights
+
+_ROLES = ['밥', '국&찌개', '반찬', '반찬', '반찬', '일품', '후식']
+# 역할별 1인분 영양소 평균 (칼로리, 탄수화물, 단백질, 지방, 나트륨)
+_ROLE_MEANS = {
+    '밥': (300, 65, 6, 2, 10),
+    '국&찌개': (120, 10, 8, 5, 700),
+    '반찬': (90, 8, 5, 4, 300),
+    '일품': (450, 55, 20, 15, 900),
+    '후식': (150, 25, 2, 5, 40),
+}
+
+
+def make_catalog(n, seed=7, dim=64):
+    rng = np.random.default_rng(seed)
+    foods, nutrition, embeddings = [], {}, {}
+    for i in range(n):
+        role = _ROLES[i % len(_ROLES)]
+        fid = f"FD{i}"
+        foods.append({'Food_id': fid, 'Food_role': role})
+        values = np.array(_ROLE_MEANS[role]) * rng.lognormal(0, 0.45, 5)
+        nutrition[fid] = dict(zip(NUTRIENT_KEYS, values.tolist()))
+        embeddings[fid] = rng.normal(size=dim)
+    return foods, nutrition, embeddings
+
+
+def run(label, fn, scorer, target_vec, weight_vec, repeat):
+    scores, times = [], []
+    for r in range(repeat):
+        rng = np.random.default_rng(r)
+        start = time.perf_counter()
+        picked, _, _ = fn(rng)
+        times.append(time.perf_counter() - start)
+        index = {fid: i for i, fid in enumerate(scorer.food_ids)}
+        combo = np.array([[index[f['Food_id']] if f else -1 for f in picked]])
+        scores.append(float(scorer.score_array(combo, target_vec, weight_vec)[0][0]))
+    print(f"  {label:<28} 점수 평균 {np.mean(scores):8.4f}  최저 {np.min(scores):8.4f}  "
+          f"소요 p50 {np.median(times) * 1000:7.2f} ms")
+
+
+def main(n=3000, repeat=20):
+    foods, nutrition, embeddings = make_catalog(n)
+    # 6가지 음식 합계 목표 (실제 서비스는 recommended_meal_target(age)로 계산)
+    target = {'calories': 1400, 'carbohydrate': 200, 'protein': 25, 'fat': 40, 'sodium': 1000}
+    weights = relative_weights(target)
+    prev = [foods[i]['Food_id'] for i in range(0, 42, 7)]
+    scorer = ComboScorer(foods, nutrition, embeddings, prev)
+    target_vec = np.array([target[k] for k in NUTRIENT_KEYS])
+    weight_vec = np.array([weights[k] for k in NUTRIENT_KEYS])
+
+    print(f"합성 카탈로그 {n}개, 반복 {repeat}회, 목표 {target}")
+    run("무작위 50개 (기존)", lambda rng: scorer.best_combo(target, 50, rng, weights),
+        scorer, target_vec, weight_vec, repeat)
+    run("무작위 4096개 (벡터화)", lambda rng: scorer.best_combo(target, 4096, rng, weights),
+        scorer, target_vec, weight_vec, repeat)
+    for budget in (0.005, 0.02, 0.05, 0.2):
+        run(f"최적화 (예산 {budget * 1000:.0f} ms)",
+            lambda rng, b=budget: optimize_meal(scorer, target, weights, time_budget=b, rng=rng),
+            scorer, target_vec, weight_vec, repeat)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,88 @@
+# 여러 날짜 식단 계획 벤치마크
+# 합성 카탈로그에서 30일 식단을 다음 방식으로 만들고 품질과 소요 시간을 비교:
+#   1) 날마다 독립적으로 무작위 선택 (기존 generate_daily_meal 방식)
+#   2) 날마다 독립적으로 MealOptimizer 실행 (하루 5 ms)
+#   3) VarietyPlanner로 30일 전체를 한 번에 최적화
+# 지표: 7일 이내 중복 음식 수, 주간 영양소 편차(가중, 낮을수록 좋음), 전날 같은 역할 음식과의 평균 유사도
+#
+# 실행: python -m benchmarks.meal_variety [음식 수] [일수]
+import random
+import sys
+import time
+import numpy as np
+from benchmarks.meal_optimizer import make_catalog
+from services.meal_scoring import ComboScorer, MEAL_SLOTS, NUTRIENT_KEYS, build_embedding_matrix
+from services.meal_optimizer import optimize_meal, relative_weights
+from services.meal_plan import group_foods_by_role, pick_daily_foods, MEAL_FOOD_COLUMNS
+from services.meal_variety import plan_variety, PLAN_BLOCK_DAYS
+
+
+def evaluate(plan, scorer, vectors, target_vec, weight_vec, window=7):
+    index = {fid: i for i, fid in enumerate(scorer.food_ids)}
+    rows = np.array([[index[f['Food_id']] if f else -1 for f in day] for day in plan])
+    repeats = 0
+    for d in range(len(rows)):
+        recent = set(rows[max(0, d - window + 1):d].ravel().tolist())
+        today = [i for i in rows[d] if i >= 0]
+        repeats += sum(1 for i in today if i in recent) + len(today) - len(set(today))
+
+    totals = np.array([scorer.nutrition[r[r >= 0]].sum(axis=0) for r in rows])
+    block_dev = []
+    for start in range(0, len(rows), PLAN_BLOCK_DAYS):
+        block = totals[start:start + PLAN_BLOCK_DAYS]
+        block_dev.append(float((np.abs(block.sum(axis=0) - len(block) * target_vec) * weight_vec).sum() / len(block)))
+
+    sims = []
+    for d in range(1, len(rows)):
+        for s, role in enumerate(MEAL_SLOTS):
+            prev = [rows[d - 1, t] for t, r in enumerate(MEAL_SLOTS) if r == role and rows[d - 1, t] >= 0]
+            if rows[d, s] >= 0 and prev:
+                sims.append(float((vectors[prev] @ vectors[rows[d, s]]).max()))
+    return repeats, float(np.mean(block_dev)), float(np.mean(sims))
+
+
+def report(label, make_plan, scorer, vectors, target_vec, weight_vec, repeat=5):
+    results, times = [], []
+    for r in range(repeat):
+        started = time.perf_counter()
+        plan = make_plan(r)
+        times.append(time.perf_counter() - started)
+        results.append(evaluate(plan, scorer, vectors, target_vec, weight_vec))
+    repeats, dev, sim = np.mean(results, axis=0)
+    print(f"  {label:<30} 중복 {repeats:6.1f}  주간 편차 {dev:7.4f}  전날 유사도 {sim:6.3f}  "
+          f"소요 {np.median(times) * 1000:8.1f} ms")
+
+
+def main(n=3000, days=30):
+    foods, nutrition, embeddings = make_catalog(n)
+    target = {'calories': 1400, 'carbohydrate': 200, 'protein': 25, 'fat': 40, 'sodium': 1000}
+    weights = relative_weights(target)
+    scorer = ComboScorer(foods, nutrition, embeddings)
+    vectors = build_embedding_matrix(scorer.food_ids, embeddings)
+    target_vec = np.array([target[k] for k in NUTRIENT_KEYS])
+    weight_vec = np.array([weights[k] for k in NUTRIENT_KEYS])
+    by_role = group_foods_by_role(foods)
+    by_id = {f['Food_id']: f for f in foods}
+
+    def independent_random(seed):
+        rng = random.Random(seed)
+        days_picked = [pick_daily_foods(by_role, rng) for _ in range(days)]
+        return [[by_id.get(day[c]) for c in MEAL_FOOD_COLUMNS] for day in days_picked]
+
+    def independent_optimizer(seed):
+        rng = np.random.default_rng(seed)
+        return [optimize_meal(scorer, target, weights, time_budget=0.005, rng=rng)[0] for _ in range(days)]
+
+    print(f"합성 카탈로그 {n}개, {days}일 식단, 목표(하루) {target}")
+    report("날마다 무작위 (기존)", independent_random, scorer, vectors, target_vec, weight_vec)
+    report("날마다 MealOptimizer 5 ms", independent_optimizer, scorer, vectors, target_vec, weight_vec)
+    for budget in (0.05, 0.2, 0.5):
+        report(f"VarietyPlanner (예산 {budget * 1000:.0f} ms)",
+               lambda seed, b=budget: plan_variety(scorer, target, days, weights, embeddings, time_budget=b,
+                                                   rng=np.random.default_rng(seed)),
+               scorer, vectors, target_vec, weight_vec)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
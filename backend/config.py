@@ -1,6 +1,8 @@
 import os
 from dotenv import load_dotenv
 import mysql.connector
+import pymysql
+from utils.db_pool import ConnectionPool, get_pool
 
 # .env 파일 로드
 load_dotenv()
@@ -30,8 +32,66 @@ LOCAL_DB_CONFIG = {
 # 사용할 DB 설정 (로컬 또는 원격)
 DB_CONFIG = REMOTE_DB_CONFIG  # 원격 DB 사용
 
+# 커넥션 풀 설정 (환경변수로 조정 가능)
+DB_POOL_CONFIG = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # 연결 대기 최대 시간(초)
+    'recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))   # 연결 재생성 주기(초)
+}
+
+# 음식 카탈로그 스냅샷 갱신 주기(초)
+FOOD_CATALOG_TTL = int(os.environ.get('FOOD_CATALOG_TTL', 600))
+
+# 조회수 write-behind 설정 (services.view_counter)
+VIEW_COUNT_FLUSH_INTERVAL = float(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', 5))   # 모아 둔 조회수를 DB에 반영하는 주기(초), 0이면 즉시 반영
+VIEW_COUNT_MAX_PENDING = int(os.environ.get('VIEW_COUNT_MAX_PENDING', 1000))        # 대기 중인 항목이 이만큼 쌓이면 주기를 기다리지 않고 반영
+
+# 조회수 순위 캐시 설정 (services.popularity_ranking)
+RANKING_TOP_N = int(os.environ.get('RANKING_TOP_N', 2000))        # 메모리에 순위를 유지할 상위 항목 수 (그 뒤 페이지는 DB에서 조회)
+RANKING_TTL = int(os.environ.get('RANKING_TTL', 60))              # 순위를 DB/카탈로그에서 다시 읽는 주기(초)
+RANKING_FILTER_CACHE_SIZE = int(os.environ.get('RANKING_FILTER_CACHE_SIZE', 64))  # 알레르기 조합별 필터링 순위 LRU 크기
+
+# 상품 검색 색인 증분 갱신 주기(초) (services.product_search)
+PRODUCT_SEARCH_REFRESH = int(os.environ.get('PRODUCT_SEARCH_REFRESH', 300))
+
+# 레시피-관련 상품 연결 증분 갱신 주기(초) (services.recipe_product_links), 0이면 백그라운드 갱신 안 함
+RECIPE_LINK_REFRESH = int(os.environ.get('RECIPE_LINK_REFRESH', 300))
+
+# 상품 상세 응답 캐시 (services.product_detail)
+PRODUCT_DETAIL_CACHE_TTL = int(os.environ.get('PRODUCT_DETAIL_CACHE_TTL', 300))     # 캐시 유지 시간(초), 0이면 캐시하지 않음
+PRODUCT_DETAIL_CACHE_SIZE = int(os.environ.get('PRODUCT_DETAIL_CACHE_SIZE', 1000))  # 캐시할 최대 상품 수 (LRU)
+
+# 임베딩 로딩 방식: 'db'(food_embedding_blob 테이블) 또는 'mmap'(export한 .npy 파일을 워커 간 공유)
+EMBEDDING_SOURCE = os.environ.get('EMBEDDING_SOURCE', 'db').lower()
+EMBEDDING_MMAP_DIR = os.environ.get(
+    'EMBEDDING_MMAP_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'embeddings')
+)
+# 새 임베딩 파일 확인 주기(초)
+EMBEDDING_MMAP_CHECK_INTERVAL = float(os.environ.get('EMBEDDING_MMAP_CHECK_INTERVAL', 5))
+
+# 주간/월간 식단 생성 비동기 작업 설정
+MEAL_JOB_WORKERS = int(os.environ.get('MEAL_JOB_WORKERS', 2))            # 작업 스레드 수
+MEAL_JOB_STALE_SECONDS = int(os.environ.get('MEAL_JOB_STALE_SECONDS', 600))  # 이 시간 동안 갱신 없는 실행 중 작업은 중단된 것으로 봄
+
+# 로깅 설정 (utils.logger)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')                      # DEBUG / INFO / WARNING / ERROR
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()             # text / json
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))      # 상세(DEBUG) 로그 표본 비율
+
+# 요청/SQL 계측 설정 (utils.request_metrics)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))           # 이보다 느린 요청은 쿼리 목록과 함께 로그
+METRICS_SAMPLE_SIZE = int(os.environ.get('METRICS_SAMPLE_SIZE', 1024))    # 라우트별 백분위 계산에 쓰는 최근 요청 수
+# 모니터링 API 중 상태를 바꾸는 POST(캐시 무효화, 조회수 반영)를 호출할 수 있는 User_id 목록 (쉼표 구분, 비우면 모두 거부)
+MONITORING_ADMIN_USER_IDS = frozenset(
+    uid.strip() for uid in os.environ.get('MONITORING_ADMIN_USER_IDS', '').split(',') if uid.strip()
+)
+
 # JWT 설정
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-for-jwt')
+# 인증된 사용자 정보 캐시 유지 시간(초, 토큰 만료 시각을 넘지 않음). 0이면 매 요청마다 DB 조회
+AUTH_PRINCIPAL_CACHE_TTL = int(os.environ.get('AUTH_PRINCIPAL_CACHE_TTL', 60))
 
 # 이메일 설정
 EMAIL_CONFIG = {
@@ -69,8 +129,8 @@ SMTP_SETTINGS = {
     }
 }
 
-# 데이터베이스 연결 함수
-def get_db_connection():
+# mysql-connector 연결 생성 함수 (풀 내부에서만 사용)
+def _connect_mysql_connector():
     try:
         conn_params = {
             'host': DB_CONFIG['host'],
@@ -92,6 +152,44 @@ def get_db_connection():
         print(f"DB 연결 오류: {err}")
         raise
 
+def _reset_mysql_connector(conn):
+    # 읽지 않은 결과를 비우고 열린 트랜잭션을 정리해야 다음 사용자가 오래된 스냅샷을 보지 않음
+    if conn.unread_result:
+        conn.consume_results()
+    conn.rollback()
+
+# PyMySQL 연결 생성 함수 (풀 내부에서만 사용)
+def _connect_pymysql():
+    return pymysql.connect(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        database=DB_CONFIG['database'],
+        port=DB_CONFIG['port'],
+        charset=DB_CONFIG['charset'],
+        cursorclass=pymysql.cursors.DictCursor
+    )
+
+_DB_DRIVERS = {
+    # driver 이름: (연결 생성, 상태 확인, 반납 시 정리)
+    'mysql-connector': (_connect_mysql_connector, lambda conn: conn.is_connected(), _reset_mysql_connector),
+    'pymysql': (_connect_pymysql, lambda conn: conn.ping(reconnect=False), lambda conn: conn.rollback()),
+}
+
+# 데이터베이스 연결 함수
+def get_db_connection(driver='mysql-connector'):
+    """
+    공용 커넥션 풀에서 연결을 빌려 반환합니다.
+    - driver='mysql-connector': cursor(dictionary=True)를 사용하는 기존 코드용
+    - driver='pymysql': DictCursor가 기본인 PyMySQL 연결
+    반환된 연결의 close()는 실제로 연결을 끊지 않고 풀에 반납합니다.
+    """
+    connect, ping, reset = _DB_DRIVERS[driver]
+    pool = get_pool(driver, lambda: ConnectionPool(
+        driver, connect, ping=ping, reset=reset, **DB_POOL_CONFIG
+    ))
+    return pool.get_connection()
+
 # DB 연결 테스트 함수
 def test_db_connection():
     try:
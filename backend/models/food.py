@@ -1,4 +1,5 @@
-from config import get_db_connection
+import random
+from models.food_catalog import get_food_catalog
 
 class Food:
     def __init__(self, Food_id=None, Food_name=None, Food_role=None, Food_classification=None, Food_img=None, Food_materials=None, Food_Embedding=None):
@@ -10,44 +11,25 @@ class Food:
         self.Food_materials = Food_materials      # Food_materials
         self.Food_Embedding = Food_Embedding      # Food_Embedding
 
+    # 조회는 모두 프로세스 공용 카탈로그 스냅샷에서 처리 (DB 조회 없음)
     @staticmethod
     def get_all():
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Food")
-        foods = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return foods
+        return list(get_food_catalog().foods)
     
     @staticmethod
     def get_by_role(role):
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Food WHERE Food_role = %s", (role,))
-        foods = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return foods
+        return list(get_food_catalog().by_role.get(role, []))
     
     @staticmethod
     def get_random_by_role(role, limit=1):
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Food WHERE Food_role = %s ORDER BY RAND() LIMIT %s", (role, limit))
-        foods = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        candidates = get_food_catalog().by_role.get(role, [])
+        foods = random.sample(candidates, min(limit, len(candidates)))
         if limit == 1 and foods:
             return foods[0]
         return foods
         
     @staticmethod
     def get_by_id(food_id):
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Food WHERE Food_id = %s", (food_id,))
-        food = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return food 
\ No newline at end of file
+        food = get_food_catalog().get_food(food_id)
+        # 호출부에서 키를 추가해도 스냅샷이 바뀌지 않도록 복사본 반환
+        return dict(food) if food else None
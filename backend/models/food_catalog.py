@@ -0,0 +1,147 @@
+# 음식 카탈로그 스냅샷 모듈
+# Food + food_nutrition + 임베딩을 한 번에 읽어 프로세스 메모리에 보관하고,
+# 식단 생성/새로고침/레시피 목록이 매번 전체 테이블을 다시 읽지 않도록 공유
+import threading
+import time
+from config import get_db_connection, FOOD_CATALOG_TTL
+from models.food_embedding import load_embedding_matrix, get_shared_embeddings
+from utils.allergy import compute_allergen_mask
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+NUTRIENT_KEYS = ('calories', 'carbohydrate', 'protein', 'fat', 'sodium')
+
+
+class FoodCatalogSnapshot:
+    """
+    특정 시점의 음식 카탈로그 (읽기 전용).
+    - foods: 음식 행(dict) 리스트 (Food_Embedding 원문 제외, allergen_mask 포함)
+    - by_id / by_role: Food_id, Food_role 기준 인덱스
+    - nutrition: Food_id → 영양소 dict
+    - embeddings: 임베딩 행렬 (EmbeddingMatrix, Food_id → 행 번호 인덱스 포함)
+      EMBEDDING_SOURCE='mmap'이면 공유 파일의 최신 버전을 사용
+    """
+    def __init__(self, version, foods, nutrition, embeddings):
+        self.version = version
+        self.loaded_at = time.time()
+        self.foods = foods
+        self.nutrition = nutrition
+        self._embeddings = embeddings
+        self.by_id = {f['Food_id']: f for f in foods}
+        self.by_role = {}
+        for f in foods:
+            self.by_role.setdefault(f['Food_role'], []).append(f)
+
+    @property
+    def embeddings(self):
+        # mmap 모드에서는 새 파일이 export되면 스냅샷을 다시 읽지 않아도 바로 반영됨
+        shared = get_shared_embeddings()
+        if shared is not None:
+            return shared
+        if self._embeddings is None:
+            self._embeddings = load_embedding_matrix()
+        return self._embeddings
+
+    def get_food(self, food_id):
+        """
+        Food_id로 음식 행을 찾습니다.
+        SQL의 WHERE Food_id = %s 처럼 '123'과 123을 같은 값으로 취급합니다.
+        """
+        food = self.by_id.get(food_id)
+        if food is None and food_id is not None:
+            key = str(food_id)
+            food = self.by_id.get(key)
+            if food is None and key.isdigit():
+                food = self.by_id.get(int(key))
+        return food
+
+    def get_nutrition(self, food_id):
+        """영양소 정보가 없으면 get_nutrition_by_food_id와 같이 0으로 채운 dict를 반환합니다."""
+        n = self.nutrition.get(food_id)
+        return dict(n) if n else {k: 0 for k in NUTRIENT_KEYS}
+
+
+_snapshot = None
+_version = 0
+_stale = False
+_load_lock = threading.Lock()
+
+
+def _load_snapshot(version):
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT f.Food_id, f.Food_name, f.Food_role, f.Food_classification,
+                   f.Food_img, f.Food_materials, f.view_count,
+                   n.Food_id AS nutrition_food_id,
+                   n.calories, n.carbohydrate, n.protein, n.fat, n.sodium
+            FROM Food f
+            LEFT JOIN food_nutrition n ON n.Food_id = f.Food_id
+        """)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    # 임베딩은 바이너리 테이블에서 하나의 연속 행렬로 읽음 (공유 mmap 파일이 있으면 DB에서 읽지 않음)
+    embeddings = None if get_shared_embeddings() is not None else load_embedding_matrix()
+
+    foods = []
+    nutrition = {}
+    for row in rows:
+        food_id = row['Food_id']
+        if row['nutrition_food_id'] is not None:
+            nutrition[food_id] = {k: row[k] for k in NUTRIENT_KEYS}
+        foods.append({
+            'Food_id': food_id,
+            'Food_name': row['Food_name'],
+            'Food_role': row['Food_role'],
+            'Food_classification': row['Food_classification'],
+            'Food_img': row['Food_img'],
+            'Food_materials': row['Food_materials'],
+            'view_count': row['view_count'] or 0,
+            # 알레르기 필터를 비트 연산 한 번으로 처리하기 위한 마스크
+            'allergen_mask': compute_allergen_mask(row['Food_name'], row['Food_materials']),
+        })
+    return FoodCatalogSnapshot(version, foods, nutrition, embeddings)
+
+
+def get_food_catalog():
+    """
+    현재 음식 카탈로그 스냅샷을 반환합니다.
+    TTL이 지났거나 무효화된 경우 다시 읽으며, 다른 스레드가 갱신 중이면 기존 스냅샷을 그대로 사용합니다.
+    """
+    global _snapshot, _version, _stale
+    snapshot = _snapshot
+    if snapshot is not None and not _stale and time.time() - snapshot.loaded_at < FOOD_CATALOG_TTL:
+        return snapshot
+
+    # 기존 스냅샷이 있으면 갱신을 기다리지 않음
+    if not _load_lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        # 락을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있음
+        if _snapshot is not None and _snapshot is not snapshot:
+            return _snapshot
+        _stale = False
+        _version += 1
+        _snapshot = _load_snapshot(_version)
+        logger.info(f"스냅샷 v{_version} 로드: 음식 {len(_snapshot.foods)}개")
+        return _snapshot
+    except Exception as e:
+        _stale = True
+        if snapshot is not None:
+            # DB 오류 시 기존 스냅샷으로 계속 서비스
+            logger.warning(f"스냅샷 갱신 실패, v{snapshot.version} 유지: {e}")
+            return snapshot
+        raise
+    finally:
+        _load_lock.release()
+
+
+def invalidate_food_catalog():
+    """음식/영양소 데이터가 바뀌었을 때 호출하면 다음 조회 시 스냅샷을 다시 읽습니다."""
+    global _stale
+    _stale = True
@@ -1,34 +1,330 @@
+import json
+import os
+import threading
+import time
 import numpy as np
-from typing import List, Dict
-from config import get_db_connection
+from typing import List, Dict, Optional
+from config import get_db_connection, EMBEDDING_SOURCE, EMBEDDING_MMAP_DIR, EMBEDDING_MMAP_CHECK_INTERVAL
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Binary embedding storage: little-endian float blobs in the food_embedding_blob side table.
+# Food.Food_Embedding (comma-separated text) stays the source of truth;
+# services.embedding_migration converts it.
+EMBEDDING_DTYPES = {'f4': np.dtype('<f4'), 'f2': np.dtype('<f2')}
+DEFAULT_EMBEDDING_DTYPE = 'f4'
+
+_table_ready = False
+
+
+def ensure_embedding_table():
+    """Create the food_embedding_blob side table if it does not exist (once per process)."""
+    global _table_ready
+    if _table_ready:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `food_embedding_blob` (
+              `Food_id` VARCHAR(50) PRIMARY KEY,
+              `dtype` CHAR(2) NOT NULL,
+              `dim` SMALLINT UNSIGNED NOT NULL,
+              `embedding` MEDIUMBLOB NOT NULL,
+              `source_hash` CHAR(32) NOT NULL,
+              `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        conn.commit()
+        _table_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def parse_embedding(emb_str) -> Optional[np.ndarray]:
+    """Parse a comma-separated embedding string into a float32 vector (None if empty/invalid)."""
+    if not emb_str:
+        return None
+    try:
+        vec = np.array(emb_str.strip().strip('[]').split(','), dtype=np.float32)
+    except (ValueError, AttributeError):
+        return None
+    return vec if vec.size else None
+
+
+def encode_embedding(vec, dtype: str = DEFAULT_EMBEDDING_DTYPE) -> bytes:
+    """Encode a vector as a little-endian float blob ('f4' = float32, 'f2' = float16)."""
+    return np.asarray(vec, dtype=EMBEDDING_DTYPES[dtype]).tobytes()
+
+
+def decode_embedding(blob, dtype: str = DEFAULT_EMBEDDING_DTYPE) -> Optional[np.ndarray]:
+    """Decode a blob without copying (read-only view over the bytes)."""
+    if not blob:
+        return None
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPES[dtype])
+
+
+class EmbeddingMatrix:
+    """
+    All embeddings as one contiguous (N x D) float32 matrix plus a Food_id -> row index.
+
+    Supports the read-only mapping operations the scorers use (`in`, get, len), and
+    take(ids) to gather many rows with a single fancy-index instead of per-id lookups.
+    """
+
+    def __init__(self, ids: List, matrix: np.ndarray):
+        self.ids = list(ids)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.matrix.setflags(write=False)
+        self.index = {fid: i for i, fid in enumerate(self.ids)}
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, food_id):
+        return food_id in self.index
+
+    def get(self, food_id, default=None):
+        row = self.index.get(food_id)
+        return self.matrix[row] if row is not None else default
+
+    def rows(self, food_ids: List) -> np.ndarray:
+        """Row number per id (-1 for ids without an embedding)."""
+        index = self.index
+        return np.fromiter((index.get(fid, -1) for fid in food_ids), dtype=np.int64, count=len(food_ids))
+
+    def take(self, food_ids: List) -> np.ndarray:
+        """(len(food_ids) x D) matrix in the given order; missing ids become zero rows."""
+        rows = self.rows(food_ids)
+        out = self.matrix[np.where(rows >= 0, rows, 0)] if len(self.ids) else \
+            np.zeros((len(food_ids), self.dim), dtype=np.float32)
+        out[rows < 0] = 0
+        return out
+
+    def to_dict(self) -> Dict:
+        return {fid: self.matrix[i] for i, fid in enumerate(self.ids)}
+
+
+def _build_matrix(rows) -> EmbeddingMatrix:
+    """
+    Build an EmbeddingMatrix from (Food_id, dtype, dim, blob, text) rows.
+    Blobs are joined and decoded with one np.frombuffer call per dtype;
+    rows that only have the text column (not migrated yet) are parsed individually.
+    """
+    blob_groups: Dict[tuple, list] = {}
+    for food_id, dtype, dim, blob, _ in rows:
+        if blob and dtype in EMBEDDING_DTYPES and dim and len(blob) == dim * EMBEDDING_DTYPES[dtype].itemsize:
+            blob_groups.setdefault((dtype, dim), []).append((food_id, blob))
+
+    dim = 0
+    ids: List = []
+    parts: List[np.ndarray] = []
+    if blob_groups:
+        # The dimension with the most rows wins; each dtype of that dimension is decoded in one call
+        dim_counts: Dict[int, int] = {}
+        for (_, group_dim), group in blob_groups.items():
+            dim_counts[group_dim] = dim_counts.get(group_dim, 0) + len(group)
+        dim = max(dim_counts, key=dim_counts.get)
+        for (dtype, group_dim), group in blob_groups.items():
+            if group_dim != dim:
+                continue
+            ids.extend(fid for fid, _ in group)
+            decoded = np.frombuffer(b''.join(blob for _, blob in group), dtype=EMBEDDING_DTYPES[dtype])
+            parts.append(decoded.reshape(len(group), dim).astype(np.float32, copy=False))
+
+    seen = set(ids)
+    fallback_ids, fallback_vecs = [], []
+    for food_id, _, _, _, text in rows:
+        if food_id in seen:
+            continue
+        vec = parse_embedding(text)
+        if vec is None:
+            continue
+        if not dim:
+            dim = len(vec)
+        if len(vec) == dim:
+            fallback_ids.append(food_id)
+            fallback_vecs.append(vec)
+            seen.add(food_id)
+    if fallback_vecs:
+        ids.extend(fallback_ids)
+        parts.append(np.vstack(fallback_vecs))
+
+    matrix = np.concatenate(parts).astype(np.float32, copy=False) if parts else np.zeros((0, dim), np.float32)
+    return EmbeddingMatrix(ids, matrix)
+
+
+def load_embedding_matrix(food_ids: Optional[List] = None) -> EmbeddingMatrix:
+    """
+    Load embeddings (all foods, or only food_ids) as one EmbeddingMatrix.
+    Binary blobs are used where migrated; the text column is read only for rows without a blob.
+    """
+    ensure_embedding_table()
+    sql = """
+        SELECT f.Food_id, b.dtype, b.dim, b.embedding,
+               CASE WHEN b.Food_id IS NULL THEN f.Food_Embedding END AS Food_Embedding
+        FROM Food f
+        LEFT JOIN food_embedding_blob b ON b.Food_id = f.Food_id
+    """
+    params: tuple = ()
+    if food_ids is not None:
+        unique_ids = list(dict.fromkeys([fid for fid in food_ids if fid is not None]))
+        if not unique_ids:
+            return EmbeddingMatrix([], np.zeros((0, 0), np.float32))
+        sql += f" WHERE f.Food_id IN ({','.join(['%s'] * len(unique_ids))})"
+        params = tuple(unique_ids)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    return _build_matrix(rows)
 
 
 def get_embeddings(food_ids: List[int]) -> Dict[int, np.ndarray]:
     """Return a mapping of food_id to embedding vector for given IDs."""
     if not food_ids:
         return {}
-    # Remove duplicates to reduce query size
-    unique_ids = list(dict.fromkeys([fid for fid in food_ids if fid is not None]))
-    if not unique_ids:
-        return {}
+    return load_embedding_matrix(food_ids).to_dict()
 
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    format_strings = ','.join(['%s'] * len(unique_ids))
-    cursor.execute(
-        f"SELECT Food_id, Food_Embedding FROM Food WHERE Food_id IN ({format_strings})",
-        tuple(unique_ids)
-    )
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-
-    embeddings: Dict[int, np.ndarray] = {}
-    for row in rows:
-        emb_str = row.get('Food_Embedding') or ''
+
+# =========================
+# Memory-mapped embedding file (shared page cache across worker processes)
+# =========================
+# Layout in EMBEDDING_MMAP_DIR:
+#   food_embeddings-<version>.npy       (N x D) float32 matrix
+#   food_embeddings-<version>.ids.json  Food_id list in row order
+#   CURRENT                             {"version": ...}, replaced atomically after both files exist
+_CURRENT_FILE = 'CURRENT'
+_KEEP_VERSIONS = 2
+
+
+def _version_paths(directory: str, version: str):
+    base = os.path.join(directory, f'food_embeddings-{version}')
+    return base + '.npy', base + '.ids.json'
+
+
+def export_embedding_file(matrix: EmbeddingMatrix, directory: str = EMBEDDING_MMAP_DIR) -> str:
+    """
+    Write matrix as a new file version and point CURRENT at it; returns the version.
+    Older versions beyond the last _KEEP_VERSIONS are removed (workers that still map
+    them keep their pages until they reload).
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    version = time.strftime('%Y%m%d%H%M%S', time.localtime(now)) + f'{int(now * 1000) % 1000:03d}-{os.getpid()}'
+    npy_path, ids_path = _version_paths(directory, version)
+
+    np.save(npy_path + '.tmp.npy', np.ascontiguousarray(matrix.matrix, dtype='<f4'))
+    os.replace(npy_path + '.tmp.npy', npy_path)
+    with open(ids_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(matrix.ids, f, ensure_ascii=False)
+    os.replace(ids_path + '.tmp', ids_path)
+
+    current_path = os.path.join(directory, _CURRENT_FILE)
+    with open(current_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'rows': len(matrix), 'dim': matrix.dim}, f)
+    os.replace(current_path + '.tmp', current_path)
+
+    versions = sorted(name[len('food_embeddings-'):-len('.npy')] for name in os.listdir(directory)
+                      if name.startswith('food_embeddings-') and name.endswith('.npy') and '.tmp' not in name)
+    for old in versions[:-_KEEP_VERSIONS]:
+        for path in _version_paths(directory, old):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return version
+
+
+class MmapEmbeddingStore:
+    """
+    Read-only np.memmap view of the exported embedding file.
+    current() re-reads CURRENT at most every check_interval seconds and maps the new
+    version when it changes; if the file is missing or broken the last mapping is kept.
+    """
+
+    def __init__(self, directory: str = EMBEDDING_MMAP_DIR, check_interval: float = EMBEDDING_MMAP_CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.version = None
+        self.matrix: Optional[EmbeddingMatrix] = None
+        self.reloads = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_version(self) -> Optional[str]:
         try:
-            vec = np.fromstring(emb_str, sep=',')
-            embeddings[row['Food_id']] = vec
-        except Exception:
-            continue
-    return embeddings
+            with open(os.path.join(self.directory, _CURRENT_FILE), encoding='utf-8') as f:
+                return json.load(f).get('version')
+        except (OSError, ValueError):
+            return None
+
+    def _map(self, version: str) -> EmbeddingMatrix:
+        npy_path, ids_path = _version_paths(self.directory, version)
+        with open(ids_path, encoding='utf-8') as f:
+            ids = json.load(f)
+        matrix = np.load(npy_path, mmap_mode='r')
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f'embedding file {version}: {matrix.shape} rows vs {len(ids)} ids')
+        return EmbeddingMatrix(ids, matrix)
+
+    def current(self) -> Optional[EmbeddingMatrix]:
+        now = time.monotonic()
+        if self.matrix is not None and now - self._checked_at < self.check_interval:
+            return self.matrix
+        with self._lock:
+            if self.matrix is not None and now - self._checked_at < self.check_interval:
+                return self.matrix
+            self._checked_at = now
+            version = self._read_version()
+            if version and version != self.version:
+                try:
+                    self.matrix = self._map(version)
+                    self.version = version
+                    self.reloads += 1
+                    logger.info(f"임베딩 파일 {version} 매핑: {len(self.matrix)}개 x {self.matrix.dim}차원")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"임베딩 파일 {version} 매핑 실패, 기존 버전 유지: {e}")
+            return self.matrix
+
+    def stats(self) -> dict:
+        return {
+            'directory': self.directory,
+            'version': self.version,
+            'rows': len(self.matrix) if self.matrix is not None else 0,
+            'dim': self.matrix.dim if self.matrix is not None else 0,
+            'reloads': self.reloads,
+        }
+
+
+_mmap_store: Optional[MmapEmbeddingStore] = None
+
+
+def get_shared_embeddings() -> Optional[EmbeddingMatrix]:
+    """
+    EMBEDDING_SOURCE='mmap' mode: the current memory-mapped matrix (hot-reloaded).
+    Returns None in 'db' mode or when no file has been exported yet.
+    """
+    global _mmap_store
+    if EMBEDDING_SOURCE != 'mmap':
+        return None
+    if _mmap_store is None:
+        _mmap_store = MmapEmbeddingStore()
+    return _mmap_store.current()
+
+
+def get_mmap_store_stats() -> Optional[dict]:
+    return _mmap_store.stats() if _mmap_store is not None else None
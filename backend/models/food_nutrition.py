@@ -1,4 +1,8 @@
 from config import get_db_connection  # DB 연결 함수
+from models.food_catalog import get_food_catalog, invalidate_food_catalog, NUTRIENT_KEYS  # 카탈로그 스냅샷
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class FoodNutrition:
     """
@@ -38,6 +42,7 @@ class FoodNutrition:
                 self.sodium
             ))
             conn.commit()
+            invalidate_food_catalog()
         finally:
             cursor.close()
             conn.close()
@@ -68,6 +73,42 @@ class FoodNutrition:
         finally:
             conn.close()
 
+    @classmethod
+    def get_by_food_ids(cls, food_ids, external_cursor=None):
+        """
+        여러 food_id의 영양소 정보를 IN (...) 쿼리 한 번으로 조회해 {Food_id: FoodNutrition} dict로 반환합니다.
+        외부에서 cursor(dictionary=True)를 넘기면 그것을 사용합니다.
+        """
+        unique_ids = list(dict.fromkeys(fid for fid in food_ids if fid is not None))
+        if not unique_ids:
+            return {}
+
+        cursor = external_cursor
+        conn = None
+        if cursor is None:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+        try:
+            format_strings = ','.join(['%s'] * len(unique_ids))
+            cursor.execute(
+                f"SELECT * FROM food_nutrition WHERE Food_id IN ({format_strings})",
+                tuple(unique_ids)
+            )
+            rows = cursor.fetchall()
+        finally:
+            if conn is not None:
+                cursor.close()
+                conn.close()
+
+        return {row['Food_id']: FoodNutrition(
+            food_id=row['Food_id'],
+            calories=row['calories'],
+            carbohydrate=row['carbohydrate'],
+            protein=row['protein'],
+            fat=row['fat'],
+            sodium=row['sodium']
+        ) for row in rows}
+
     @staticmethod
     def delete_by_food_id(food_id):
         """
@@ -78,6 +119,7 @@ class FoodNutrition:
         try:
             cursor.execute("DELETE FROM food_nutrition WHERE Food_id = %s", (food_id,))
             conn.commit()
+            invalidate_food_catalog()
             return cursor.rowcount > 0
         finally:
             cursor.close()
@@ -104,24 +146,40 @@ class FoodNutrition:
         finally:
             conn.close()
 
+def get_nutrition_by_food_ids(food_ids, external_cursor=None):
+    """
+    여러 food_id의 영양소 정보를 {food_id: dict} 형태로 한 번에 반환합니다.
+    카탈로그 스냅샷의 영양소 테이블에서 먼저 찾고, 스냅샷에 없는 음식만 IN (...) 쿼리 한 번으로 조회합니다.
+    영양소 정보가 없는 음식은 0으로 채웁니다. (반환 dict의 키는 호출자가 넘긴 food_id 값 그대로)
+    """
+    result = {}
+    missing = []
+    try:
+        catalog = get_food_catalog()
+    except Exception as e:
+        logger.warning(f"카탈로그 스냅샷 조회 실패, DB에서 직접 조회: {e}")
+        catalog = None
+
+    for fid in food_ids:
+        if fid is None or fid in result:
+            continue
+        food = catalog.get_food(fid) if catalog else None
+        if food is not None:
+            result[fid] = catalog.get_nutrition(food['Food_id'])
+        else:
+            missing.append(fid)
+
+    if missing:
+        rows = FoodNutrition.get_by_food_ids(missing, external_cursor=external_cursor)
+        rows_by_key = {str(key): obj for key, obj in rows.items()}
+        for fid in missing:
+            obj = rows_by_key.get(str(fid))
+            result[fid] = {k: getattr(obj, k) for k in NUTRIENT_KEYS} if obj else {k: 0 for k in NUTRIENT_KEYS}
+    return result
+
 # 기존 함수 유지 (호환성 위해)
 def get_nutrition_by_food_id(food_id):
     """
     특정 food_id의 영양소 정보를 dict로 반환합니다.
     """
-    obj = FoodNutrition.get_by_food_id(food_id)
-    if obj is None:
-        return {
-            'calories': 0,
-            'carbohydrate': 0,
-            'protein': 0,
-            'fat': 0,
-            'sodium': 0
-        }
-    return {
-        'calories': obj.calories,
-        'carbohydrate': obj.carbohydrate,
-        'protein': obj.protein,
-        'fat': obj.fat,
-        'sodium': obj.sodium
-    }
+    return get_nutrition_by_food_ids([food_id]).get(food_id) or {k: 0 for k in NUTRIENT_KEYS}
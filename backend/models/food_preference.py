@@ -0,0 +1,292 @@
+# 사용자 음식 선호도 모델
+# 식단일지의 메뉴별 평점(rice_rating ~ dessert_rating)을 저장할 때마다 증분으로 반영:
+#   - 음식별 점수: (평점 - 3)의 합과 평가 횟수 (user_food_preference)
+#   - 취향 벡터: (평점 - 3) x 음식 임베딩(정규화)의 합 (user_taste_vector)
+# 식단 생성/새로고침은 get_user_preference()로 후보마다 O(1)에 점수를 조회
+import threading
+import time
+import numpy as np
+from config import get_db_connection
+from models.food_catalog import get_food_catalog
+from models.food_embedding import EmbeddingMatrix, encode_embedding, decode_embedding
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 식단일지 평점 컬럼 → Meal 음식 컬럼
+RATING_SLOTS = {
+    'rice_rating': 'Rice_id',
+    'soup_rating': 'Soup_id',
+    'side_dish1_rating': 'SideDish1_id',
+    'side_dish2_rating': 'SideDish2_id',
+    'main_dish_rating': 'MainDish_id',
+    'dessert_rating': 'Dessert_id',
+}
+NEUTRAL_RATING = 3          # 1~5점 중 중립 점수
+FOOD_SCORE_PRIOR = 2        # 평가가 적은 음식의 점수를 0 쪽으로 당기는 가상 평가 수
+TASTE_WEIGHT = 0.5          # 취향 벡터 점수의 반영 비율
+PREFERENCE_CACHE_TTL = 300  # 메모리 캐시 유지 시간(초)
+_CACHE_MAX_USERS = 10000
+
+_table_ready = False
+_cache = {}
+_cache_lock = threading.Lock()
+# User_id → [진행 중인 평점 반영 수, 커밋된 평점 반영 수] (_cache_lock 안에서만 읽고 씀)
+# DB에서 읽는 동안 반영이 진행 중이었거나 커밋된 모델은 변화량 포함 여부를 알 수 없으므로 캐시하지 않음
+_writes = {}
+
+
+def ensure_preference_tables():
+    """선호도 테이블이 없으면 생성합니다. (프로세스당 한 번만 실행)"""
+    global _table_ready
+    if _table_ready:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `user_food_preference` (
+              `User_id` INT NOT NULL,
+              `Food_id` VARCHAR(50) NOT NULL,
+              `rating_sum` DOUBLE NOT NULL DEFAULT 0,
+              `rating_count` INT NOT NULL DEFAULT 0,
+              `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+              PRIMARY KEY (`User_id`, `Food_id`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `user_taste_vector` (
+              `User_id` INT PRIMARY KEY,
+              `dim` SMALLINT UNSIGNED NOT NULL,
+              `vector` MEDIUMBLOB NOT NULL,
+              `weight_sum` DOUBLE NOT NULL DEFAULT 0,
+              `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        conn.commit()
+        _table_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _unit(vec):
+    norm = np.linalg.norm(vec) if vec is not None else 0
+    return vec / norm if norm else None
+
+
+class UserPreference:
+    """
+    한 사용자의 선호도 (읽기용).
+    - food_score(food_id): 음식별 점수, O(1)
+    - scores(food_ids, embeddings): 음식별 점수 + 취향 벡터와의 코사인 유사도를 한 번에 계산
+    점수는 0이 중립이며 높을수록 선호합니다.
+    """
+    def __init__(self, user_id, food_stats=None, taste=None, taste_weight=0.0):
+        self.user_id = user_id
+        self.food_stats = food_stats or {}   # Food_id → [rating_sum, rating_count]
+        self.taste = taste                    # (평점 - 3) x 정규화 임베딩의 합
+        self.taste_weight = taste_weight      # |평점 - 3|의 합
+        self.loaded_at = time.time()
+
+    def food_score(self, food_id):
+        stats = self.food_stats.get(food_id)
+        return stats[0] / (stats[1] + FOOD_SCORE_PRIOR) if stats else 0.0
+
+    def scores(self, food_ids, embeddings=None):
+        """food_ids 순서대로 선호 점수 배열을 반환합니다."""
+        result = np.array([self.food_score(fid) for fid in food_ids], dtype=np.float64)
+        taste = _unit(self.taste)
+        if taste is not None and embeddings is not None and len(embeddings):
+            matrix = _embedding_rows(food_ids, embeddings, len(taste))
+            norms = np.linalg.norm(matrix, axis=1)
+            norms[norms == 0] = 1.0
+            result += TASTE_WEIGHT * (matrix @ taste) / norms
+        return result
+
+    def _applied(self, deltas, taste_delta, weight_delta):
+        """변화량을 더한 새 모델을 반환합니다. (다른 스레드가 읽고 있는 이 모델은 바꾸지 않음)"""
+        food_stats = dict(self.food_stats)
+        for food_id, (d_sum, d_count) in deltas.items():
+            stats = food_stats.get(food_id, (0.0, 0))
+            food_stats[food_id] = [stats[0] + d_sum, stats[1] + d_count]
+        taste, taste_weight = self.taste, self.taste_weight
+        if taste_delta is not None:
+            taste = taste_delta.copy() if taste is None or len(taste) != len(taste_delta) else taste + taste_delta
+            taste_weight += weight_delta
+        preference = UserPreference(self.user_id, food_stats, taste, taste_weight)
+        preference.loaded_at = self.loaded_at   # TTL은 DB에서 읽은 시각 기준
+        return preference
+
+    @property
+    def empty(self):
+        return not self.food_stats and self.taste is None
+
+
+def _embedding_rows(food_ids, embeddings, dim):
+    """food_ids 순서의 임베딩 행렬 (없거나 차원이 다른 음식은 0 벡터)"""
+    if isinstance(embeddings, EmbeddingMatrix):
+        return embeddings.take(food_ids) if embeddings.dim == dim else np.zeros((len(food_ids), dim))
+    matrix = np.zeros((len(food_ids), dim))
+    for i, fid in enumerate(food_ids):
+        vec = embeddings.get(fid)
+        if vec is not None and len(vec) == dim:
+            matrix[i] = vec
+    return matrix
+
+
+def _load_preference(user_id):
+    ensure_preference_tables()
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT Food_id, rating_sum, rating_count FROM user_food_preference WHERE User_id = %s AND rating_count > 0",
+            (user_id,)
+        )
+        food_stats = {row['Food_id']: [float(row['rating_sum']), int(row['rating_count'])] for row in cursor.fetchall()}
+        cursor.execute("SELECT vector, weight_sum FROM user_taste_vector WHERE User_id = %s", (user_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+    taste = decode_embedding(bytes(row['vector'])).astype(np.float64) if row and row['vector'] else None
+    return UserPreference(user_id, _normalize_food_ids(food_stats), taste, float(row['weight_sum']) if row else 0.0)
+
+
+def _normalize_food_ids(food_stats):
+    # Food_id를 카탈로그의 타입으로 맞춤 (user_food_preference.Food_id는 문자열, Meal 컬럼은 정수일 수 있음)
+    catalog = get_food_catalog()
+    result = {}
+    for food_id, stats in food_stats.items():
+        food = catalog.get_food(food_id)
+        result[food['Food_id'] if food else food_id] = stats
+    return result
+
+
+def get_user_preference(user_id):
+    """
+    사용자 선호도를 반환합니다. (메모리 캐시, PREFERENCE_CACHE_TTL마다 DB에서 다시 읽음)
+    읽기에 실패하면 빈 선호도를 반환해 식단 생성은 기존처럼 동작합니다.
+    """
+    cached = _cache.get(user_id)
+    if cached is not None and time.time() - cached.loaded_at < PREFERENCE_CACHE_TTL:
+        return cached
+    with _cache_lock:
+        before = tuple(_writes.get(user_id, (0, 0)))
+    try:
+        preference = _load_preference(user_id)
+    except Exception as e:
+        logger.warning(f"선호도 조회 실패: user_id={user_id}, {e}")
+        return UserPreference(user_id)
+    with _cache_lock:
+        if before[0] or tuple(_writes.get(user_id, (0, 0))) != before:
+            # 읽는 사이 평점 반영이 겹침 → 이번 결과만 사용하고 다음 조회 때 다시 읽음
+            return preference
+        if len(_cache) >= _CACHE_MAX_USERS:
+            _cache.pop(next(iter(_cache)))
+        _cache[user_id] = preference
+    return preference
+
+
+def _rating_contributions(meal, ratings):
+    """식단의 음식별 (평점 - 3) 리스트 (평점이 없거나 음식이 없는 칸은 제외)"""
+    result = []
+    if not meal or not ratings:
+        return result
+    for rating_key, column in RATING_SLOTS.items():
+        rating = ratings.get(rating_key)
+        food_id = meal.get(column)
+        if rating and food_id is not None:
+            result.append((food_id, float(rating) - NEUTRAL_RATING))
+    return result
+
+
+def record_diary_ratings(user_id, new_meal, new_ratings, old_meal=None, old_ratings=None):
+    """
+    식단일지 저장 시 호출: 이전 평점의 기여분을 빼고 새 평점의 기여분을 더합니다. (전체 재계산 없음)
+    new_meal/old_meal: Meal 행(dict, Rice_id ~ Dessert_id), new_ratings/old_ratings: 평점 컬럼 dict
+    """
+    deltas = {}
+    for sign, meal, ratings in ((-1, old_meal, old_ratings), (1, new_meal, new_ratings)):
+        for food_id, centered in _rating_contributions(meal, ratings):
+            d = deltas.setdefault(food_id, [0.0, 0])
+            d[0] += sign * centered
+            d[1] += sign
+    deltas = {fid: d for fid, d in deltas.items() if d[0] or d[1]}
+    if not deltas:
+        return
+    deltas = _normalize_food_ids(deltas)
+
+    # 취향 벡터 변화량: Σ Δ(평점 - 3) x 정규화 임베딩
+    embeddings = get_food_catalog().embeddings
+    taste_delta = None
+    weight_delta = 0.0
+    for food_id, (d_sum, _) in deltas.items():
+        vec = _unit(embeddings.get(food_id)) if len(embeddings) else None
+        if vec is None or not d_sum:
+            continue
+        taste_delta = d_sum * vec.astype(np.float64) + (taste_delta if taste_delta is not None else 0)
+        weight_delta += abs(d_sum)
+
+    ensure_preference_tables()
+    with _cache_lock:
+        _writes.setdefault(user_id, [0, 0])[0] += 1
+    committed = False
+    try:
+        _write_deltas(user_id, deltas, taste_delta, weight_delta)
+        committed = True
+    finally:
+        with _cache_lock:
+            state = _writes[user_id]
+            state[0] -= 1
+            if committed:
+                state[1] += 1
+                # 캐시된 모델은 이 반영이 시작되기 전에 읽은 것이므로 같은 변화량을 더한 새 모델로 교체
+                cached = _cache.get(user_id)
+                if cached is not None:
+                    _cache[user_id] = cached._applied(deltas, taste_delta, weight_delta)
+
+
+def _write_deltas(user_id, deltas, taste_delta, weight_delta):
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """
+            INSERT INTO user_food_preference (User_id, Food_id, rating_sum, rating_count)
+            VALUES """ + ', '.join(['(%s, %s, %s, %s)'] * len(deltas)) + """
+            ON DUPLICATE KEY UPDATE
+                rating_sum = rating_sum + VALUES(rating_sum),
+                rating_count = rating_count + VALUES(rating_count)
+            """,
+            tuple(v for fid, (d_sum, d_count) in deltas.items() for v in (user_id, str(fid), d_sum, d_count))
+        )
+        if taste_delta is not None:
+            cursor.execute("SELECT dim, vector FROM user_taste_vector WHERE User_id = %s FOR UPDATE", (user_id,))
+            row = cursor.fetchone()
+            current = decode_embedding(bytes(row['vector'])).astype(np.float64) if row else None
+            taste = current + taste_delta if current is not None and len(current) == len(taste_delta) else taste_delta
+            cursor.execute(
+                """
+                INSERT INTO user_taste_vector (User_id, dim, vector, weight_sum)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    dim = VALUES(dim),
+                    vector = VALUES(vector),
+                    weight_sum = weight_sum + VALUES(weight_sum)
+                """,
+                (user_id, len(taste), encode_embedding(taste), weight_delta)
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
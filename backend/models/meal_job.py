@@ -0,0 +1,155 @@
+import json
+import uuid
+from config import get_db_connection  # DB 연결 함수
+
+_table_ready = False
+
+
+class MealJob:
+    """
+    식단 생성 비동기 작업(meal_job 테이블)을 저장/조회하는 클래스.
+    상태: queued → running → done / failed
+    """
+
+    # ============================================
+    # [1] 테이블 생성 (프로세스당 한 번만 실행)
+    # ============================================
+    @staticmethod
+    def ensure_table():
+        global _table_ready
+        if _table_ready:
+            return
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS `meal_job` (
+                  `job_id` CHAR(32) PRIMARY KEY,
+                  `User_id` INT NOT NULL,
+                  `kind` VARCHAR(20) NOT NULL,
+                  `params` TEXT,
+                  `status` VARCHAR(10) NOT NULL DEFAULT 'queued',
+                  `progress` TINYINT UNSIGNED NOT NULL DEFAULT 0,
+                  `message` VARCHAR(255),
+                  `result` TEXT,
+                  `worker` VARCHAR(100),
+                  `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                  `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                  `finished_at` TIMESTAMP NULL,
+                  INDEX (`User_id`, `created_at`),
+                  INDEX (`status`, `updated_at`)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """
+            )
+            conn.commit()
+            _table_ready = True
+        finally:
+            cursor.close()
+            conn.close()
+
+    # ============================================
+    # [2] 작업 등록
+    # ============================================
+    @staticmethod
+    def create(user_id, kind, params):
+        MealJob.ensure_table()
+        job_id = uuid.uuid4().hex
+        MealJob._execute(
+            "INSERT INTO meal_job (job_id, User_id, kind, params, message) VALUES (%s, %s, %s, %s, %s)",
+            (job_id, user_id, kind, json.dumps(params, ensure_ascii=False, default=str), '대기 중')
+        )
+        return job_id
+
+    # ============================================
+    # [3] 작업 선점 (queued 상태일 때만 running으로 바꿈, 여러 워커가 같은 작업을 실행하지 않도록)
+    # ============================================
+    @staticmethod
+    def claim(job_id, worker, stale_seconds=None):
+        sql = "UPDATE meal_job SET status = 'running', worker = %s, progress = 0, message = %s WHERE job_id = %s AND (status = 'queued'"
+        params = [worker, '실행 중', job_id]
+        if stale_seconds:
+            sql += " OR (status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND)"
+            params.append(stale_seconds)
+        sql += ")"
+        return MealJob._execute(sql, tuple(params)) > 0
+
+    # ============================================
+    # [4] 진행률 / 완료 / 실패 기록
+    # ============================================
+    @staticmethod
+    def update_progress(job_id, progress, message=None):
+        MealJob._execute(
+            "UPDATE meal_job SET progress = %s, message = %s WHERE job_id = %s",
+            (int(progress), message, job_id)
+        )
+
+    @staticmethod
+    def finish(job_id, result):
+        MealJob._execute(
+            """
+            UPDATE meal_job
+            SET status = 'done', progress = 100, message = %s, result = %s, finished_at = NOW()
+            WHERE job_id = %s
+            """,
+            ('완료', json.dumps(result, ensure_ascii=False, default=str), job_id)
+        )
+
+    @staticmethod
+    def fail(job_id, error):
+        MealJob._execute(
+            "UPDATE meal_job SET status = 'failed', message = %s, finished_at = NOW() WHERE job_id = %s",
+            (str(error)[:255], job_id)
+        )
+
+    # ============================================
+    # [5] 작업 조회
+    # ============================================
+    @staticmethod
+    def get(job_id):
+        MealJob.ensure_table()
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT * FROM meal_job WHERE job_id = %s", (job_id,))
+            job = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        if job:
+            job['params'] = json.loads(job['params']) if job['params'] else {}
+            job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    @staticmethod
+    def get_recoverable_ids(stale_seconds):
+        """대기 중인 작업과, stale_seconds 동안 갱신이 없는 실행 중 작업(서버 재시작 등으로 중단)의 ID 목록"""
+        MealJob.ensure_table()
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                """
+                SELECT job_id FROM meal_job
+                WHERE status = 'queued'
+                   OR (status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND)
+                ORDER BY created_at
+                """,
+                (stale_seconds,)
+            )
+            return [row['job_id'] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _execute(sql, params):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+            conn.close()
@@ -1,17 +1,11 @@
-import pymysql
-from config import DB_CONFIG
+from config import get_db_connection as _get_pooled_connection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 def get_db_connection():
-    """데이터베이스 연결을 생성하고 반환"""
-    return pymysql.connect(
-        host=DB_CONFIG['host'],
-        user=DB_CONFIG['user'],
-        password=DB_CONFIG['password'],
-        database=DB_CONFIG['database'],
-        port=DB_CONFIG['port'],
-        charset=DB_CONFIG['charset'],
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    """공용 커넥션 풀에서 PyMySQL(DictCursor) 연결을 빌려 반환"""
+    return _get_pooled_connection(driver='pymysql')
 
 class User:
     def __init__(self, id=None, username=None, password=None, name=None, 
@@ -37,7 +31,7 @@ class User:
             user = cursor.fetchone()
             return user
         except Exception as e:
-            print(f"사용자 조회 오류: {e}")
+            logger.error(f"사용자 조회 오류: {e}")
             return None
         finally:
             cursor.close()
@@ -56,7 +50,7 @@ class User:
             user = cursor.fetchone()
             return user
         except Exception as e:
-            print(f"사용자 조회 오류: {e}")
+            logger.error(f"사용자 조회 오류: {e}")
             return None
         finally:
             cursor.close()
@@ -74,7 +68,7 @@ class User:
             rows = cursor.fetchall()
             return [row['Allerg_id'] for row in rows]
         except Exception as e:
-            print(f"알레르기 정보 조회 오류: {e}")
+            logger.error(f"알레르기 정보 조회 오류: {e}")
             return []
         finally:
             cursor.close()
@@ -4,43 +4,43 @@ from utils.email import send_email
 from models.user import get_db_connection, User
 from models.meal_nutrition import MealNutrition
 from models.food_nutrition import FoodNutrition
-from utils.auth import generate_token
+from utils.auth import generate_token, invalidate_user_principal
 
 import datetime
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/api/login', methods=['POST'])
 def login():
     data = request.json
-    print(f"로그인 요청: {data.get('id')}")
+    logger.debug(f"로그인 요청: {data.get('id')}")
     
     if not data or 'id' not in data or 'password' not in data:
-        print("아이디 또는 비밀번호 누락")
+        logger.debug("아이디 또는 비밀번호 누락")
         return jsonify({'success': False, 'message': '아이디와 비밀번호를 입력해주세요.'}), 400
     
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        print(f"사용자 조회: {data['id']}")
         cursor.execute("SELECT * FROM User WHERE id = %s", (data['id'],))
         user = cursor.fetchone()
         
         if not user:
-            print(f"사용자를 찾을 수 없음: {data['id']}")
+            logger.debug(f"사용자를 찾을 수 없음: {data['id']}")
             return jsonify({'success': False, 'message': '아이디 또는 비밀번호가 일치하지 않습니다.'}), 401
         
-        print(f"사용자 찾음: {user['User_id']}, {user['id']}")
         
         hashed_password = hash_password(data['password'])
         if user['password'] != hashed_password:
-            print("비밀번호 불일치")
+            logger.debug("비밀번호 불일치")
             return jsonify({'success': False, 'message': '아이디 또는 비밀번호가 일치하지 않습니다.'}), 401
         
         # JWT 토큰 생성
         token = generate_token(user['User_id'])
-        print(f"토큰 생성: {token[:10]}...")
         
         user_info = {
             'id': user['id'],
@@ -55,7 +55,7 @@ def login():
             'kid_birth': user.get('Kid_birth', '')
         }
         
-        print(f"로그인 성공: {user['id']}, User_id: {user['User_id']}, 토큰 포함됨: {token[:10]}...")
+        logger.info(f"로그인 성공: {user['id']}, User_id: {user['User_id']}")
         
         # 응답에 token을 user 객체 내부와 별도 필드로 모두 포함
         return jsonify({
@@ -66,7 +66,7 @@ def login():
         }), 200
     
     except Exception as e:
-        print(f"로그인 오류: {str(e)}")
+        logger.error(f"로그인 오류: {str(e)}")
         return jsonify({'success': False, 'message': f'오류가 발생했습니다: {str(e)}'}), 500
     
     finally:
@@ -131,6 +131,7 @@ def reset_password():
             cursor.execute("UPDATE User SET password = %s WHERE User_id = %s",
                           (hashed_temp_password, user['User_id']))
             conn.commit()
+            invalidate_user_principal(user['User_id'])
             
             email_subject = "[아동 맞춤형 식단 추천 시스템] 임시 비밀번호 발급 안내"
             email_content = f"""
@@ -1,7 +1,14 @@
 from flask import Blueprint, jsonify
 from models.food import Food
+from models.user import User
 from utils.auth import token_required
+from utils.allergy import allergy_ids_to_mask
+from services.product_search import search_products
+from services.recipe_product_links import get_linked_products, extract_material_keywords
 from config import get_db_connection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 food_bp = Blueprint('food', __name__)
 
@@ -24,7 +31,7 @@ def get_food_detail(current_user, food_id):
             # 이미 문자열 형식(FD로 시작)이면 그대로 사용
             formatted_food_id = food_id
             
-        print(f"조회할 Food_id: {formatted_food_id}")
+        logger.debug(f"조회할 Food_id: {formatted_food_id}")
         
         # 음식 정보는 가져오기
         food = Food.get_by_id(formatted_food_id)
@@ -55,34 +62,34 @@ def get_food_detail(current_user, food_id):
         # 관련 상품 가져오기
         related_products = []
         
-        if food.get('Food_materials'):
-            materials = food['Food_materials'].split(',')
-            # 재료 이름에서 재료 키워드 추출
-            material_keywords = [m.strip().split(' ')[0] for m in materials if m.strip()]
-            
-            if material_keywords and len(material_keywords) > 0:
-                # 재료 키워드에 기반한 LIKE 쿼리 생성
-                like_clauses = ' OR '.join([f"food_products LIKE %s" for _ in material_keywords])
-                params = [f"%{keyword}%" for keyword in material_keywords]
-                
-                # 관련 상품 조회 쿼리
-                products_query = f"""
-                    SELECT product_id, food_products, category, price, img 
-                    FROM products 
-                    WHERE {like_clauses}
-                    LIMIT 6
-                """
-                
-                # 버퍼링된 결과를 사용하는 새 커서
+        # 미리 연결해 둔 관련 상품을 한 번의 조회로 가져옴 (사용자 알레르기 성분이 든 상품 제외)
+        user_mask = allergy_ids_to_mask(User.get_user_allergies(current_user['User_id']))
+        products_cursor = conn.cursor(dictionary=True, buffered=True)
+        try:
+            linked = get_linked_products(products_cursor, formatted_food_id, allergy_mask=user_mask, limit=6)
+        finally:
+            products_cursor.close()
+
+        if linked is not None:
+            related_products = linked
+        else:
+            # 아직 연결되지 않은 레시피는 상품 검색 색인에서 재료 키워드와 많이 일치하는 상품 순으로 6개
+            material_keywords = extract_material_keywords(food.get('Food_materials'))
+            matches, _ = search_products(material_keywords, limit=6, allergy_mask=user_mask) if material_keywords else ([], 0)
+
+            if matches:
+                placeholders = ', '.join(['%s'] * len(matches))
                 products_cursor = conn.cursor(dictionary=True, buffered=True)
-                products_cursor.execute(products_query, params)
-                
-                # 결과 가져오기
-                if products_cursor.with_rows:
-                    related_products = products_cursor.fetchall() or []
-                
-                # 커서 닫기
+                products_cursor.execute(f"""
+                    SELECT product_id, food_products, category, price, img
+                    FROM products
+                    WHERE product_id IN ({placeholders})
+                """, tuple(product_id for product_id, _ in matches))
+                rows_by_id = {row['product_id']: row for row in products_cursor.fetchall()}
                 products_cursor.close()
+
+                # 일치한 재료 수 순서 유지
+                related_products = [rows_by_id[pid] for pid, _ in matches if pid in rows_by_id]
         
         # 결과 반환
         return jsonify({
@@ -93,9 +100,7 @@ def get_food_detail(current_user, food_id):
         })
         
     except Exception as e:
-        print(f"음식 상세 정보 조회 오류: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"음식 상세 정보 조회 오류: {str(e)}")
         return jsonify({
             'success': False,
             'message': f'음식 정보를 가져오는 중 오류가 발생했습니다: {str(e)}'
@@ -106,4 +111,4 @@ def get_food_detail(current_user, food_id):
             try:
                 conn.close()
             except Exception as e:
-                print(f"DB 연결 닫기 오류: {str(e)}") 
\ No newline at end of file
+                logger.error(f"DB 연결 닫기 오류: {str(e)}")
\ No newline at end of file
@@ -1,25 +1,63 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 import pymysql
 from datetime import datetime, timedelta
 import calendar
+from models.user import get_db_connection
+from models.food_preference import RATING_SLOTS, record_diary_ratings
+from utils.auth import token_required
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 food_diary_bp = Blueprint('food_diary', __name__, url_prefix='/api')
 
-def get_db_connection():
-    return pymysql.connect(
-        host=current_app.config['DB_HOST'],
-        user=current_app.config['DB_USER'],
-        password=current_app.config['DB_PASSWORD'],
-        database=current_app.config['DB_NAME'],
-        charset='utf8mb4'
-    )
+# 선호도 반영에 필요한 기존 일지 컬럼 (식단 ID + 메뉴별 평점)
+_RATING_COLUMNS = 'meal_id, ' + ', '.join(RATING_SLOTS)
+
+
+def _record_preference(cursor, user_id, new_meal_id, new_ratings, old_diary):
+    """
+    메뉴별 평점 변화를 사용자 선호도에 증분 반영합니다. (이전 일지의 기여분을 빼고 새 평점을 더함)
+    일지 저장/수정/삭제가 커밋된 뒤 호출하며, 실패해도 일지 변경은 유지합니다.
+    """
+    try:
+        old_meal_id = old_diary['meal_id'] if old_diary else None
+        meal_ids = [mid for mid in {new_meal_id, old_meal_id} if mid]
+        meals = {}
+        if meal_ids:
+            cursor.execute(
+                f"""
+                SELECT Meal_id, Rice_id, Soup_id, SideDish1_id, SideDish2_id, MainDish_id, Dessert_id
+                FROM Meal WHERE User_id = %s AND Meal_id IN ({', '.join(['%s'] * len(meal_ids))})
+                """,
+                (user_id, *meal_ids)
+            )
+            meals = {str(row['Meal_id']): row for row in cursor.fetchall()}
+        record_diary_ratings(
+            int(user_id),
+            meals.get(str(new_meal_id)), new_ratings,
+            meals.get(str(old_meal_id)), old_diary
+        )
+    except Exception as e:
+        logger.warning(f"선호도 반영 실패: user_id={user_id}, {e}")
+
+
+def _forbidden_user(current_user, user_id):
+    """URL의 user_id가 로그인한 사용자가 아니면 403 응답, 같으면 None"""
+    if str(user_id) != str(current_user['User_id']):
+        return jsonify({
+            'success': False,
+            'message': '권한이 없습니다.'
+        }), 403
+    return None
 
 @food_diary_bp.route('/food-diary', methods=['POST'])
-def save_food_diary():
+@token_required
+def save_food_diary(current_user):
     """식단일지 저장"""
     try:
-        data = request.get_json()
-        user_id = data.get('user_id')
+        data = request.get_json() or {}
+        user_id = current_user['User_id']
         date = data.get('date')
         rating = data.get('rating')  # 전체 평점 (메뉴별 평점의 평균)
         comment = data.get('comment', '')
@@ -33,7 +71,7 @@ def save_food_diary():
         main_dish_rating = data.get('main_dish_rating')
         dessert_rating = data.get('dessert_rating')
         
-        if not all([user_id, date]):
+        if not date:
             return jsonify({
                 'success': False,
                 'message': '필수 정보가 누락되었습니다.'
@@ -43,8 +81,9 @@ def save_food_diary():
         cursor = connection.cursor()
         
         # 기존 일지가 있는지 확인
-        check_query = """
-            SELECT diary_id FROM food_diary 
+        check_query = f"""
+            SELECT diary_id, {_RATING_COLUMNS}
+            FROM food_diary 
             WHERE user_id = %s AND date = %s
         """
         cursor.execute(check_query, (user_id, date))
@@ -66,7 +105,7 @@ def save_food_diary():
                 side_dish2_rating, main_dish_rating, dessert_rating,
                 user_id, date
             ))
-            diary_id = existing_diary[0]
+            diary_id = existing_diary['diary_id']
         else:
             # 새로 생성
             insert_query = """
@@ -86,6 +125,9 @@ def save_food_diary():
             diary_id = cursor.lastrowid
         
         connection.commit()
+
+        # 메뉴별 평점을 사용자 선호도에 증분 반영 (실패해도 일지 저장은 유지)
+        _record_preference(cursor, user_id, meal_id, {key: data.get(key) for key in RATING_SLOTS}, existing_diary)
         
         return jsonify({
             'success': True,
@@ -103,8 +145,12 @@ def save_food_diary():
             connection.close()
 
 @food_diary_bp.route('/food-diary/<int:user_id>', methods=['GET'])
-def get_food_diary(user_id):
+@token_required
+def get_food_diary(current_user, user_id):
     """월별 식단일지 조회"""
+    forbidden = _forbidden_user(current_user, user_id)
+    if forbidden:
+        return forbidden
     try:
         year = request.args.get('year', type=int)
         month = request.args.get('month', type=int)
@@ -169,8 +215,12 @@ def get_food_diary(user_id):
             connection.close()
 
 @food_diary_bp.route('/food-diary/<int:user_id>/<date>', methods=['GET'])
-def get_food_diary_by_date(user_id, date):
+@token_required
+def get_food_diary_by_date(current_user, user_id, date):
     """특정 날짜의 식단일지 조회"""
+    forbidden = _forbidden_user(current_user, user_id)
+    if forbidden:
+        return forbidden
     try:
         connection = get_db_connection()
         cursor = connection.cursor(pymysql.cursors.DictCursor)
@@ -226,11 +276,12 @@ def get_food_diary_by_date(user_id, date):
             connection.close()
 
 @food_diary_bp.route('/food-diary/<int:diary_id>', methods=['PUT'])
-def update_food_diary(diary_id):
+@token_required
+def update_food_diary(current_user, diary_id):
     """식단일지 업데이트"""
     try:
-        data = request.get_json()
-        user_id = data.get('user_id')
+        data = request.get_json() or {}
+        user_id = current_user['User_id']
         rating = data.get('rating')
         comment = data.get('comment', '')
         
@@ -242,22 +293,17 @@ def update_food_diary(diary_id):
         main_dish_rating = data.get('main_dish_rating')
         dessert_rating = data.get('dessert_rating')
         
-        if not user_id:
-            return jsonify({
-                'success': False,
-                'message': '사용자 ID가 필요합니다.'
-            }), 400
-        
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # 해당 일지가 사용자의 것인지 확인
-        check_query = """
-            SELECT diary_id FROM food_diary 
+        # 해당 일지가 사용자의 것인지 확인 (선호도에서 뺄 기존 식단/평점도 함께 조회)
+        check_query = f"""
+            SELECT diary_id, {_RATING_COLUMNS} FROM food_diary 
             WHERE diary_id = %s AND user_id = %s
         """
         cursor.execute(check_query, (diary_id, user_id))
-        if not cursor.fetchone():
+        existing_diary = cursor.fetchone()
+        if not existing_diary:
             return jsonify({
                 'success': False,
                 'message': '권한이 없습니다.'
@@ -279,6 +325,12 @@ def update_food_diary(diary_id):
             diary_id
         ))
         connection.commit()
+
+        # 같은 식단의 평점 변화를 선호도에 반영
+        _record_preference(
+            cursor, user_id, existing_diary['meal_id'],
+            {key: data.get(key) for key in RATING_SLOTS}, existing_diary
+        )
         
         return jsonify({
             'success': True,
@@ -295,28 +347,23 @@ def update_food_diary(diary_id):
             connection.close()
 
 @food_diary_bp.route('/food-diary/<int:diary_id>', methods=['DELETE'])
-def delete_food_diary(diary_id):
+@token_required
+def delete_food_diary(current_user, diary_id):
     """식단일지 삭제"""
     try:
-        data = request.get_json()
-        user_id = data.get('user_id')
-        
-        if not user_id:
-            return jsonify({
-                'success': False,
-                'message': '사용자 ID가 필요합니다.'
-            }), 400
+        user_id = current_user['User_id']
         
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # 해당 일지가 사용자의 것인지 확인
-        check_query = """
-            SELECT diary_id FROM food_diary 
+        # 해당 일지가 사용자의 것인지 확인 (선호도에서 뺄 기존 식단/평점도 함께 조회)
+        check_query = f"""
+            SELECT diary_id, {_RATING_COLUMNS} FROM food_diary 
             WHERE diary_id = %s AND user_id = %s
         """
         cursor.execute(check_query, (diary_id, user_id))
-        if not cursor.fetchone():
+        existing_diary = cursor.fetchone()
+        if not existing_diary:
             return jsonify({
                 'success': False,
                 'message': '권한이 없습니다.'
@@ -326,6 +373,9 @@ def delete_food_diary(diary_id):
         delete_query = "DELETE FROM food_diary WHERE diary_id = %s"
         cursor.execute(delete_query, (diary_id,))
         connection.commit()
+
+        # 삭제한 일지의 평점 기여분을 선호도에서 제외
+        _record_preference(cursor, user_id, None, {}, existing_diary)
         
         return jsonify({
             'success': True,
@@ -342,8 +392,12 @@ def delete_food_diary(diary_id):
             connection.close()
 
 @food_diary_bp.route('/food-diary/stats/<int:user_id>', methods=['GET'])
-def get_diary_stats(user_id):
+@token_required
+def get_diary_stats(current_user, user_id):
     """식단일지 통계 조회"""
+    forbidden = _forbidden_user(current_user, user_id)
+    if forbidden:
+        return forbidden
     try:
         year = request.args.get('year', type=int)
         month = request.args.get('month', type=int)
@@ -1,17 +1,28 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from utils.auth import token_required
-from models.food_nutrition import get_nutrition_by_food_id
+from models.food_nutrition import get_nutrition_by_food_ids
 
 food_nutrition_bp = Blueprint('food_nutrition', __name__)
 
+@food_nutrition_bp.route('/api/food-nutrition', methods=['GET'])
+@token_required
+def get_foods_nutrition(current_user):
+    """
+    여러 음식의 영양소 정보를 한 번에 반환합니다. (ex: ?ids=FD1,FD2,FD3)
+    """
+    ids = [fid.strip() for fid in request.args.get('ids', '').split(',') if fid.strip()]
+    if not ids:
+        return jsonify({'success': False, 'message': '음식 ID를 입력해주세요.'}), 400
+    return jsonify({'success': True, 'nutrition': get_nutrition_by_food_ids(ids)})
+
 @food_nutrition_bp.route('/api/food-nutrition/<food_id>', methods=['GET'])
 @token_required
 def get_food_nutrition(current_user, food_id):
     """
     특정 음식의 영양소 정보를 반환합니다.
     """
-    nutrition = get_nutrition_by_food_id(food_id)
+    nutrition = get_nutrition_by_food_ids([food_id]).get(food_id)
     if nutrition:
         return jsonify({'success': True, 'nutrition': nutrition})
     else:
-        return jsonify({'success': False, 'message': '영양소 정보가 없습니다.'}), 404
\ No newline at end of file
+        return jsonify({'success': False, 'message': '영양소 정보가 없습니다.'}), 404
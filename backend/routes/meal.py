@@ -1,17 +1,57 @@
 from flask import Blueprint, request, jsonify
 import datetime
-import traceback
 import calendar
+import math
 from models.meal import Meal
 from services.meal_generate_daily import generate_daily_meal
 from services.meal_generate_weekly import generate_weekly_meal
 from services.meal_generate_monthly import generate_monthly_meal as generate_monthly_meal_plan
 from services.meal_refresh import refresh_daily_meal, refresh_single_menu_item
+from services.meal_optimizer import meal_target_for, relative_weights, DEFAULT_MEAL_TARGET
+from services.meal_jobs import submit_meal_plan_job, get_meal_job
+from services.meal_plan import PLAN_MODES
 from utils.auth import token_required
 from flask_cors import cross_origin
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 meal_bp = Blueprint('meal', __name__)
 
+
+def _is_async_request(data):
+    """요청 본문의 async 값이나 ?async=1 쿼리로 비동기 작업 모드를 선택합니다."""
+    value = data.get('async', request.args.get('async'))
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+MAX_TIME_BUDGET = 1.0   # 식단 새로고침 최적화 시간 상한(초)
+
+
+def _parse_time_budget(value, default=0.05):
+    """요청의 time_budget(초)을 읽어 MAX_TIME_BUDGET 이하로 제한합니다. 숫자가 아니거나 0 이하면 None"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return None
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(budget) or budget <= 0:
+        return None
+    return min(budget, MAX_TIME_BUDGET)
+
+
+def _job_accepted(job_id):
+    return jsonify({
+        'success': True,
+        'message': '식단 생성 작업이 등록되었습니다.',
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/meals/jobs/{job_id}'
+    }), 202
+
 # 1️⃣ 하루 식단 생성
 @meal_bp.route('/api/meals/generate/daily', methods=['POST', 'OPTIONS'])
 @cross_origin()
@@ -44,8 +84,7 @@ def generate_daily_meal_route(current_user):
                 'message': '식단 생성에 실패했습니다.'
             }), 500
     except Exception as e:
-        print(f"❌ 하루 식단 생성 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"하루 식단 생성 오류: {e}")
         return jsonify({
             'success': False,
             'message': f'식단 생성 중 오류가 발생했습니다: {str(e)}'
@@ -69,7 +108,16 @@ def generate_weekly_meal_route(current_user):
         else:
             start_date = datetime.date.today()
         
-        meals_created = generate_weekly_meal(user_id, start_date)
+        # mode: 'variety'(기본, 기간 전체 최적화) 또는 'random'(날마다 무작위)
+        mode = data.get('mode', 'variety')
+        if mode not in PLAN_MODES:
+            mode = 'variety'
+
+        # 비동기 모드면 작업만 등록하고 작업 ID를 바로 반환
+        if _is_async_request(data):
+            return _job_accepted(submit_meal_plan_job(user_id, 'weekly', start_date, mode))
+
+        meals_created = generate_weekly_meal(user_id, start_date, mode)
         
         return jsonify({
             'success': True,
@@ -77,8 +125,7 @@ def generate_weekly_meal_route(current_user):
             'meals_created': meals_created
         })
     except Exception as e:
-        print(f"❌ 일주일치 식단 생성 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"일주일치 식단 생성 오류: {e}")
         return jsonify({
             'success': False,
             'message': f'식단 생성 중 오류가 발생했습니다: {str(e)}'
@@ -102,7 +149,16 @@ def generate_monthly_meal_route(current_user):
         else:
             start_date = datetime.date.today()
         
-        meals_created = generate_monthly_meal_plan(user_id, start_date)
+        # mode: 'variety'(기본, 기간 전체 최적화) 또는 'random'(날마다 무작위)
+        mode = data.get('mode', 'variety')
+        if mode not in PLAN_MODES:
+            mode = 'variety'
+
+        # 비동기 모드면 작업만 등록하고 작업 ID를 바로 반환
+        if _is_async_request(data):
+            return _job_accepted(submit_meal_plan_job(user_id, 'monthly', start_date, mode))
+
+        meals_created = generate_monthly_meal_plan(user_id, start_date, mode)
         
         return jsonify({
             'success': True,
@@ -110,20 +166,50 @@ def generate_monthly_meal_route(current_user):
             'meals_created': meals_created
         })
     except Exception as e:
-        print(f"❌ 한 달치 식단 생성 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"한 달치 식단 생성 오류: {e}")
         return jsonify({
             'success': False,
             'message': f'식단 생성 중 오류가 발생했습니다: {str(e)}'
         }), 500
 
+# 3️⃣-1 식단 생성 작업 상태 조회
+@meal_bp.route('/api/meals/jobs/<string:job_id>', methods=['GET'])
+@token_required
+def get_meal_job_route(current_user, job_id):
+    try:
+        job = get_meal_job(job_id)
+        # 다른 사용자의 작업은 존재하지 않는 것처럼 처리
+        if not job or job['User_id'] != current_user['User_id']:
+            return jsonify({
+                'success': False,
+                'message': '작업을 찾을 수 없습니다.'
+            }), 404
+        return jsonify({
+            'success': True,
+            'job_id': job['job_id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'progress': job['progress'],
+            'message': job['message'],
+            'params': job['params'],
+            'result': job['result'],
+            'created_at': job['created_at'],
+            'finished_at': job['finished_at']
+        })
+    except Exception as e:
+        logger.exception(f"식단 생성 작업 조회 오류: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'작업 정보를 가져오는 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
 # 4️⃣ 특정 날짜의 식단 조회
 @meal_bp.route('/api/meals/<string:date_str>', methods=['GET'])
 @token_required
 def get_meal_by_date(current_user, date_str):
     try:
         user_id = current_user['User_id']
-        print(f"날짜별 식단 조회 user_id={user_id}, 날짜={date_str}")
+        logger.debug(f"날짜별 식단 조회 user_id={user_id}, 날짜={date_str}")
         date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
         
         meal = Meal.get_by_user_and_date(user_id, date)
@@ -138,8 +224,7 @@ def get_meal_by_date(current_user, date_str):
                 'message': '해당 날짜에 식단 정보가 없습니다.'
             }), 404
     except Exception as e:
-        print(f"❌ 날짜별 식단 조회 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"날짜별 식단 조회 오류: {e}")
         return jsonify({
             'success': False,
             'message': f'식단 정보를 가져오는 중 오류가 발생했습니다: {str(e)}'
@@ -151,7 +236,7 @@ def get_meal_by_date(current_user, date_str):
 def regenerate_meal(current_user, date_str):
     try:
         user_id = current_user['User_id']
-        print(f"식단 재생성 user_id={user_id}, 날짜={date_str}")
+        logger.debug(f"식단 재생성 user_id={user_id}, 날짜={date_str}")
         date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
         
         Meal.delete_by_user_and_date(user_id, date)
@@ -170,8 +255,7 @@ def regenerate_meal(current_user, date_str):
                 'message': '식단 생성에 실패했습니다.'
             }), 500
     except Exception as e:
-        print(f"❌ 식단 재생성 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"식단 재생성 오류: {e}")
         return jsonify({
             'success': False,
             'message': f'식단 다시 생성 중 오류가 발생했습니다: {str(e)}'
@@ -185,26 +269,37 @@ def refresh_meal(current_user, date_str):
         user_id = current_user['User_id']
         date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
         data = request.get_json() or {}
-        target_nutrition = data.get('target_nutrition', {
-            'calories': 600,
-            'carbohydrate': 75,
-            'protein': 20,
-            'fat': 20,
-            'sodium': 700,
-        })
+        # mode: 'optimize'(기본, 권장 영양소 목표 최적화) 또는 'random'(무작위 조합 비교)
+        mode = data.get('mode', 'optimize')
+        time_budget = _parse_time_budget(data.get('time_budget'))
+        if time_budget is None:
+            return jsonify({
+                'success': False,
+                'message': 'time_budget은 0보다 큰 초 단위 숫자여야 합니다.'
+            }), 400
+        target_nutrition = data.get('target_nutrition')
+        if target_nutrition is None and mode == 'optimize':
+            # 아이 나이에 맞는 권장 영양소(Recommended_meal)를 목표로 사용
+            target_nutrition = meal_target_for(current_user.get('Kid_birth'), date)
+        if target_nutrition is None:
+            target_nutrition = dict(DEFAULT_MEAL_TARGET)
         item = data.get('item')
         if item:
             result = refresh_single_menu_item(user_id, date, item, target_nutrition)
         else:
-            result = refresh_daily_meal(user_id, date, target_nutrition)
+            result = refresh_daily_meal(
+                user_id, date, target_nutrition,
+                mode=mode,
+                weights=relative_weights(target_nutrition) if mode == 'optimize' else None,
+                time_budget=time_budget
+            )
         if result:
             meal = Meal.get_by_user_and_date(user_id, date)
             return jsonify({'success': True, 'meal': meal, 'nutrition': result.get('nutrition')})
         else:
             return jsonify({'success': False, 'message': '식단 새로고침에 실패했습니다.'}), 500
     except Exception as e:
-        print(f"❌ 식단 새로고침 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f"식단 새로고침 오류: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # 7️⃣ 월별 식단 조회
@@ -218,5 +313,5 @@ def get_monthly_meals(current_user):
         meals = Meal.get_monthly_meals(user_id, year, month)
         return jsonify({'success': True, 'meals': meals})
     except Exception as e:
-        print(f"❌ 월별 식단 조회 오류: {e}")
+        logger.error(f"월별 식단 조회 오류: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,121 @@
+from functools import wraps
+from flask import Blueprint, jsonify, request, Response
+from config import MONITORING_ADMIN_USER_IDS
+from utils.auth import token_required
+from utils.logger import get_logger
+from utils.db_pool import get_all_pool_stats
+from utils.request_metrics import render_prometheus
+from models.food_catalog import get_food_catalog, invalidate_food_catalog
+from models.food_embedding import get_mmap_store_stats
+from services.view_counter import get_view_counter_stats, flush_views
+from services.popularity_ranking import get_ranking_stats, invalidate_rankings
+from services.product_detail import get_product_detail_cache_stats, invalidate_product_detail
+
+monitoring_bp = Blueprint('monitoring', __name__)
+logger = get_logger(__name__)
+
+
+def admin_required(f):
+    """토큰 검증 후 MONITORING_ADMIN_USER_IDS에 있는 사용자만 통과시키는 데코레이터 (상태를 바꾸는 모니터링 API용)"""
+    @token_required
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        if str(current_user['User_id']) not in MONITORING_ADMIN_USER_IDS:
+            logger.warning(f"모니터링 관리 API 권한 없음: User_id {current_user['User_id']} {request.path}")
+            return jsonify({
+                'success': False,
+                'message': '관리자 권한이 필요합니다.'
+            }), 403
+        return f(*args, **kwargs)
+
+    return decorated
+
+# =========================
+# DB 커넥션 풀 통계 조회 API
+# =========================
+@monitoring_bp.route('/api/monitoring/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    """드라이버별 커넥션 풀 상태(사용 중, 대기자 수, 대기 시간 등)를 반환합니다."""
+    return jsonify({'success': True, 'pools': get_all_pool_stats()})
+
+# =========================
+# 요청/SQL 계측 지표 (Prometheus 텍스트 형식)
+# =========================
+@monitoring_bp.route('/api/monitoring/metrics', methods=['GET'])
+def get_request_metrics():
+    """라우트별 처리 시간 백분위, 쿼리 수, DB 시간, 읽은 행 수, 빌린 연결 수와 풀 상태를 반환합니다."""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+# =========================
+# 음식 카탈로그 스냅샷 조회/무효화 API
+# =========================
+@monitoring_bp.route('/api/monitoring/food-catalog', methods=['GET'])
+def get_food_catalog_info():
+    """현재 음식 카탈로그 스냅샷의 버전과 크기를 반환합니다."""
+    catalog = get_food_catalog()
+    return jsonify({
+        'success': True,
+        'version': catalog.version,
+        'loaded_at': catalog.loaded_at,
+        'foods': len(catalog.foods),
+        'nutrition': len(catalog.nutrition),
+        'embeddings': len(catalog.embeddings),
+        'embedding_dim': catalog.embeddings.dim,
+        'embedding_file': get_mmap_store_stats()
+    })
+
+@monitoring_bp.route('/api/monitoring/food-catalog/invalidate', methods=['POST'])
+@admin_required
+def invalidate_food_catalog_route():
+    """음식 데이터를 DB에서 직접 수정한 뒤 호출하면 다음 조회 시 스냅샷을 다시 읽습니다."""
+    invalidate_food_catalog()
+    return jsonify({'success': True})
+
+# =========================
+# 조회수 write-behind 버퍼 조회/반영 API
+# =========================
+@monitoring_bp.route('/api/monitoring/view-counter', methods=['GET'])
+def get_view_counter_info():
+    """아직 반영되지 않은 조회수 증가분과 누적 반영 통계를 반환합니다."""
+    return jsonify({'success': True, 'view_counter': get_view_counter_stats()})
+
+@monitoring_bp.route('/api/monitoring/view-counter/flush', methods=['POST'])
+@admin_required
+def flush_view_counter_route():
+    """버퍼에 모인 조회수를 즉시 DB에 반영합니다."""
+    return jsonify({'success': True, 'flushed': flush_views()})
+
+# =========================
+# 조회수 순위 캐시 조회/무효화 API
+# =========================
+@monitoring_bp.route('/api/monitoring/ranking', methods=['GET'])
+def get_ranking_info():
+    """종류별 조회수 순위 크기와 알레르기 조합별 LRU 적중 통계를 반환합니다."""
+    return jsonify({'success': True, 'rankings': get_ranking_stats()})
+
+@monitoring_bp.route('/api/monitoring/ranking/invalidate', methods=['POST'])
+@admin_required
+def invalidate_ranking_route():
+    """상품/음식을 DB에서 직접 추가·삭제한 뒤 호출하면 다음 조회 시 순위를 다시 읽습니다."""
+    invalidate_rankings()
+    return jsonify({'success': True})
+
+# =========================
+# 상품 상세 캐시 조회/무효화 API
+# =========================
+@monitoring_bp.route('/api/monitoring/product-cache', methods=['GET'])
+def get_product_cache_info():
+    """상품 상세 응답 캐시의 크기와 적중 통계를 반환합니다."""
+    return jsonify({'success': True, 'product_cache': get_product_detail_cache_stats()})
+
+@monitoring_bp.route('/api/monitoring/product-cache/invalidate', methods=['POST'])
+@admin_required
+def invalidate_product_cache_route():
+    """상품/이미지를 DB에서 직접 수정한 뒤 호출합니다. (body의 product_ids가 없으면 전체 무효화)"""
+    data = request.get_json(silent=True) or {}
+    product_ids = data.get('product_ids')
+    try:
+        invalidate_product_detail([int(pid) for pid in product_ids] if product_ids is not None else None)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'product_ids는 정수 배열이어야 합니다.'}), 400
+    return jsonify({'success': True})
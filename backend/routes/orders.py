@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from utils.auth import token_required
 from models.user import get_db_connection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 orders_bp = Blueprint('orders', __name__)
 
@@ -114,7 +117,7 @@ def create_order(current_user):
 
         return jsonify({'success': True, 'orderId': order_id}), 201
     except Exception as e:
-        print('주문 생성 오류:', e)
+        logger.error(f'주문 생성 오류: {e}')
         conn.rollback()
         return jsonify({'success': False, 'message': '주문 생성 실패'}), 500
     finally:
@@ -141,7 +144,7 @@ def list_orders(current_user):
         rows = cursor.fetchall()
         return jsonify({'success': True, 'orders': rows}), 200
     except Exception as e:
-        print('주문 목록 조회 오류:', e)
+        logger.error(f'주문 목록 조회 오류: {e}')
         return jsonify({'success': False, 'orders': []}), 500
     finally:
         cursor.close()
@@ -170,7 +173,7 @@ def get_order_detail(current_user, order_id):
         items = cursor.fetchall()
         return jsonify({'success': True, 'order': order, 'items': items}), 200
     except Exception as e:
-        print('주문 상세 조회 오류:', e)
+        logger.error(f'주문 상세 조회 오류: {e}')
         return jsonify({'success': False}), 500
     finally:
         cursor.close()
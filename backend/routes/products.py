@@ -1,18 +1,84 @@
+import time
 from flask import Blueprint, request, jsonify
 from models.user import get_db_connection, User
 # 알레르기 맵핑 데이터
 from utils.allergy import (
     allergy_synonyms,
     allergy_id_name_map,
-    generate_product_allergy_filter_sql
+    allergy_ids_to_mask,
+    generate_product_allergy_mask_sql
 )
+from services.allergen_index import ensure_allergen_mask_tables
+from services.view_counter import record_view
+from services.popularity_ranking import get_ranking
+from services.product_search import search_products, normalize_keywords
+from services.product_detail import get_product_detail as load_product_detail
+from utils.pagination import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, wants_pagination, parse_page_args, make_cursor, project
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 products_bp = Blueprint('products', __name__)
 
+# 필터가 있는 목록의 COUNT(*) 결과 캐시 유지 시간(초) (첫 페이지마다 전체를 세지 않도록)
+_COUNT_CACHE_TTL = 60
+_count_cache = {}
+_product_columns = None
+
+
+def _get_product_columns(cursor):
+    """products 테이블 컬럼 이름 (fields= 검증용, 프로세스당 한 번 조회)"""
+    global _product_columns
+    if _product_columns is None:
+        cursor.execute("SELECT * FROM products LIMIT 0")
+        cursor.fetchall()
+        _product_columns = tuple(col[0] for col in cursor.description)
+    return _product_columns
+
+
+def _estimate_product_count(cursor, from_sql, params, cache_key):
+    """
+    목록 전체 개수 추정치.
+    필터가 없으면 information_schema의 행 수 통계를, 있으면 _COUNT_CACHE_TTL 동안 캐시한 COUNT(*)를 사용합니다.
+    """
+    if cache_key is None:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'products'"
+        )
+        row = cursor.fetchone()
+        return int(row['TABLE_ROWS'] or 0) if row else 0
+
+    cached = _count_cache.get(cache_key)
+    if cached and time.time() - cached[0] < _COUNT_CACHE_TTL:
+        return cached[1]
+    cursor.execute(f"SELECT COUNT(*) AS cnt {from_sql}", params)
+    count = int(cursor.fetchone()['cnt'])
+    if len(_count_cache) > 1000:
+        _count_cache.clear()
+    _count_cache[cache_key] = (time.time(), count)
+    return count
+
 # =========================
 # 상품 목록 조회 API
 # =========================
 @products_bp.route('/api/products', methods=['GET'])
 def get_all_products():
+    """
+    조회수 내림차순 상품 목록.
+    limit / after=<view_count>,<product_id> / fields= 중 하나라도 주면 키셋 페이지네이션 응답
+    ({'items', 'next_cursor', 'total_estimate'})을, 없으면 기존처럼 전체 배열을 반환합니다.
+    """
+    paginate = wants_pagination(request.args)
+    if paginate:
+        try:
+            limit, after, fields = parse_page_args(request.args)
+            if after is not None:
+                after = (after[0], int(after[1]))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
     # 1. 쿼리 파라미터로 체크된 알레르기 id 리스트를 콤마로 받음 (ex: checked_allergies=1,10,15)
     user_id = request.args.get('user_id', type=int)
     checked_allergies = request.args.get('checked_allergies')  # str or None
@@ -21,7 +87,7 @@ def get_all_products():
     if checked_allergies:
         try:
             checked_allergy_ids = list(map(int, checked_allergies.split(',')))
-            print("Checked allergy IDs:", checked_allergy_ids)
+            logger.debug(f"Checked allergy IDs: {checked_allergy_ids}")
         except:
             return jsonify({'error': 'Invalid allergy ids'}), 400
     else:
@@ -29,68 +95,205 @@ def get_all_products():
 
     # 3. DB에서 사용자 알레르기 정보 조회 (user_allergy 테이블)
     user_allergy_ids = User.get_user_allergies(user_id) if user_id else []
-    print("User allergy IDs:", user_allergy_ids)
+    logger.debug(f"User allergy IDs: {user_allergy_ids}")
 
     # 4. 두 알레르기 리스트 합치기 (중복 제거)
     combined_allergy_ids = list(set(user_allergy_ids + checked_allergy_ids))
-    print("Combined allergy IDs:", combined_allergy_ids)
+    logger.debug(f"Combined allergy IDs: {combined_allergy_ids}")
 
     # 5. DB 연결 및 상품 목록 쿼리 실행
-    connection = get_db_connection()
+    connection = None
     try:
+        ensure_allergen_mask_tables()
+        connection = get_db_connection()
         with connection.cursor() as cursor:
-            base_sql = "SELECT * FROM products p"
-            # 6. 알레르기 필터가 있으면 WHERE 절 추가
+            from_sql = "FROM products p"
+            where = []
+            # 6. 알레르기 필터가 있으면 미리 계산된 알레르기 마스크로 WHERE 절 추가
             if combined_allergy_ids:
-                allergy_filter = generate_product_allergy_filter_sql(combined_allergy_ids, table_alias='p')
+                allergy_filter = generate_product_allergy_mask_sql(combined_allergy_ids, table_alias='p', mask_alias='pm')
                 if allergy_filter:
-                    base_sql += f" WHERE {allergy_filter}"
+                    from_sql += " LEFT JOIN product_allergen_mask pm ON pm.product_id = p.product_id"
+                    where.append(allergy_filter)
+
+            if not paginate:
+                sql = f"SELECT p.* {from_sql}" + (f" WHERE {' AND '.join(where)}" if where else "")
+                ranking = get_ranking('products')
+                if not ranking.complete:
+                    # 7. 순위가 상위 N개만 담고 있으면 DB에서 조회수 기준 내림차순 정렬
+                    cursor.execute(sql + " ORDER BY p.view_count DESC")
+                    return jsonify(cursor.fetchall())
+
+                # 7. 전체 순위가 메모리에 있으면 정렬 없이 읽고 알레르기 조합별 순위(LRU) 순서로 나열
+                cursor.execute(sql)
+                rows_by_id = {row['product_id']: row for row in cursor.fetchall()}
+                ranked_ids, _ = ranking.filtered(allergy_ids_to_mask(combined_allergy_ids))
+                products = []
+                for product_id in ranked_ids:
+                    row = rows_by_id.pop(product_id, None)
+                    if row:
+                        row['view_count'] = ranking.counts.get(product_id, row['view_count'])
+                        products.append(row)
+                # 순위를 읽은 뒤 추가된 상품은 다음 순위 갱신 전까지 뒤에 조회수 순으로
+                products.extend(sorted(rows_by_id.values(), key=lambda row: (-(row['view_count'] or 0), row['product_id'])))
+
+                # 8. 상품 목록 결과 반환
+                return jsonify(products)
+
+            # 7. 페이지네이션: 필요한 컬럼만, (조회수 내림차순, product_id 오름차순) 키셋으로 limit + 1개 조회
+            if fields:
+                columns = _get_product_columns(cursor)
+                unknown = [f for f in fields if f not in columns]
+                if unknown:
+                    return jsonify({'error': f'알 수 없는 필드: {", ".join(unknown)}'}), 400
+                select_columns = list(dict.fromkeys(['product_id', 'view_count'] + fields))
+                select_sql = ', '.join(f'p.`{c}`' for c in select_columns)
+            else:
+                select_sql = 'p.*'
+
+            # 파라미터 바인딩을 쓰므로 LIKE 패턴의 %를 이스케이프
+            where = [w.replace('%', '%%') for w in where]
+            filter_sql = from_sql + (f" WHERE {' AND '.join(where)}" if where else "")
+
+            # 조회수 상위 N개 안의 페이지는 메모리 순위(알레르기 조합별 LRU)에서 ID를 받아 해당 행만 조회
+            ranking = get_ranking('products')
+            after_key = (-after[0], after[1]) if after is not None else None
+            ranked_page = ranking.page(allergy_ids_to_mask(combined_allergy_ids), after_key, limit)
+            if ranked_page is not None:
+                ranked, has_more, total = ranked_page
+                rows_by_id = {}
+                if ranked:
+                    placeholders = ', '.join(['%s'] * len(ranked))
+                    cursor.execute(
+                        f"SELECT {select_sql} FROM products p WHERE p.product_id IN ({placeholders})",
+                        tuple(product_id for product_id, _ in ranked)
+                    )
+                    rows_by_id = {row['product_id']: row for row in cursor.fetchall()}
+                rows = []
+                for product_id, view_count in ranked:
+                    row = rows_by_id.get(product_id)
+                    if row:
+                        row['view_count'] = view_count
+                        rows.append(row)
+
+                total_estimate = None
+                if after is None:
+                    cache_key = tuple(sorted(combined_allergy_ids)) if where else None
+                    total_estimate = total if total is not None else \
+                        _estimate_product_count(cursor, filter_sql, (), cache_key)
+                return jsonify({
+                    'items': [project(row, fields) for row in rows],
+                    'next_cursor': make_cursor(ranked[-1][1], ranked[-1][0]) if has_more and ranked else None,
+                    'total_estimate': total_estimate
+                })
+
+            # 상위 N개를 벗어난 페이지는 DB 키셋 조회
+            params = []
+            page_where = list(where)
+            if after is not None:
+                page_where.append(
+                    "(COALESCE(p.view_count, 0) < %s OR (COALESCE(p.view_count, 0) = %s AND p.product_id > %s))"
+                )
+                params += [after[0], after[0], after[1]]
+            sql = f"SELECT {select_sql} {from_sql}"
+            if page_where:
+                sql += f" WHERE {' AND '.join(page_where)}"
+            sql += " ORDER BY COALESCE(p.view_count, 0) DESC, p.product_id ASC LIMIT %s"
+            cursor.execute(sql, (*params, limit + 1))
+            rows = cursor.fetchall()
 
-            # 7. 조회수 기준 내림차순 정렬
-            base_sql += " ORDER BY p.view_count DESC"
-            cursor.execute(base_sql)
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = make_cursor(rows[-1]['view_count'], rows[-1]['product_id'])
 
-            # 8. 상품 목록 결과 반환
-            products = cursor.fetchall()
-            return jsonify(products)
+            # 8. 전체 개수 추정치는 첫 페이지에서만 계산
+            total_estimate = None
+            if after is None:
+                cache_key = tuple(sorted(combined_allergy_ids)) if where else None
+                total_estimate = _estimate_product_count(cursor, filter_sql, (), cache_key)
 
+            return jsonify({
+                'items': [project(row, fields) for row in rows],
+                'next_cursor': next_cursor,
+                'total_estimate': total_estimate
+            })
+
+    except Exception as e:
+        logger.error(f"Error in /api/products: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if connection:
+            connection.close()
+
+# =========================
+# 상품 검색 API
+# =========================
+@products_bp.route('/api/products/search', methods=['GET'])
+def search_products_route():
+    """
+    상품명/상세정보 n-gram 색인으로 상품을 검색합니다.
+    - q: 검색어 (공백/쉼표로 여러 개, 일치한 검색어가 많은 상품부터)
+    - limit: 개수 (기본 20, 최대 100)
+    - user_id / checked_allergies: 해당 알레르기 성분이 든 상품 제외
+    """
+    keywords = normalize_keywords(request.args.get('q', ''))
+    if not keywords:
+        return jsonify({'error': '검색어(q)를 입력해주세요.'}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_LIMIT, type=int), 1), MAX_PAGE_LIMIT)
+
+    checked_allergies = request.args.get('checked_allergies')
+    try:
+        checked_allergy_ids = list(map(int, checked_allergies.split(','))) if checked_allergies else []
+    except ValueError:
+        return jsonify({'error': 'Invalid allergy ids'}), 400
+    user_id = request.args.get('user_id', type=int)
+    user_allergy_ids = User.get_user_allergies(user_id) if user_id else []
+    allergy_mask = allergy_ids_to_mask(set(user_allergy_ids + checked_allergy_ids))
+
+    connection = None
+    try:
+        matches, total = search_products(keywords, limit=limit, allergy_mask=allergy_mask)
+        items = []
+        if matches:
+            connection = get_db_connection()
+            with connection.cursor() as cursor:
+                placeholders = ', '.join(['%s'] * len(matches))
+                cursor.execute(f"""
+                    SELECT product_id, food_products, category, price, img, view_count
+                    FROM products
+                    WHERE product_id IN ({placeholders})
+                """, tuple(product_id for product_id, _ in matches))
+                rows_by_id = {row['product_id']: row for row in cursor.fetchall()}
+            for product_id, match_count in matches:
+                row = rows_by_id.get(product_id)
+                if row:
+                    row['match_count'] = match_count
+                    items.append(row)
+        return jsonify({'items': items, 'total': total, 'keywords': keywords})
     except Exception as e:
-        print("Error in /api/products:", e)
+        logger.error(f"Error in /api/products/search: {e}")
         return jsonify({'error': str(e)}), 500
     finally:
-        connection.close()
+        if connection:
+            connection.close()
 
 # =========================
 # 상품 상세 정보 조회 API
 # =========================
 @products_bp.route('/api/products/<int:product_id>', methods=['GET'])
 def get_product_detail(product_id):
-    connection = get_db_connection()
-    try:
-        with connection.cursor() as cursor:
-            # 1. 해당 상품의 조회수 1 증가
-            update_sql = "UPDATE products SET view_count = view_count + 1 WHERE product_id = %s"
-            cursor.execute(update_sql, (product_id,))
-            connection.commit()
-
-            # 2. 상품 상세 정보 조회
-            sql = "SELECT * FROM products WHERE product_id = %s"
-            cursor.execute(sql, (product_id,))
-            product = cursor.fetchone()
-
-            if not product:
-                return jsonify({'error': 'Product not found'}), 404
-
-            # 3. 상품 이미지 리스트 조회
-            sql_images = "SELECT image_url FROM product_images WHERE product_id = %s"
-            cursor.execute(sql_images, (product_id,))
-            images = cursor.fetchall()
-            product['images'] = [img['image_url'] for img in images]
-
-            # 4. 상세 정보 반환
-            return jsonify(product)
-    finally:
-        connection.close()
+    # 1. 상품 + 이미지 목록을 한 번의 쿼리로 조회 (상품별 응답 캐시)
+    product = load_product_detail(product_id)
+    if not product:
+        return jsonify({'error': 'Product not found'}), 404
+
+    # 2. 조회수 1 증가 (버퍼에 모았다가 주기적으로 반영, 응답의 조회수는 이미 미반영분을 포함하므로 이번 조회만 더함)
+    record_view('products', product_id)
+    product['view_count'] += 1
+
+    # 3. 상세 정보 반환
+    return jsonify(product)
 
 # =========================
 # 사용자 알레르기 정보 조회 API (프론트에서 별도 호출용)
@@ -1,18 +1,74 @@
 from flask import Blueprint, request, jsonify
 from models.user import get_db_connection, User
+from models.food_catalog import get_food_catalog
 # 알레르기 맵핑 데이터
 from utils.allergy import (
     allergy_synonyms,
     allergy_id_name_map,
-    generate_recipe_allergy_filter_sql
+    allergy_ids_to_mask
 )
+from services.food_similarity import similar_foods
+from services.view_counter import record_view
+from services.popularity_ranking import get_ranking
+from utils.pagination import wants_pagination, parse_page_args, make_cursor, project
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 recipes_bp = Blueprint('recipes', __name__)
 
+# 목록 API에서 반환하는 레시피 필드 (fields= 로 고를 수 있는 값)
+RECIPE_LIST_FIELDS = ('Food_id', 'Food_name', 'Food_role', 'Food_img', 'Food_materials', 'Food_cooking_method')
+
+# 이보다 많은 레시피는 IN 목록 대신 food_cooking 전체를 한 번에 그룹 조회
+# (전체 목록 요청처럼 레시피 대부분이 대상이면 긴 IN 목록이나 여러 번의 나눠진 쿼리보다
+#  (Food_id, Food_cooking_id) 순서로 한 번 훑는 쪽이 싸고, 요청당 쿼리 수도 항상 1로 유지됨)
+_FIRST_STEP_IN_LIMIT = 1000
+
+
+def _first_cooking_steps(cursor, food_ids):
+    """
+    레시피별 첫 번째 조리 단계(Food_cooking_id가 가장 작은 행)를 한 번의 쿼리로 조회합니다.
+    반환값: {str(Food_id): Food_cooking_method} (요청한 레시피만)
+    """
+    if not food_ids:
+        return {}
+    where, params = '', ()
+    if len(food_ids) <= _FIRST_STEP_IN_LIMIT:
+        where = f"WHERE Food_id IN ({', '.join(['%s'] * len(food_ids))})"
+        params = tuple(food_ids)
+    cursor.execute(f"""
+        SELECT fc.Food_id, fc.Food_cooking_method
+        FROM food_cooking fc
+        JOIN (
+            SELECT Food_id, MIN(Food_cooking_id) AS first_id
+            FROM food_cooking
+            {where}
+            GROUP BY Food_id
+        ) first_step ON fc.Food_cooking_id = first_step.first_id
+    """, params)
+    wanted = {str(food_id) for food_id in food_ids}
+    return {str(row['Food_id']): row['Food_cooking_method'] for row in cursor.fetchall()
+            if str(row['Food_id']) in wanted}
+
+
 # =========================
 # 레시피 목록 조회 API
 # =========================
 @recipes_bp.route('/api/recipes', methods=['GET'])
 def get_recipes():
+    """
+    조회수 내림차순 레시피 목록.
+    limit / after=<view_count>,<Food_id> / fields= 중 하나라도 주면 키셋 페이지네이션 응답
+    ({'items', 'next_cursor', 'total_estimate'})을, 없으면 기존처럼 전체 배열을 반환합니다.
+    """
+    paginate = wants_pagination(request.args)
+    if paginate:
+        try:
+            limit, after, fields = parse_page_args(request.args, RECIPE_LIST_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
     # 1. 쿼리 파라미터에서 사용자 ID와 체크된 알레르기 ID 리스트 추출
     user_id = request.args.get('user_id', type=int)
     checked_allergies = request.args.get('checked_allergies')
@@ -21,7 +77,7 @@ def get_recipes():
     if checked_allergies:
         try:
             checked_allergy_ids = list(map(int, checked_allergies.split(',')))
-            print("Checked allergy IDs:", checked_allergy_ids)
+            logger.debug(f"Checked allergy IDs: {checked_allergy_ids}")
         except:
             return jsonify({'error': 'Invalid allergy ids'}), 400
     else:
@@ -29,71 +85,110 @@ def get_recipes():
 
     # 3. DB에서 사용자 알레르기 정보 조회
     user_allergy_ids = User.get_user_allergies(user_id) if user_id else []
-    print("User allergy IDs:", user_allergy_ids)
+    logger.debug(f"User allergy IDs: {user_allergy_ids}")
 
     # 4. 체크박스에서 선택한 항목만 사용자 알레르기에서 필터링
     effective_user_allergy_ids = [aid for aid in user_allergy_ids if aid in checked_allergy_ids]
 
     # 5. 사용자 알레르기와 체크된 알레르기 합치기 (중복 제거)
     combined_allergy_ids = list(set(effective_user_allergy_ids + checked_allergy_ids))
-    print("Combined allergy IDs:", combined_allergy_ids)
+    logger.debug(f"Combined allergy IDs: {combined_allergy_ids}")
 
     # 6. DB 연결 및 쿼리 실행
     connection = get_db_connection()
     try:
         with connection.cursor() as cursor:
-            # 6-1. 기본 레시피 조회 SQL
-            base_sql = """
-                SELECT Food_id, Food_name, Food_role, Food_img, Food_materials
-                FROM food r
-            """
-
-            # 6-2. 알레르기 필터가 있으면 WHERE 절 추가
-            if combined_allergy_ids:
-                allergy_filter = generate_recipe_allergy_filter_sql(combined_allergy_ids)
-                if allergy_filter:
-                    base_sql += f" WHERE {allergy_filter}"
-
-            # 6-3. 조회수 기준 내림차순 정렬
-            base_sql += " ORDER BY r.view_count DESC"
-
-            # 6-4. 레시피 목록 조회
-            cursor.execute(base_sql)
-            foods = cursor.fetchall()
-
-            result = []
-
-            # 6-5. 각 레시피별로 대표 조리법 1개 추가 조회
-            for food in foods:
-                cursor.execute("""
-                    SELECT Food_cooking_method
-                    FROM food_cooking
-                    WHERE Food_id = %s
-                    ORDER BY Food_cooking_id
-                    LIMIT 1
-                """, (food['Food_id'],))
-                cooking_row = cursor.fetchone()
-
-                food_data = {
-                    'Food_id': food['Food_id'],
-                    'Food_name': food['Food_name'],
-                    'Food_role': food['Food_role'],
-                    'Food_img': food['Food_img'],
-                    'Food_materials': food['Food_materials'],
-                    'Food_cooking_method': cooking_row['Food_cooking_method'] if cooking_row else ''
-                }
-
-                result.append(food_data)
+            # 6-1. 메모리에 유지하는 조회수 순위에서 알레르기 조합별로 걸러진 순서를 가져옴
+            #      (조회수 내림차순, 같은 조회수는 Food_id 순 → 페이지 경계가 흔들리지 않음)
+            catalog = get_food_catalog()
+            ranking = get_ranking('food')
+            allergy_mask = allergy_ids_to_mask(combined_allergy_ids)
+
+            # 6-2. 페이지네이션: after 커서 다음부터 limit개만 (대표 조리법도 이 페이지 것만 조회)
+            next_cursor = None
+            if paginate:
+                after_key = (-after[0], after[1]) if after is not None else None
+                ranked, has_more, total = ranking.page(allergy_mask, after_key, limit)
+                if has_more and ranked:
+                    next_cursor = make_cursor(ranked[-1][1], ranked[-1][0])
+                food_ids = [food_id for food_id, _ in ranked]
+            else:
+                food_ids, _ = ranking.filtered(allergy_mask)
+            foods = [food for food in map(catalog.get_food, food_ids) if food]
+
+            # 6-3. 레시피별 대표 조리법(첫 단계)을 한 번의 그룹 쿼리로 조회
+            need_steps = not paginate or not fields or 'Food_cooking_method' in fields
+            first_steps = _first_cooking_steps(cursor, [food['Food_id'] for food in foods]) if need_steps else {}
+
+            result = [{
+                'Food_id': food['Food_id'],
+                'Food_name': food['Food_name'],
+                'Food_role': food['Food_role'],
+                'Food_img': food['Food_img'],
+                'Food_materials': food['Food_materials'],
+                'Food_cooking_method': first_steps.get(str(food['Food_id']), '')
+            } for food in foods]
 
             # 7. 결과 반환
+            if paginate:
+                return jsonify({
+                    'items': [project(row, fields) for row in result],
+                    'next_cursor': next_cursor,
+                    'total_estimate': total
+                })
             return jsonify(result)
     except Exception as e:
-        print("Error in /api/recipes:", e)
+        logger.error(f"Error in /api/recipes: {e}")
         return jsonify({'error': str(e)}), 500
     finally:
         connection.close()
 
 
+# =========================
+# 비슷한 레시피 조회 API
+# =========================
+@recipes_bp.route('/api/recipes/<food_id>/similar', methods=['GET'])
+def get_similar_recipes(food_id):
+    """
+    임베딩 코사인 유사도 기준으로 비슷한 레시피 k개를 반환합니다.
+    - k: 개수 (기본 6, 최대 50)
+    - role: 같은 역할(밥, 반찬 등)로 제한, 'same'이면 기준 레시피와 같은 역할
+    - checked_allergies: 제외할 알레르기 ID (쉼표 구분)
+    - order=least: 가장 덜 비슷한 순서로 반환
+    """
+    k = min(request.args.get('k', 6, type=int), 50)
+    role = request.args.get('role')
+    least = request.args.get('order') == 'least'
+    checked_allergies = request.args.get('checked_allergies')
+    try:
+        allergy_ids = list(map(int, checked_allergies.split(','))) if checked_allergies else []
+    except ValueError:
+        return jsonify({'error': 'Invalid allergy ids'}), 400
+
+    try:
+        catalog = get_food_catalog()
+        food = catalog.get_food(food_id)
+        if not food:
+            return jsonify({'error': 'Recipe not found'}), 404
+        if role == 'same':
+            role = food['Food_role']
+
+        similar = similar_foods([food['Food_id']], k=k, role=role,
+                                allergy_mask=allergy_ids_to_mask(allergy_ids), least=least, catalog=catalog)
+        result = [{
+            'Food_id': f['Food_id'],
+            'Food_name': f['Food_name'],
+            'Food_role': f['Food_role'],
+            'Food_img': f['Food_img'],
+            'Food_materials': f['Food_materials'],
+            'similarity': f['similarity']
+        } for f in similar]
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in /api/recipes/<food_id>/similar: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 # =========================
 # 레시피 상세 정보 조회 API
 # =========================
@@ -102,15 +197,7 @@ def get_recipe_detail(food_id):
     connection = get_db_connection()
     try:
         with connection.cursor() as cursor:
-            # 1. 조회수 증가
-            cursor.execute("""
-                UPDATE food
-                SET view_count = view_count + 1
-                WHERE Food_id = %s
-            """, (food_id,))
-            connection.commit()
-
-            # 2. 레시피 상세 정보 조회
+            # 1. 레시피 상세 정보 조회
             cursor.execute("""
                 SELECT Food_id, Food_name, Food_img, Food_materials, Food_role
                 FROM food
@@ -121,6 +208,9 @@ def get_recipe_detail(food_id):
             
             if not recipe:
                 return jsonify({'error': 'Recipe not found'}), 404
+
+            # 2. 조회수 증가 (버퍼에 모았다가 주기적으로 반영)
+            record_view('food', recipe['Food_id'])
             
             # 3. (예시) allergy_ids 필드 추가 (실제 알레르기 정보 필요시 수정)
             recipe['allergy_ids'] = ''
@@ -159,20 +249,9 @@ def get_recipe_cooking(food_id):
 # =========================
 @recipes_bp.route('/api/recipe/<int:Food_id>/view', methods=['POST'])
 def increase_view_count(Food_id):
-    connection = get_db_connection()
+    # 조회수 증가분은 버퍼에 모았다가 주기적으로 한 번에 반영 (요청 경로에서 UPDATE/COMMIT 하지 않음)
     try:
-        with connection.cursor() as cursor:
-            # 1. 해당 레시피의 조회수 1 증가
-            cursor.execute("""
-                UPDATE food 
-                SET view_count = COALESCE(view_count, 0) + 1 
-                WHERE Food_id = %s
-            """, (Food_id,))
-            connection.commit()
-            
-            return jsonify({'message': 'View count increased successfully'}), 200
+        record_view('food', Food_id)
+        return jsonify({'message': 'View count increased successfully'}), 200
     except Exception as e:
-        connection.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        connection.close()
\ No newline at end of file
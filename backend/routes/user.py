@@ -1,23 +1,12 @@
 from flask import Blueprint, request, jsonify
-from models.user import User
-from utils.auth import token_required
+from models.user import get_db_connection, User
+from utils.auth import token_required, invalidate_user_principal
 from utils.password import hash_password
-import pymysql
-from config import DB_CONFIG            
+from utils.logger import get_logger
 
-user_bp = Blueprint('user', __name__)
+logger = get_logger(__name__)
 
-def get_db_connection():
-    """데이터베이스 연결을 생성하고 반환"""
-    return pymysql.connect(
-        host=DB_CONFIG['host'],
-        user=DB_CONFIG['user'],
-        password=DB_CONFIG['password'],
-        database=DB_CONFIG['database'],
-        port=DB_CONFIG['port'],
-        charset=DB_CONFIG['charset'],
-        cursorclass=pymysql.cursors.DictCursor
-    )
+user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/api/user/profile', methods=['PUT'])
 @token_required
@@ -77,6 +66,8 @@ def update_user_profile(current_user):
             
             cursor.execute(update_query, update_values)
             conn.commit()
+            # 캐시된 인증 사용자 정보가 바뀐 프로필을 반영하도록 무효화
+            invalidate_user_principal(user_id)
         
         cursor.close()
         conn.close()
@@ -87,7 +78,7 @@ def update_user_profile(current_user):
         }), 200
         
     except Exception as e:
-        print(f"프로필 업데이트 오류: {e}")
+        logger.error(f"프로필 업데이트 오류: {e}")
         return jsonify({
             'success': False,
             'message': '프로필 업데이트에 실패했습니다.'
@@ -137,6 +128,7 @@ def update_password(current_user):
         cursor.execute("UPDATE User SET password = %s WHERE User_id = %s", 
                       (hashed_new_password, user_id))
         conn.commit()
+        invalidate_user_principal(user_id)
         
         cursor.close()
         conn.close()
@@ -147,7 +139,7 @@ def update_password(current_user):
         }), 200
         
     except Exception as e:
-        print(f"비밀번호 변경 오류: {e}")
+        logger.error(f"비밀번호 변경 오류: {e}")
         return jsonify({
             'success': False,
             'message': '비밀번호 변경에 실패했습니다.'
@@ -171,7 +163,7 @@ def get_user_allergies(user_id):
         return ','.join(allergy_ids), 200
         
     except Exception as e:
-        print(f"알레르기 정보 조회 오류: {e}")
+        logger.error(f"알레르기 정보 조회 오류: {e}")
         return '', 200
 
 @user_bp.route('/api/user/<int:user_id>/allergies', methods=['PUT'])
@@ -208,7 +200,7 @@ def update_user_allergies(current_user, user_id):
         }), 200
         
     except Exception as e:
-        print(f"알레르기 정보 업데이트 오류: {e}")
+        logger.error(f"알레르기 정보 업데이트 오류: {e}")
         return jsonify({
             'success': False,
             'message': '알레르기 정보 업데이트에 실패했습니다.'
@@ -233,7 +225,7 @@ def get_all_allergies():
         }), 200
         
     except Exception as e:
-        print(f"알레르기 목록 조회 오류: {e}")
+        logger.error(f"알레르기 목록 조회 오류: {e}")
         return jsonify({
             'success': False,
             'allergies': []
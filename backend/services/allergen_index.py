@@ -0,0 +1,123 @@
+# 알레르기 비트마스크 색인 모듈
+# products(food_products/details_info)를 allergy_synonyms로 한 번 스캔해
+# 행마다 19비트 알레르기 마스크를 사이드 테이블에 저장. 원문이나 동의어 목록이 바뀐 행만 다시 계산(증분)
+# (음식 마스크는 음식 카탈로그 스냅샷(models.food_catalog)을 읽을 때 메모리에서 계산하므로 따로 저장하지 않음)
+#
+# 실행: python -m services.allergen_index [--full]
+import sys
+import time
+from config import get_db_connection
+from utils.allergy import compute_allergen_mask, ALLERGY_SYNONYMS_VERSION
+
+_BATCH_SIZE = 500
+_tables_ready = False
+
+# 색인 대상: (사이드 테이블, 원본 테이블, 키 컬럼, 텍스트 컬럼들)
+_INDEX_TARGETS = {
+    'products': ('product_allergen_mask', 'products', 'product_id', ('food_products', 'details_info')),
+}
+
+
+def ensure_allergen_mask_tables():
+    """마스크 사이드 테이블이 없으면 생성합니다. (프로세스당 한 번만 실행)"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `product_allergen_mask` (
+              `product_id` INT PRIMARY KEY,
+              `allergen_mask` INT UNSIGNED NOT NULL,
+              `source_hash` CHAR(32) NOT NULL,
+              `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        conn.commit()
+        _tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _source_hash_sql(alias, columns):
+    # 동의어 버전 + 원문으로 만든 해시. NULL과 빈 문자열을 구분하기 위해 ISNULL 플래그를 함께 넣음
+    parts = ', '.join(f"ISNULL({alias}.{c}), COALESCE({alias}.{c}, '')" for c in columns)
+    return f"MD5(CONCAT_WS(CHAR(31), %s, {parts}))"
+
+
+def index_allergen_masks(target, full=False):
+    """
+    target('products')의 알레르기 마스크를 계산해 저장합니다.
+    full=False면 마스크가 없거나 원문/동의어가 바뀐 행만 다시 계산합니다.
+    반환값: 갱신한 행 수
+    """
+    mask_table, source_table, key, columns = _INDEX_TARGETS[target]
+    ensure_allergen_mask_tables()
+
+    hash_sql = _source_hash_sql('s', columns)
+    select_columns = ', '.join(f"s.{c}" for c in columns)
+    sql = f"""
+        SELECT s.{key} AS row_key, {select_columns}, {hash_sql} AS source_hash
+        FROM {source_table} s
+        LEFT JOIN {mask_table} m ON m.{key} = s.{key}
+    """
+    params = [ALLERGY_SYNONYMS_VERSION]
+    if not full:
+        sql += f" WHERE m.{key} IS NULL OR m.source_hash <> {hash_sql}"
+        params.append(ALLERGY_SYNONYMS_VERSION)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, tuple(params))
+        rows = cursor.fetchall()
+
+        upsert_sql = f"""
+            INSERT INTO {mask_table} ({key}, allergen_mask, source_hash)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                allergen_mask = VALUES(allergen_mask),
+                source_hash = VALUES(source_hash)
+        """
+        batch = []
+        for row in rows:
+            mask = compute_allergen_mask(*(row[c] for c in columns))
+            batch.append((row['row_key'], mask, row['source_hash']))
+            if len(batch) >= _BATCH_SIZE:
+                cursor.executemany(upsert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(upsert_sql, batch)
+
+        # 원본에서 삭제된 행의 마스크 정리
+        cursor.execute(f"""
+            DELETE m FROM {mask_table} m
+            LEFT JOIN {source_table} s ON s.{key} = m.{key}
+            WHERE s.{key} IS NULL
+        """)
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def index_all_allergen_masks(full=False):
+    """색인 대상(상품)의 알레르기 마스크를 모두 갱신하고 대상별 갱신 행 수를 반환합니다."""
+    return {target: index_allergen_masks(target, full=full) for target in _INDEX_TARGETS}
+
+
+if __name__ == '__main__':
+    full_rebuild = '--full' in sys.argv[1:]
+    started = time.perf_counter()
+    counts = index_all_allergen_masks(full=full_rebuild)
+    elapsed = time.perf_counter() - started
+    print(f"알레르기 마스크 색인 완료 ({'전체' if full_rebuild else '증분'}, 동의어 버전 {ALLERGY_SYNONYMS_VERSION}): "
+          f"{counts} - {elapsed:.2f}초")
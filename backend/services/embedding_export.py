@@ -0,0 +1,25 @@
+# 음식 임베딩 파일 export 모듈
+# DB의 임베딩(food_embedding_blob, 미변환 행은 Food_Embedding 텍스트)을 하나의 float32 .npy 파일과
+# Food_id 인덱스로 내보냄. EMBEDDING_SOURCE=mmap인 워커들은 이 파일을 읽기 전용으로 매핑해 페이지 캐시를 공유하고,
+# CURRENT 파일이 바뀌면 다음 조회 때 새 버전으로 교체
+#
+# 실행: python -m services.embedding_export [출력 디렉터리]
+import sys
+import time
+from config import EMBEDDING_MMAP_DIR
+from models.food_embedding import load_embedding_matrix, export_embedding_file
+
+
+def export_embeddings(directory=EMBEDDING_MMAP_DIR):
+    """DB의 전체 임베딩을 새 버전 파일로 내보내고 (버전, 행 수, 차원)을 반환합니다."""
+    matrix = load_embedding_matrix()
+    version = export_embedding_file(matrix, directory)
+    return version, len(matrix), matrix.dim
+
+
+if __name__ == '__main__':
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else EMBEDDING_MMAP_DIR
+    started = time.perf_counter()
+    version, rows, dim = export_embeddings(target_dir)
+    elapsed = time.perf_counter() - started
+    print(f"임베딩 파일 export 완료 ({target_dir}, 버전 {version}): {rows}개 x {dim}차원 - {elapsed:.2f}초")
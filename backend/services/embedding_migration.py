@@ -0,0 +1,90 @@
+# 음식 임베딩 바이너리 변환 모듈
+# Food.Food_Embedding(쉼표 구분 텍스트)을 float32/float16 바이너리로 변환해 food_embedding_blob에 저장.
+# 원문이 바뀐 행만 다시 변환(증분)하며, 로더는 np.frombuffer로 복사 없이 읽음
+#
+# 실행: python -m services.embedding_migration [--full] [--float16]
+import sys
+import time
+from config import get_db_connection
+from models.food_embedding import (
+    ensure_embedding_table, parse_embedding, encode_embedding, DEFAULT_EMBEDDING_DTYPE
+)
+
+_BATCH_SIZE = 500
+
+
+def migrate_embeddings(dtype=DEFAULT_EMBEDDING_DTYPE, full=False):
+    """
+    Food_Embedding 텍스트를 바이너리로 변환해 저장합니다.
+    full=False면 바이너리가 없거나 원문/저장 형식이 바뀐 행만 변환합니다.
+    반환값: (변환한 행 수, 파싱에 실패해 건너뛴 행 수)
+    """
+    ensure_embedding_table()
+
+    sql = """
+        SELECT f.Food_id, f.Food_Embedding, MD5(f.Food_Embedding) AS source_hash
+        FROM Food f
+        LEFT JOIN food_embedding_blob b ON b.Food_id = f.Food_id
+        WHERE f.Food_Embedding IS NOT NULL AND f.Food_Embedding <> ''
+    """
+    params = ()
+    if not full:
+        sql += " AND (b.Food_id IS NULL OR b.source_hash <> MD5(f.Food_Embedding) OR b.dtype <> %s)"
+        params = (dtype,)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+        upsert_sql = """
+            INSERT INTO food_embedding_blob (Food_id, dtype, dim, embedding, source_hash)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                dtype = VALUES(dtype),
+                dim = VALUES(dim),
+                embedding = VALUES(embedding),
+                source_hash = VALUES(source_hash)
+        """
+        converted = 0
+        skipped = 0
+        batch = []
+        for row in rows:
+            vec = parse_embedding(row['Food_Embedding'])
+            if vec is None:
+                skipped += 1
+                continue
+            batch.append((row['Food_id'], dtype, len(vec), encode_embedding(vec, dtype), row['source_hash']))
+            converted += 1
+            if len(batch) >= _BATCH_SIZE:
+                cursor.executemany(upsert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(upsert_sql, batch)
+
+        # 원본 음식이 삭제됐거나 임베딩 텍스트가 비워진 행 정리
+        cursor.execute("""
+            DELETE b FROM food_embedding_blob b
+            LEFT JOIN Food f ON f.Food_id = b.Food_id
+            WHERE f.Food_id IS NULL OR f.Food_Embedding IS NULL OR f.Food_Embedding = ''
+        """)
+        conn.commit()
+        return converted, skipped
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    full_rebuild = '--full' in args
+    target_dtype = 'f2' if '--float16' in args else DEFAULT_EMBEDDING_DTYPE
+    started = time.perf_counter()
+    converted, skipped = migrate_embeddings(dtype=target_dtype, full=full_rebuild)
+    elapsed = time.perf_counter() - started
+    print(f"임베딩 바이너리 변환 완료 ({'전체' if full_rebuild else '증분'}, {target_dtype}): "
+          f"{converted}개 변환, {skipped}개 건너뜀 - {elapsed:.2f}초")
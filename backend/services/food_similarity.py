@@ -0,0 +1,115 @@
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+from models.food_catalog import get_food_catalog
+
+# Foods are ranked by the max cosine similarity to any of the query foods
+DEFAULT_TOP_K = 10
+
+
+class FoodSimilarityIndex:
+    """
+    Exact top-k cosine-similarity index over the catalog's food embeddings.
+
+    The embedding rows of every catalog food are L2-normalized once into a contiguous
+    (N x D) float32 matrix, with per-food role and allergen-mask arrays alongside, so a query
+    ("k most/least similar foods to these ids, within role R, without these allergens") is one
+    matrix-vector product, a boolean filter and an argpartition.
+    """
+
+    def __init__(self, foods: List[dict], embeddings):
+        rows = embeddings.rows([f['Food_id'] for f in foods]) if len(embeddings) else \
+            np.full(len(foods), -1, dtype=np.int64)
+        has_vec = rows >= 0
+        self.foods = [f for f, ok in zip(foods, has_vec) if ok]
+        self.position = {f['Food_id']: i for i, f in enumerate(self.foods)}
+        self.roles = np.array([f['Food_role'] for f in self.foods], dtype=object)
+        self.allergen_masks = np.array([f.get('allergen_mask') or 0 for f in self.foods], dtype=np.int64)
+
+        matrix = np.asarray(embeddings.matrix, dtype=np.float32)[rows[has_vec]] if len(self.foods) else \
+            np.zeros((0, embeddings.dim), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.vectors = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.foods)
+
+    def positions(self, food_ids: List) -> np.ndarray:
+        return np.array([self.position[fid] for fid in food_ids if fid in self.position], dtype=np.int64)
+
+    def max_similarity(self, food_ids: List, query_ids: List) -> np.ndarray:
+        """Max cosine similarity of each of food_ids to any query food (0 when either side has no vector)."""
+        out = np.zeros(len(food_ids), dtype=np.float64)
+        query = self.positions(query_ids)
+        if not len(query) or not len(food_ids):
+            return out
+        pos = np.array([self.position.get(fid, -1) for fid in food_ids], dtype=np.int64)
+        found = pos >= 0
+        if found.any():
+            out[found] = (self.vectors[pos[found]] @ self.vectors[query].T).max(axis=1)
+        return out
+
+    def query(self, food_ids: List, k: int = DEFAULT_TOP_K, role: Optional[str] = None,
+              allergy_mask: int = 0, exclude_ids: Optional[List] = None, least: bool = False) -> List[tuple]:
+        """
+        Return up to k (food dict, similarity) pairs, most similar first (least similar first if least=True).
+        The query foods themselves and exclude_ids are never returned.
+        """
+        query = self.positions(food_ids)
+        if not len(query) or k <= 0:
+            return []
+        scores = (self.vectors @ self.vectors[query].T).max(axis=1)
+
+        keep = np.ones(len(self.foods), dtype=bool)
+        keep[query] = False
+        if exclude_ids:
+            keep[self.positions(exclude_ids)] = False
+        if role is not None:
+            keep &= self.roles == role
+        if allergy_mask:
+            keep &= (self.allergen_masks & allergy_mask) == 0
+        candidates = np.flatnonzero(keep)
+        if not len(candidates):
+            return []
+
+        ranked = -scores[candidates] if not least else scores[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(ranked, k - 1)[:k]
+            candidates, ranked = candidates[top], ranked[top]
+        order = candidates[np.argsort(ranked, kind='stable')]
+        return [(self.foods[i], float(scores[i])) for i in order]
+
+
+_index: Optional[FoodSimilarityIndex] = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index(catalog=None) -> FoodSimilarityIndex:
+    """
+    Index for the current catalog snapshot; rebuilt only when the snapshot or its
+    embedding matrix (e.g. a new memory-mapped file version) changes.
+    """
+    global _index, _index_source
+    catalog = catalog or get_food_catalog()
+    embeddings = catalog.embeddings
+
+    def is_current():
+        return _index is not None and _index_source[0] == catalog.version and _index_source[1] is embeddings
+
+    if is_current():
+        return _index
+    with _index_lock:
+        if not is_current():
+            _index = FoodSimilarityIndex(catalog.foods, embeddings)
+            _index_source = (catalog.version, embeddings)
+        return _index
+
+
+def similar_foods(food_ids: List, k: int = DEFAULT_TOP_K, role: Optional[str] = None, allergy_mask: int = 0,
+                  exclude_ids: Optional[List] = None, least: bool = False, catalog=None) -> List[Dict]:
+    """Convenience wrapper: query results as food dicts with a 'similarity' field added."""
+    index = get_similarity_index(catalog)
+    return [dict(food, similarity=round(score, 6))
+            for food, score in index.query(food_ids, k, role, allergy_mask, exclude_ids, least)]
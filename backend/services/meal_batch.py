@@ -0,0 +1,148 @@
+# 전체 사용자 식단 일괄 생성 모듈 (정기 배치용)
+# 1) user_allergy를 한 번 읽어 알레르기 조합이 같은 사용자끼리 묶고
+# 2) 그룹마다 알레르기 필터를 한 번만 적용한 음식 목록을 만들어
+# 3) 프로세스 풀에서 사용자별 식단을 병렬로 구성한 뒤
+# 4) Meal / meal_nutrition을 save_meal_plans로 묶어서 저장 (처리량: 사용자/초 출력)
+#
+# 실행: python -m services.meal_batch [--days 30] [--start 2025-01-01] [--workers 4] [--users 1,2,3] [--dry-run]
+import argparse
+import datetime
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import get_db_connection
+from models.food_catalog import get_food_catalog
+from services.meal_plan import build_meal_plan, save_meal_plans
+from utils.allergy import filter_recipes_by_allergy
+
+# 워커 한 작업에 넣을 사용자 수 / 한 번에 저장할 식단 행 수
+_USERS_PER_TASK = 50
+_FLUSH_ROWS = 5000
+
+# 워커 프로세스에 한 번만 전달되는 그룹별 음식 목록
+_group_foods = {}
+
+
+def load_allergy_groups(user_ids=None):
+    """
+    사용자들을 알레르기 조합별로 묶습니다.
+    반환값: {frozenset(알레르기 ID): [User_id, ...]} (알레르기가 없으면 빈 집합)
+    """
+    sql = """
+        SELECT u.User_id, ua.Allerg_id
+        FROM User u
+        LEFT JOIN user_allergy ua ON ua.User_id = u.User_id
+    """
+    params = ()
+    if user_ids:
+        sql += f" WHERE u.User_id IN ({', '.join(['%s'] * len(user_ids))})"
+        params = tuple(user_ids)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    allergies = {}
+    for row in rows:
+        ids = allergies.setdefault(row['User_id'], set())
+        if row['Allerg_id'] is not None:
+            ids.add(row['Allerg_id'])
+
+    groups = {}
+    for user_id, ids in allergies.items():
+        groups.setdefault(frozenset(ids), []).append(user_id)
+    return groups
+
+
+def build_group_foods(groups, catalog=None):
+    """그룹마다 알레르기 필터를 한 번 적용한 음식 목록 (워커로 보내기 위해 필요한 필드만 남김)"""
+    catalog = catalog or get_food_catalog()
+    group_foods = {}
+    for allergy_ids in groups:
+        foods = filter_recipes_by_allergy(catalog.foods, list(allergy_ids)) if allergy_ids else catalog.foods
+        group_foods[allergy_ids] = [{'Food_id': f['Food_id'], 'Food_role': f['Food_role']} for f in foods]
+    return group_foods
+
+
+def _init_worker(group_foods):
+    global _group_foods
+    _group_foods = group_foods
+
+
+def _plan_users(allergy_ids, user_ids, start_date, days, seed):
+    """워커: 같은 알레르기 그룹 사용자들의 식단을 메모리에서 구성합니다. (DB 접근 없음)"""
+    rng = random.Random(seed)
+    foods = _group_foods[allergy_ids]
+    entries = []
+    for user_id in user_ids:
+        entries.extend(build_meal_plan(user_id, start_date, days, foods=foods, rng=rng))
+    return len(user_ids), entries
+
+
+def run_batch(start_date, days, workers=None, user_ids=None, dry_run=False, seed=None):
+    """
+    전체(또는 user_ids) 사용자의 days일치 식단을 생성해 저장하고 통계를 반환합니다.
+    workers=0이면 프로세스 풀 없이 현재 프로세스에서 실행합니다.
+    """
+    started = time.perf_counter()
+    groups = load_allergy_groups(user_ids)
+    group_foods = build_group_foods(groups)
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    tasks = []
+    for allergy_ids, members in groups.items():
+        for i in range(0, len(members), _USERS_PER_TASK):
+            tasks.append((allergy_ids, members[i:i + _USERS_PER_TASK], start_date, days, seed + len(tasks)))
+
+    stats = {'users': 0, 'groups': len(groups), 'meals': 0, 'saved': 0}
+    pending = []
+
+    def collect(n_users, entries):
+        stats['users'] += n_users
+        stats['meals'] += len(entries)
+        pending.extend(entries)
+        if not dry_run and len(pending) >= _FLUSH_ROWS:
+            stats['saved'] += len(save_meal_plans(pending))
+            pending.clear()
+
+    if workers == 0:
+        _init_worker(group_foods)
+        for task in tasks:
+            collect(*_plan_users(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(group_foods,)) as pool:
+            futures = [pool.submit(_plan_users, *task) for task in tasks]
+            for future in as_completed(futures):
+                collect(*future.result())
+
+    if not dry_run and pending:
+        stats['saved'] += len(save_meal_plans(pending))
+
+    elapsed = time.perf_counter() - started
+    stats['elapsed_sec'] = round(elapsed, 3)
+    stats['users_per_sec'] = round(stats['users'] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='전체 사용자 식단 일괄 생성')
+    parser.add_argument('--days', type=int, default=30, help='생성할 일수 (기본 30)')
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help='시작 날짜 YYYY-MM-DD (기본 오늘)')
+    parser.add_argument('--workers', type=int, default=None, help='워커 프로세스 수 (기본 CPU 수, 0이면 단일 프로세스)')
+    parser.add_argument('--users', type=lambda v: [int(x) for x in v.split(',') if x], default=None,
+                        help='대상 사용자 ID (쉼표 구분, 기본 전체)')
+    parser.add_argument('--dry-run', action='store_true', help='식단만 구성하고 저장하지 않음')
+    args = parser.parse_args()
+
+    result = run_batch(args.start, args.days, args.workers, args.users, args.dry_run)
+    print(f"식단 일괄 생성 완료 ({args.start}부터 {args.days}일{', 저장 안 함' if args.dry_run else ''}): "
+          f"사용자 {result['users']}명 / 알레르기 그룹 {result['groups']}개 / 식단 {result['meals']}개 "
+          f"(저장 {result['saved']}개) - {result['elapsed_sec']}초, {result['users_per_sec']}명/초")
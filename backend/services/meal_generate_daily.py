@@ -1,9 +1,44 @@
 import datetime
 import random
-import traceback
+import numpy as np
 from services.meal_filter import filter_foods_by_allergy
+from models.food_catalog import get_food_catalog
+from models.food_preference import get_user_preference
 from models.meal import Meal
 from services.meal_nutrition import save_meal_total_nutrition
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 선호도 점수 1점 차이가 선택 확률에 주는 배율 (exp(PREFERENCE_TEMPERATURE x 점수))
+PREFERENCE_TEMPERATURE = 1.0
+
+
+def _preference_weights(foods, preference, embeddings):
+    """후보 음식별 선택 가중치 (선호도가 없으면 None → 균등 무작위)"""
+    if not foods or preference is None or preference.empty:
+        return None
+    scores = preference.scores([f['Food_id'] for f in foods], embeddings)
+    return np.exp(PREFERENCE_TEMPERATURE * np.clip(scores, -5, 5)).tolist()
+
+
+def _choice(foods, weights):
+    if not foods:
+        return None
+    return random.choices(foods, weights=weights)[0] if weights else random.choice(foods)
+
+
+def _sample_two(foods, weights):
+    """가중치에 따라 서로 다른 음식 최대 2개를 고릅니다."""
+    if not weights:
+        return random.sample(foods, min(2, len(foods))) if foods else []
+    first = random.choices(range(len(foods)), weights=weights)[0]
+    rest = [i for i in range(len(foods)) if i != first]
+    if not rest:
+        return [foods[first]]
+    second = random.choices(rest, weights=[weights[i] for i in rest])[0]
+    return [foods[first], foods[second]]
+
 
 def generate_daily_meal(user_id, date=None):
     """
@@ -13,10 +48,10 @@ def generate_daily_meal(user_id, date=None):
         date = datetime.date.today()
 
     try:
-        print(f"🌟 하루 식단 생성: user_id={user_id}, date={date}")
-
         # ✅ 1️⃣ 사용자 알러지 기반 음식 데이터 필터링
-        filtered_foods = filter_foods_by_allergy(user_id)
+        catalog = get_food_catalog()
+        filtered_foods = filter_foods_by_allergy(user_id, catalog)
+        preference = get_user_preference(user_id)
 
         # ✅ 2️⃣ 카테고리별 음식 분류
         rice_list = [f for f in filtered_foods if f['Food_role'] == '밥']
@@ -25,18 +60,13 @@ def generate_daily_meal(user_id, date=None):
         main_dish_list = [f for f in filtered_foods if f['Food_role'] == '일품']
         dessert_list = [f for f in filtered_foods if f['Food_role'] == '후식']
 
-        # ✅ 3️⃣ 랜덤으로 음식 선택
-        rice = random.choice(rice_list) if rice_list else None
-        soup = random.choice(soup_list) if soup_list else None
-        side_dishes = random.sample(side_dishes_list, min(2, len(side_dishes_list))) if side_dishes_list else []
-        main_dish = random.choice(main_dish_list) if main_dish_list else None
-        dessert = random.choice(dessert_list) if dessert_list else None
-
-        print(f"  🍚 선택 결과: rice={rice['Food_id'] if rice else None}, "
-              f"soup={soup['Food_id'] if soup else None}, "
-              f"side_dishes={[d['Food_id'] for d in side_dishes] if side_dishes else []}, "
-              f"main_dish={main_dish['Food_id'] if main_dish else None}, "
-              f"dessert={dessert['Food_id'] if dessert else None}")
+        # ✅ 3️⃣ 랜덤으로 음식 선택 (식단일지 평점으로 학습한 선호도만큼 가중)
+        embeddings = catalog.embeddings
+        rice = _choice(rice_list, _preference_weights(rice_list, preference, embeddings))
+        soup = _choice(soup_list, _preference_weights(soup_list, preference, embeddings))
+        side_dishes = _sample_two(side_dishes_list, _preference_weights(side_dishes_list, preference, embeddings))
+        main_dish = _choice(main_dish_list, _preference_weights(main_dish_list, preference, embeddings))
+        dessert = _choice(dessert_list, _preference_weights(dessert_list, preference, embeddings))
 
         # ✅ 4️⃣ 각 항목의 음식 ID
         rice_id = rice['Food_id'] if rice else None
@@ -57,9 +87,10 @@ def generate_daily_meal(user_id, date=None):
             MainDish_id=main_dish_id,
             Dessert_id=dessert_id
         )
-        print("  📝 식단 저장 중...")
         meal_id = meal.save()
-        print(f"  ✅ 식단 저장 완료: meal_id={meal_id}")
+        logger.info('하루 식단 생성', extra={'fields': {
+            'user_id': user_id, 'date': date, 'meal_id': meal_id,
+            'foods': [rice_id, soup_id, side_dish1_id, side_dish2_id, main_dish_id, dessert_id]}})
 
         # ✅ 6️⃣ 음식 ID 리스트로 영양소 총합 저장
         food_ids = [f['Food_id'] for f in [rice, soup, main_dish, dessert] + side_dishes if f]
@@ -68,6 +99,5 @@ def generate_daily_meal(user_id, date=None):
         return meal_id
 
     except Exception as e:
-        print(f"❌ 하루 식단 생성 오류: {e}")
-        traceback.print_exc()
+        logger.exception(f'하루 식단 생성 오류: {e}', extra={'fields': {'user_id': user_id, 'date': date}})
         return None
@@ -1,25 +1,14 @@
 import datetime
-from services.meal_generate_daily import generate_daily_meal
+from services.meal_plan import generate_meal_plan
 
-def generate_weekly_meal(user_id, start_date=None):
+def generate_weekly_meal(user_id, start_date=None, mode='variety'):
     """
     7일치(일주일) 식단을 생성합니다.
+    알레르기 필터는 한 번만 하고, 7일치를 한 트랜잭션으로 저장합니다.
+    mode='variety'(기본): 기간 전체 최적화, 'random': 날마다 독립 무작위 선택
     """
     if start_date is None:
         start_date = datetime.date.today()
 
-    print(f"🌟 7일치 식단 생성 시작: user_id={user_id}, start_date={start_date}")
-    meals_created = 0
-    current_date = start_date
-
-    for i in range(7):
-        meal_id = generate_daily_meal(user_id, current_date)
-        if meal_id:
-            meals_created += 1
-            print(f"  ✅ {i+1}일차 식단 생성 완료!")
-        else:
-            print(f"  ❌ {i+1}일차 식단 생성 실패")
-        current_date += datetime.timedelta(days=1)
-
-    print(f"🎉 7일치 식단 생성 완료: {meals_created}일치 생성됨")
+    meals_created = generate_meal_plan(user_id, start_date, 7, mode=mode)
     return meals_created
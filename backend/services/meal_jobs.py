@@ -0,0 +1,93 @@
+# 식단 생성 비동기 작업 모듈
+# 주간/월간 식단 생성 요청을 meal_job 테이블에 등록하고 로컬 스레드 풀에서 실행.
+# 라우트는 작업 ID만 바로 반환하고, 진행 상황과 결과는 /api/meals/jobs/<id>로 조회
+import atexit
+import datetime
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import MEAL_JOB_WORKERS, MEAL_JOB_STALE_SECONDS
+from models.meal_job import MealJob
+from services.meal_plan import build_meal_plan, save_meal_plans
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 작업 종류 → 생성할 일수
+MEAL_JOB_DAYS = {'weekly': 7, 'monthly': 30}
+
+_executor = None
+_executor_lock = threading.Lock()
+_WORKER_NAME = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _get_executor():
+    """작업 스레드 풀을 반환합니다. 처음 만들 때 이전 프로세스에서 끝나지 않은 작업을 다시 등록합니다."""
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MEAL_JOB_WORKERS, thread_name_prefix='meal-job')
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+            try:
+                recovered = MealJob.get_recoverable_ids(MEAL_JOB_STALE_SECONDS)
+                for job_id in recovered:
+                    _executor.submit(_run_job, job_id, MEAL_JOB_STALE_SECONDS)
+                if recovered:
+                    logger.info(f"미완료 작업 {len(recovered)}개 다시 등록")
+            except Exception as e:
+                logger.warning(f"미완료 작업 복구 실패: {e}")
+    return _executor
+
+
+def submit_meal_plan_job(user_id, kind, start_date, mode='variety'):
+    """
+    kind('weekly'/'monthly') 식단 생성 작업을 등록하고 작업 ID를 바로 반환합니다.
+    """
+    if kind not in MEAL_JOB_DAYS:
+        raise ValueError(f'지원하지 않는 작업 종류: {kind}')
+    job_id = MealJob.create(user_id, kind, {
+        'start_date': start_date.isoformat(),
+        'days': MEAL_JOB_DAYS[kind],
+        'mode': mode
+    })
+    _get_executor().submit(_run_job, job_id)
+    return job_id
+
+
+def get_meal_job(job_id):
+    """작업 상태를 조회합니다. (조회만 해도 이전 프로세스의 미완료 작업 복구가 시작됨)"""
+    _get_executor()
+    return MealJob.get(job_id)
+
+
+def _run_job(job_id, stale_seconds=None):
+    # 다른 워커가 이미 가져간 작업이면 건너뜀
+    if not MealJob.claim(job_id, _WORKER_NAME, stale_seconds):
+        return
+    try:
+        job = MealJob.get(job_id)
+        user_id = job['User_id']
+        start_date = datetime.date.fromisoformat(job['params']['start_date'])
+        days = int(job['params']['days'])
+
+        MealJob.update_progress(job_id, 10, '식단 구성 중')
+        plan = build_meal_plan(user_id, start_date, days, mode=job['params'].get('mode', 'random'))
+
+        MealJob.update_progress(job_id, 60, '식단 저장 중')
+        saved = save_meal_plans(plan)
+
+        MealJob.finish(job_id, {
+            'meals_created': len(saved),
+            'start_date': start_date.isoformat(),
+            'meal_ids': [e['meal_id'] for e in saved]
+        })
+        logger.info(f"작업 {job_id} 완료: user_id={user_id}, {len(saved)}일치")
+    except Exception as e:
+        logger.exception(f"작업 {job_id} 실패: {e}")
+        try:
+            MealJob.fail(job_id, e)
+        except Exception:
+            logger.exception(f"작업 {job_id} 실패 상태 저장 오류")
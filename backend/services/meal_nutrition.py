@@ -1,51 +1,29 @@
-from models.food_nutrition import FoodNutrition
+import logging
+from models.food_nutrition import FoodNutrition, get_nutrition_by_food_ids
 from models.meal_nutrition import MealNutrition
+from utils.logger import get_logger, sampled
+
+logger = get_logger(__name__)
 
 def get_nutrition_by_food_id(food_id, external_cursor=None):
     """
     특정 food_id의 영양소 정보를 dict로 반환.
     외부에서 cursor를 넘겨주면 그것을 사용 (커서 닫기는 외부에서 처리).
+    여러 음식을 조회할 때는 get_nutrition_by_food_ids로 한 번에 조회할 것.
     """
-    cursor = external_cursor
-    close_cursor = False
-
-    if cursor is None:
-        from config import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        close_cursor = True  # 새로 열었으면 닫아야 함
-
-    cursor.execute("SELECT * FROM food_nutrition WHERE Food_id = %s", (food_id,))
-    rows = cursor.fetchall()  # ✅ fetchall()로 결과를 다 읽어줌
-
-    if close_cursor:
-        cursor.close()
-        conn.close()
-
-    if rows:
-        # 어차피 한 줄만 있을 테니 첫 번째 결과만 반환
-        row = rows[0]
-        return {
-            'calories': row['calories'],
-            'carbohydrate': row['carbohydrate'],
-            'protein': row['protein'],
-            'fat': row['fat'],
-            'sodium': row['sodium']
-        }
-    else:
-        return {
-            'calories': 0,
-            'carbohydrate': 0,
-            'protein': 0,
-            'fat': 0,
-            'sodium': 0
-        }
+    return get_nutrition_by_food_ids([food_id], external_cursor=external_cursor).get(food_id) or {
+        'calories': 0,
+        'carbohydrate': 0,
+        'protein': 0,
+        'fat': 0,
+        'sodium': 0
+    }
 
 
 def save_meal_total_nutrition(meal_id, food_ids):
     """
     음식 ID 리스트를 받아서 식단의 총합 영양소를 계산 후 1/3로 나눠 저장.
-    커넥션/커서를 한 번만 열고 재사용하여 Unread result 오류 방지.
+    영양소는 get_nutrition_by_food_ids로 한 번에 조회하고, 커넥션은 저장에만 사용.
     """
     from config import get_db_connection
     conn = get_db_connection()
@@ -54,9 +32,10 @@ def save_meal_total_nutrition(meal_id, food_ids):
         total_calories = total_carbohydrate = total_protein = total_fat = total_sodium = 0
         food_nutrition_list = []
 
-        # 🔥 같은 커서를 재사용!
+        # 🔥 음식별 영양소를 한 번에 조회 (스냅샷에 없는 음식만 같은 커서로 IN 쿼리)
+        nutrition_map = get_nutrition_by_food_ids(food_ids, external_cursor=cursor)
         for fid in food_ids:
-            n = get_nutrition_by_food_id(fid, external_cursor=cursor)
+            n = nutrition_map.get(fid) or {'calories': 0, 'carbohydrate': 0, 'protein': 0, 'fat': 0, 'sodium': 0}
             food_nutrition_list.append((fid, n))
             total_calories += n['calories']
             total_carbohydrate += n['carbohydrate']
@@ -83,12 +62,13 @@ def save_meal_total_nutrition(meal_id, food_ids):
         )
         meal_nutrition.save(external_conn=conn)
 
-        # 터미널 출력
-        print(f"\n[식단 저장] meal_id={meal_id}")
-        for fid, n in food_nutrition_list:
-            print(f"  - Food_id={fid} | 칼로리={n['calories']} 탄수화물={n['carbohydrate']} 단백질={n['protein']} 지방={n['fat']} 나트륨={n['sodium']}")
-        print(f"[식단 총합(1/3)] 칼로리={total_calories} 탄수화물={total_carbohydrate} 단백질={total_protein} 지방={total_fat} 나트륨={total_sodium}\n")
-        print(f"✅ meal_id={meal_id}의 영양소 정보(1/3) 저장 완료!")
+        # 음식별 영양소 상세는 DEBUG에서 일부 요청만 기록 (LOG_SAMPLE_RATE)
+        if logger.isEnabledFor(logging.DEBUG) and sampled():
+            for fid, n in food_nutrition_list:
+                logger.debug('식단 음식 영양소', extra={'fields': {'meal_id': meal_id, 'food_id': fid, **n}})
+        logger.info('식단 영양소 저장', extra={'fields': {
+            'meal_id': meal_id, 'calories': total_calories, 'carbohydrate': total_carbohydrate,
+            'protein': total_protein, 'fat': total_fat, 'sodium': total_sodium}})
     finally:
         cursor.close()
         conn.close()
@@ -0,0 +1,174 @@
+import datetime
+import time
+import numpy as np
+from typing import Dict, Optional
+from models.recommended_meal import RecommendedMeal
+from services.meal_scoring import ComboScorer, MEAL_SLOTS, NUTRIENT_KEYS, target_vector, weight_vector
+
+# save_meal_total_nutrition stores (sum of the 6 foods) / 3, and that stored value is what the
+# frontend compares against Recommended_meal, so the target for the raw sum is 3x the recommendation.
+MEAL_NUTRITION_DIVISOR = 3
+
+SIDE_SLOTS = [s for s, role in enumerate(MEAL_SLOTS) if role == '반찬']
+
+# Target used when the child's age has no Recommended_meal row (the refresh route's long-standing default)
+DEFAULT_MEAL_TARGET = {'calories': 600, 'carbohydrate': 75, 'protein': 20, 'fat': 20, 'sodium': 700}
+
+
+def calculate_age(birth, reference: Optional[datetime.date] = None) -> Optional[int]:
+    """Full age in years on the reference date (same rule as the frontend's calculateAge)."""
+    if not birth:
+        return None
+    if isinstance(birth, str):
+        try:
+            birth = datetime.date.fromisoformat(birth[:10])
+        except ValueError:
+            return None
+    if isinstance(birth, datetime.datetime):
+        birth = birth.date()
+    reference = reference or datetime.date.today()
+    age = reference.year - birth.year
+    if (reference.month, reference.day) < (birth.month, birth.day):
+        age -= 1
+    return age
+
+
+def recommended_meal_target(age: Optional[int]) -> Optional[Dict[str, float]]:
+    """Target totals for one generated meal from Recommended_meal, or None if there is no row for the age."""
+    if age is None:
+        return None
+    row = RecommendedMeal.get_by_age(age)
+    if not row:
+        return None
+    return {k: float(row.get(k) or 0) * MEAL_NUTRITION_DIVISOR for k in NUTRIENT_KEYS}
+
+
+def meal_target_for(kid_birth, reference: Optional[datetime.date] = None) -> Dict[str, float]:
+    """Recommended_meal target for the child's age on the reference date, or DEFAULT_MEAL_TARGET."""
+    return recommended_meal_target(calculate_age(kid_birth, reference)) or dict(DEFAULT_MEAL_TARGET)
+
+
+def relative_weights(target: Dict[str, float]) -> Dict[str, float]:
+    """Weight each nutrient by 1/target so deviations are compared in relative terms (kcal vs mg)."""
+    return {k: (1.0 / float(target[k])) if target.get(k) else 0.0 for k in NUTRIENT_KEYS}
+
+
+class MealOptimizer:
+    """
+    Local-search solver for nutrition-targeted meal assembly over the ComboScorer objective.
+
+    1. Per-role pruning: each slot keeps the max_candidates foods closest to an even per-slot
+       share of the target (plus their similarity/preference penalty).
+    2. Seeding: the best of a vectorized random sample.
+    3. Best-improvement coordinate descent: for each slot, every candidate is evaluated at once
+       with the other five slots fixed; repeat until no slot improves (a local optimum).
+    4. Perturbation: re-draw two random slots of the incumbent and descend again, until the
+       time budget runs out.
+    """
+
+    def __init__(self, scorer: ComboScorer, target: Dict[str, float],
+                 weights: Optional[Dict[str, float]] = None, max_candidates: Optional[int] = 200):
+        self.scorer = scorer
+        self.target = target_vector(target)
+        self.weights = weight_vector(weights)
+
+        share = self.target / len(MEAL_SLOTS)
+        self.slot_candidates = []
+        for cands in scorer.slot_candidates:
+            if max_candidates and len(cands) > max_candidates:
+                cost = (np.abs(scorer.nutrition[cands] - share) * self.weights).sum(axis=1) + scorer.penalty[cands]
+                cands = cands[np.argpartition(cost, max_candidates - 1)[:max_candidates]]
+            self.slot_candidates.append(cands)
+
+    def _score(self, combo: np.ndarray) -> float:
+        picked = combo[combo >= 0]
+        totals = self.scorer.nutrition[picked].sum(axis=0)
+        return float((np.abs(totals - self.target) * self.weights).sum() + self.scorer.penalty[picked].sum())
+
+    def _descend(self, combo: np.ndarray, score: float):
+        """Coordinate descent to a local optimum; returns (combo, score, evaluated candidates)."""
+        nutrition = self.scorer.nutrition
+        penalty = self.scorer.penalty
+        evaluated = 0
+        improved = True
+        while improved:
+            improved = False
+            for slot, cands in enumerate(self.slot_candidates):
+                if len(cands) == 0:
+                    continue
+                current = combo[slot]
+                picked = combo[combo >= 0]
+                base_totals = nutrition[picked].sum(axis=0)
+                base_penalty = penalty[picked].sum()
+                if current >= 0:
+                    base_totals = base_totals - nutrition[current]
+                    base_penalty -= penalty[current]
+                new_scores = (np.abs(base_totals + nutrition[cands] - self.target) * self.weights).sum(axis=1) \
+                    + base_penalty + penalty[cands]
+                if slot in SIDE_SLOTS:
+                    other = combo[SIDE_SLOTS[1] if slot == SIDE_SLOTS[0] else SIDE_SLOTS[0]]
+                    new_scores[cands == other] = np.inf
+                evaluated += len(cands)
+                best = int(np.argmin(new_scores))
+                if new_scores[best] < score - 1e-9:
+                    combo[slot] = cands[best]
+                    score = float(new_scores[best])
+                    improved = True
+        return combo, score, evaluated
+
+    def solve(self, time_budget: float = 0.05, rng: Optional[np.random.Generator] = None, n_seeds: int = 512):
+        """
+        Search for the lowest-score combo within time_budget seconds.
+        Returns (combo index array or None, score, stats dict).
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget
+        rng = rng or np.random.default_rng()
+        if not any(len(c) for c in self.slot_candidates):
+            return None, float('inf'), {'iterations': 0, 'evaluated': 0, 'elapsed_ms': 0.0}
+
+        # Seed from a vectorized random sample restricted to the pruned candidates
+        seeds = self.scorer.sample(n_seeds, rng, self.slot_candidates)
+        seed_scores, _ = self.scorer.score_array(seeds, self.target, self.weights)
+        best_combo = seeds[int(np.argmin(seed_scores))].copy()
+        best_combo, best_score, evaluated = self._descend(best_combo, float(seed_scores.min()))
+        evaluated += n_seeds
+
+        iterations = 1
+        filled = [s for s, c in enumerate(self.slot_candidates) if len(c)]
+        while time.perf_counter() < deadline and len(filled) > 1:
+            combo = best_combo.copy()
+            for slot in rng.choice(filled, size=min(2, len(filled)), replace=False):
+                cands = self.slot_candidates[slot]
+                combo[slot] = cands[rng.integers(0, len(cands))]
+            if combo[SIDE_SLOTS[0]] >= 0 and combo[SIDE_SLOTS[0]] == combo[SIDE_SLOTS[1]]:
+                continue
+            combo, score, n = self._descend(combo, self._score(combo))
+            evaluated += n
+            iterations += 1
+            if score < best_score - 1e-9:
+                best_combo, best_score = combo, score
+
+        stats = {
+            'iterations': iterations,
+            'evaluated': evaluated,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+        return best_combo, best_score, stats
+
+
+def optimize_meal(scorer: ComboScorer, target: Dict[str, float], weights: Optional[Dict[str, float]] = None,
+                  time_budget: float = 0.05, max_candidates: Optional[int] = 200,
+                  rng: Optional[np.random.Generator] = None):
+    """
+    Solve for the best meal and return it in ComboScorer.best_combo's shape:
+    (list of food dicts or None per slot, totals dict, score), or None if there are no candidates.
+    """
+    if not scorer.foods:
+        return None
+    combo, score, stats = MealOptimizer(scorer, target, weights, max_candidates).solve(time_budget, rng)
+    if combo is None:
+        return None
+    picked = [scorer.foods[i] if i >= 0 else None for i in combo]
+    totals = scorer.nutrition[combo[combo >= 0]].sum(axis=0)
+    return picked, dict(zip(NUTRIENT_KEYS, totals.tolist())), score
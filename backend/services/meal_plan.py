@@ -0,0 +1,207 @@
+# 여러 날짜 식단 일괄 생성 모듈
+# 알레르기 필터와 영양소 조회를 한 번만 하고, N일치 식단을 메모리에서 만든 뒤
+# Meal / meal_nutrition을 여러 행 INSERT로 한 트랜잭션에 저장 (하루씩 저장할 때의 수백 번 왕복을 몇 번으로 줄임)
+import datetime
+import random
+from config import get_db_connection
+from models.food_catalog import get_food_catalog
+from models.food_nutrition import get_nutrition_by_food_ids
+from models.user import User
+from services.meal_filter import filter_foods_by_allergy
+from services.meal_optimizer import meal_target_for, relative_weights
+from services.meal_scoring import ComboScorer
+from services.meal_variety import plan_variety
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Meal 테이블의 음식 컬럼 (저장 순서)
+MEAL_FOOD_COLUMNS = ('Rice_id', 'Soup_id', 'SideDish1_id', 'SideDish2_id', 'MainDish_id', 'Dessert_id')
+NUTRIENT_KEYS = ('calories', 'carbohydrate', 'protein', 'fat', 'sodium')
+
+# 한 번의 INSERT에 넣을 최대 행 수 (max_allowed_packet 여유분 고려)
+_INSERT_CHUNK_SIZE = 1000
+
+# 식단 계획 방식: 'random'(날마다 독립 무작위) / 'variety'(기간 전체 최적화, services.meal_variety)
+PLAN_MODES = ('random', 'variety')
+
+
+def group_foods_by_role(foods):
+    """필터링된 음식 리스트를 Food_role 기준으로 나눕니다."""
+    by_role = {}
+    for f in foods:
+        by_role.setdefault(f['Food_role'], []).append(f)
+    return by_role
+
+
+def pick_daily_foods(by_role, rng=random):
+    """
+    generate_daily_meal과 같은 규칙으로 하루 식단의 음식을 고릅니다.
+    반환값: MEAL_FOOD_COLUMNS → Food_id (없으면 None)
+    """
+    rice_list = by_role.get('밥', [])
+    soup_list = by_role.get('국&찌개', [])
+    side_dishes_list = by_role.get('반찬', [])
+    main_dish_list = by_role.get('일품', [])
+    dessert_list = by_role.get('후식', [])
+
+    side_dishes = rng.sample(side_dishes_list, min(2, len(side_dishes_list))) if side_dishes_list else []
+    picks = [
+        rng.choice(rice_list) if rice_list else None,
+        rng.choice(soup_list) if soup_list else None,
+        side_dishes[0] if len(side_dishes) > 0 else None,
+        side_dishes[1] if len(side_dishes) > 1 else None,
+        rng.choice(main_dish_list) if main_dish_list else None,
+        rng.choice(dessert_list) if dessert_list else None,
+    ]
+    return {col: (f['Food_id'] if f else None) for col, f in zip(MEAL_FOOD_COLUMNS, picks)}
+
+
+def compute_meal_totals(food_ids, nutrition_map):
+    """save_meal_total_nutrition과 같은 규칙(음식 합계의 1/3, 소수점 2자리)으로 식단 영양소를 계산합니다."""
+    totals = {k: 0 for k in NUTRIENT_KEYS}
+    for fid in food_ids:
+        n = nutrition_map.get(fid)
+        if n:
+            for k in NUTRIENT_KEYS:
+                totals[k] += n[k] or 0
+    return {f'total_{k}': round(totals[k] / 3, 2) for k in NUTRIENT_KEYS}
+
+
+def plan_variety_days(user_id, start_date, days, foods, target=None, repeat_window=7, time_budget=0.2):
+    """
+    기간 전체를 한 번에 최적화한 식단 (같은 음식 repeat_window일 내 반복 금지, 주간 영양소 합계를 권장량에 맞춤,
+    전날과 비슷한 음식 피하기). 반환값: 날짜별 MEAL_FOOD_COLUMNS → Food_id dict 리스트
+    """
+    catalog = get_food_catalog()
+    if target is None:
+        user = User.get_by_id(user_id)
+        target = meal_target_for(user.get('Kid_birth') if user else None, start_date)
+    nutrition = get_nutrition_by_food_ids([f['Food_id'] for f in foods])
+    scorer = ComboScorer(foods, nutrition, catalog.embeddings)
+    planned = plan_variety(scorer, target, days, relative_weights(target), catalog.embeddings,
+                           repeat_window=repeat_window, time_budget=time_budget)
+    return [{col: (f['Food_id'] if f else None) for col, f in zip(MEAL_FOOD_COLUMNS, day)} for day in planned]
+
+
+def build_meal_plan(user_id, start_date, days, foods=None, rng=random, mode='random', target=None):
+    """
+    start_date부터 days일치 식단을 메모리에서 만듭니다. (DB 저장 없음)
+    foods를 넘기면 알레르기 필터를 다시 하지 않습니다.
+    mode='variety'면 날마다 따로 고르지 않고 기간 전체를 최적화합니다. (target: 하루 목표 영양소 합계)
+    반환값: [{'User_id', 'Date', 'Rice_id', ...}, ...]
+    """
+    if foods is None:
+        foods = filter_foods_by_allergy(user_id, get_food_catalog())
+
+    if mode == 'variety':
+        daily_slots = plan_variety_days(user_id, start_date, days, foods, target)
+    else:
+        by_role = group_foods_by_role(foods)
+        daily_slots = [pick_daily_foods(by_role, rng) for _ in range(days)]
+
+    plan = []
+    for i, slots in enumerate(daily_slots):
+        if not any(slots.values()):
+            continue
+        entry = {'User_id': user_id, 'Date': start_date + datetime.timedelta(days=i)}
+        entry.update(slots)
+        plan.append(entry)
+    return plan
+
+
+def save_meal_plans(entries):
+    """
+    식단 항목들(여러 사용자/날짜 가능)을 한 트랜잭션으로 저장합니다.
+    - Meal: 여러 행 INSERT
+    - meal_nutrition: 여러 행 INSERT ... ON DUPLICATE KEY UPDATE
+    반환값: 항목 순서대로 meal_id가 채워진 entries (각 항목에 'meal_id', 'nutrition' 추가)
+    """
+    if not entries:
+        return []
+
+    food_ids = list(dict.fromkeys(
+        fid for e in entries for fid in (e[col] for col in MEAL_FOOD_COLUMNS) if fid is not None
+    ))
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # 1. 필요한 음식 영양소를 한 번에 조회 (스냅샷에 없는 음식만 같은 커서로 IN 쿼리)
+        nutrition_map = get_nutrition_by_food_ids(food_ids, external_cursor=cursor)
+
+        for start in range(0, len(entries), _INSERT_CHUNK_SIZE):
+            chunk = entries[start:start + _INSERT_CHUNK_SIZE]
+
+            # 2. Meal 여러 행 INSERT
+            columns = ('User_id', 'Date') + MEAL_FOOD_COLUMNS
+            row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+            cursor.execute(
+                f"INSERT INTO Meal ({', '.join(columns)}) VALUES " + ', '.join([row_sql] * len(chunk)),
+                tuple(e[c] for e in chunk for c in columns)
+            )
+            first_id = cursor.lastrowid
+
+            # 3. 방금 넣은 행의 meal_id를 (사용자, 날짜)로 매칭
+            #    (auto_increment가 연속이라는 가정에 기대지 않고 같은 트랜잭션에서 다시 읽음)
+            user_ids = list({e['User_id'] for e in chunk})
+            cursor.execute(
+                f"""
+                SELECT Meal_id, User_id, Date FROM Meal
+                WHERE Meal_id >= %s AND User_id IN ({', '.join(['%s'] * len(user_ids))})
+                ORDER BY Meal_id
+                """,
+                (first_id, *user_ids)
+            )
+            inserted = {}
+            for row in cursor.fetchall():
+                inserted.setdefault((row['User_id'], _as_date(row['Date'])), []).append(row['Meal_id'])
+            for e in chunk:
+                e['meal_id'] = inserted[(e['User_id'], _as_date(e['Date']))].pop(0)
+                e['nutrition'] = compute_meal_totals(
+                    [e[col] for col in MEAL_FOOD_COLUMNS if e[col] is not None], nutrition_map
+                )
+
+            # 4. meal_nutrition 여러 행 INSERT ... ON DUPLICATE KEY UPDATE
+            cursor.execute(
+                """
+                INSERT INTO meal_nutrition
+                (meal_id, total_calories, total_carbohydrate, total_protein, total_fat, total_sodium)
+                VALUES """ + ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(chunk)) + """
+                ON DUPLICATE KEY UPDATE
+                    total_calories = VALUES(total_calories),
+                    total_carbohydrate = VALUES(total_carbohydrate),
+                    total_protein = VALUES(total_protein),
+                    total_fat = VALUES(total_fat),
+                    total_sodium = VALUES(total_sodium)
+                """,
+                tuple(v for e in chunk for v in (e['meal_id'], *(float(e['nutrition'][f'total_{k}']) for k in NUTRIENT_KEYS)))
+            )
+
+        # 5. 전체를 한 번에 커밋
+        conn.commit()
+        return entries
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    return value
+
+
+def generate_meal_plan(user_id, start_date, days, mode='random'):
+    """
+    days일치 식단을 만들어 한 트랜잭션으로 저장하고, 저장된 식단 수를 반환합니다.
+    """
+    plan = build_meal_plan(user_id, start_date, days, mode=mode)
+    saved = save_meal_plans(plan)
+    logger.info(f"식단 일괄 저장({mode}): user_id={user_id}, {start_date}부터 {days}일 중 {len(saved)}일치")
+    return len(saved)
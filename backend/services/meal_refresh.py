@@ -1,33 +1,42 @@
 import datetime
 import random
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional
 from services.meal_filter import filter_foods_by_allergy
-from services.meal_nutrition import save_meal_total_nutrition, get_nutrition_by_food_id
+from services.meal_nutrition import save_meal_total_nutrition
+from models.food_nutrition import get_nutrition_by_food_ids
 from models.meal import Meal
-from models.food_embedding import get_embeddings
+from models.food_catalog import get_food_catalog
+from services.meal_scoring import ComboScorer
+from services.meal_optimizer import optimize_meal
+from services.food_similarity import get_similarity_index
+from models.food_preference import get_user_preference
+
+# Number of random combos scored per refresh (all scored in one vectorized pass)
+REFRESH_SAMPLE_SIZE = 4096
 
 
 def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
+    """Pairwise cosine similarity (kept for callers; bulk lookups use services.food_similarity)."""
     if a.size == 0 or b.size == 0:
         return 0.0
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
 
-def refresh_daily_meal(user_id: int, date: datetime.date, target_nutrition: Dict[str, float], prev_food_ids: List[int] = None):
-    """Generate a refreshed meal considering embeddings and nutrition."""
+def refresh_daily_meal(user_id: int, date: datetime.date, target_nutrition: Dict[str, float], prev_food_ids: List[int] = None,
+                       n_combos: int = REFRESH_SAMPLE_SIZE, mode: str = 'random',
+                       weights: Optional[Dict[str, float]] = None, time_budget: float = 0.05):
+    """
+    Generate a refreshed meal considering embeddings and nutrition.
+    mode='random' scores n_combos random combos; mode='optimize' runs the local-search solver
+    (services.meal_optimizer) for up to time_budget seconds with per-nutrient weights.
+    """
     if date is None:
         date = datetime.date.today()
 
-    # Load candidate foods after allergy filtering
-    foods = filter_foods_by_allergy(user_id)
-
-    # Categorize foods by role
-    rice_list = [f for f in foods if f['Food_role'] == '밥']
-    soup_list = [f for f in foods if f['Food_role'] == '국&찌개']
-    side_dishes_list = [f for f in foods if f['Food_role'] == '반찬']
-    main_dish_list = [f for f in foods if f['Food_role'] == '일품']
-    dessert_list = [f for f in foods if f['Food_role'] == '후식']
+    # Load candidate foods after allergy filtering (from the shared catalog snapshot)
+    catalog = get_food_catalog()
+    foods = filter_foods_by_allergy(user_id, catalog)
 
     # Previous meal food IDs
     if prev_food_ids is None:
@@ -38,58 +47,26 @@ def refresh_daily_meal(user_id: int, date: datetime.date, target_nutrition: Dict
             prev_meal.get('MainDish_id'), prev_meal.get('Dessert_id')
         ] if prev_meal else []
 
-    prev_embeds = list(get_embeddings(prev_food_ids).values())
-
-    # Preload embeddings for all candidate foods
-    candidate_ids = [f['Food_id'] for f in foods]
-    candidate_embeddings = get_embeddings(candidate_ids)
-
-    def random_combo():
-        rice = random.choice(rice_list) if rice_list else None
-        soup = random.choice(soup_list) if soup_list else None
-        side_dishes = random.sample(side_dishes_list, min(2, len(side_dishes_list))) if side_dishes_list else []
-        main_dish = random.choice(main_dish_list) if main_dish_list else None
-        dessert = random.choice(dessert_list) if dessert_list else None
-        return [rice, soup] + side_dishes + [main_dish, dessert]
-
-    def score_combo(combo):
-        food_ids = [f['Food_id'] for f in combo if f]
-        # Similarity score
-        sim = 0.0
-        for fid in food_ids:
-            emb = candidate_embeddings.get(fid)
-            if emb is not None and prev_embeds:
-                sim += max(cosine_sim(emb, p) for p in prev_embeds)
-        # Nutrition difference
-        totals = {'calories':0,'carbohydrate':0,'protein':0,'fat':0,'sodium':0}
-        for fid in food_ids:
-            n = get_nutrition_by_food_id(fid)
-            for k in totals:
-                totals[k] += n.get(k,0)
-        diff = sum(abs(totals[k]-target_nutrition.get(k,0)) for k in totals)
-        return sim + diff, totals, food_ids
-
-    best = None
-    best_totals = None
-    best_ids = None
-    best_score = float('inf')
-    for _ in range(50):
-        combo = random_combo()
-        score, totals, ids = score_combo(combo)
-        if score < best_score:
-            best_score = score
-            best = combo
-            best_totals = totals
-            best_ids = ids
-
-    if not best:
+    # Nutrition for all candidate foods in one bulk lookup, embeddings from the snapshot;
+    # foods the user rated well in the diary get a lower penalty
+    candidate_nutrition = get_nutrition_by_food_ids([f['Food_id'] for f in foods])
+    scorer = ComboScorer(foods, candidate_nutrition, catalog.embeddings, prev_food_ids,
+                         similarity=get_similarity_index(catalog), preference=get_user_preference(user_id))
+
+    if mode == 'optimize':
+        result = optimize_meal(scorer, target_nutrition, weights=weights, time_budget=time_budget)
+    else:
+        # Sample and score thousands of combos at once (vectorized)
+        result = scorer.best_combo(target_nutrition, n_combos=n_combos, weights=weights)
+    if not result:
+        return None
+    best, best_totals, best_score = result
+    best_ids = [f['Food_id'] for f in best if f]
+    if not best_ids:
         return None
 
-    # Save meal
-    rice = best[0]; soup = best[1]; side_dish1 = best[2] if len(best) > 2 else None
-    side_dish2 = best[3] if len(best) > 3 else None
-    main_dish = best[4] if len(best) > 4 else None
-    dessert = best[5] if len(best) > 5 else None
+    # Save meal (slots: rice, soup, side dish 1, side dish 2, main dish, dessert)
+    rice, soup, side_dish1, side_dish2, main_dish, dessert = best
 
     meal = Meal(
         User_id=user_id,
@@ -112,7 +89,7 @@ def refresh_single_menu_item(user_id: int, date: datetime.date, item: str, targe
     if date is None:
         date = datetime.date.today()
 
-    foods = filter_foods_by_allergy(user_id)
+    foods = filter_foods_by_allergy(user_id, get_food_catalog())
 
     role_map = {
         'rice': '밥',
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Dict, List, Optional
+from models.food_embedding import EmbeddingMatrix
+
+# Meal slots in the order used by refresh/generation: rice, soup, 2 side dishes, main dish, dessert
+MEAL_SLOTS = ['밥', '국&찌개', '반찬', '반찬', '일품', '후식']
+NUTRIENT_KEYS = ('calories', 'carbohydrate', 'protein', 'fat', 'sodium')
+# How strongly a learned preference score (models.food_preference, about -2..2) offsets a slot's penalty
+PREFERENCE_WEIGHT = 0.2
+
+
+def target_vector(target: Dict[str, float]) -> np.ndarray:
+    return np.array([float(target.get(k, 0) or 0) for k in NUTRIENT_KEYS])
+
+
+def weight_vector(weights: Optional[Dict[str, float]]) -> np.ndarray:
+    if not weights:
+        return np.ones(len(NUTRIENT_KEYS))
+    return np.array([float(weights.get(k, 1.0)) for k in NUTRIENT_KEYS])
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; zero rows stay zero (similarity 0 instead of NaN)."""
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_embedding_matrix(food_ids: List, embeddings: Dict, dim: Optional[int] = None) -> np.ndarray:
+    """Stack embeddings for food_ids into a normalized (N x D) matrix; missing vectors become zero rows."""
+    if isinstance(embeddings, EmbeddingMatrix):
+        return _normalize_rows(embeddings.take(food_ids))
+    if dim is None:
+        dim = next((len(v) for v in embeddings.values() if len(v)), 0)
+    matrix = np.zeros((len(food_ids), dim), dtype=np.float32)
+    for i, fid in enumerate(food_ids):
+        vec = embeddings.get(fid)
+        if vec is not None and len(vec) == dim:
+            matrix[i] = vec
+    return _normalize_rows(matrix)
+
+
+class ComboScorer:
+    """
+    Vectorized meal-combo scorer.
+
+    Candidates are held per role as index arrays into one (N x 5) nutrition matrix, and each
+    candidate's max cosine similarity to the previous meal is precomputed once, so scoring
+    thousands of sampled combos is a handful of NumPy gathers and sums.
+
+    score = sum(penalty) + sum(weight * |nutrition totals - target|)
+    where a candidate's penalty is its max-similarity to the previous meal, minus
+    preference_weight * its learned preference score when a user preference is given
+    (lower is better; with unit weights and no preference this is the objective of the
+    original per-combo Python loop)
+    """
+
+    def __init__(self, foods: List[dict], nutrition: Dict, embeddings: Dict,
+                 prev_food_ids: Optional[List] = None, similarity=None,
+                 preference=None, preference_weight: float = PREFERENCE_WEIGHT):
+        self.foods = list(foods)
+        self.food_ids = [f['Food_id'] for f in self.foods]
+        n = len(self.foods)
+
+        self.nutrition = np.zeros((n, len(NUTRIENT_KEYS)), dtype=np.float64)
+        for i, fid in enumerate(self.food_ids):
+            row = nutrition.get(fid)
+            if row:
+                self.nutrition[i] = [float(row.get(k) or 0) for k in NUTRIENT_KEYS]
+
+        # Max similarity of each candidate to any food of the previous meal
+        # (similarity: a prebuilt services.food_similarity index, which skips re-normalizing embeddings)
+        self.max_sim = np.zeros(n, dtype=np.float64)
+        prev_ids = [fid for fid in (prev_food_ids or []) if fid in embeddings]
+        if n and prev_ids and similarity is not None:
+            self.max_sim = similarity.max_similarity(self.food_ids, prev_ids)
+        elif n and prev_ids:
+            cand = build_embedding_matrix(self.food_ids, embeddings)
+            prev = build_embedding_matrix(prev_ids, embeddings, dim=cand.shape[1])
+            if cand.shape[1]:
+                self.max_sim = (cand @ prev.T).max(axis=1).astype(np.float64)
+
+        # Per-candidate penalty: similarity to the previous meal, lowered for foods the user rated well
+        # (preference: a models.food_preference.UserPreference, one vectorized lookup per candidate)
+        self.penalty = self.max_sim
+        if n and preference is not None and not preference.empty:
+            self.penalty = self.max_sim - preference_weight * preference.scores(self.food_ids, embeddings)
+
+        # Candidate indices per slot (empty roles are skipped, like a None pick)
+        by_role: Dict[str, List[int]] = {}
+        for i, f in enumerate(self.foods):
+            by_role.setdefault(f['Food_role'], []).append(i)
+        self.slot_candidates = [np.asarray(by_role.get(role, []), dtype=np.int64) for role in MEAL_SLOTS]
+
+    def sample(self, n_combos: int, rng: np.random.Generator,
+               slot_candidates: Optional[List[np.ndarray]] = None) -> np.ndarray:
+        """
+        Sample n_combos combos as a (K x 6) index matrix (-1 marks an empty slot).
+        The two side-dish slots never pick the same food when two or more exist.
+        slot_candidates restricts sampling to a subset of each slot's candidates.
+        """
+        slot_candidates = self.slot_candidates if slot_candidates is None else slot_candidates
+        combos = np.full((n_combos, len(MEAL_SLOTS)), -1, dtype=np.int64)
+        side_slots = [s for s, role in enumerate(MEAL_SLOTS) if role == '반찬']
+        for slot, cands in enumerate(slot_candidates):
+            if len(cands) == 0 or slot in side_slots:
+                continue
+            combos[:, slot] = cands[rng.integers(0, len(cands), n_combos)]
+
+        sides = slot_candidates[side_slots[0]]
+        if len(sides) == 1:
+            combos[:, side_slots[0]] = sides[0]
+        elif len(sides) > 1:
+            first = rng.integers(0, len(sides), n_combos)
+            second = (first + rng.integers(1, len(sides), n_combos)) % len(sides)
+            combos[:, side_slots[0]] = sides[first]
+            combos[:, side_slots[1]] = sides[second]
+        return combos
+
+    def score(self, combos: np.ndarray, target: Dict[str, float], weights: Optional[Dict[str, float]] = None):
+        """Return (scores[K], nutrition totals[K x 5]) for a (K x 6) combo index matrix."""
+        return self.score_array(combos, target_vector(target), weight_vector(weights))
+
+    def score_array(self, combos: np.ndarray, target: np.ndarray, weights: np.ndarray):
+        """score() with target and weights already given as length-5 vectors in NUTRIENT_KEYS order."""
+        mask = combos >= 0
+        safe = np.where(mask, combos, 0)
+        totals = (self.nutrition[safe] * mask[..., None]).sum(axis=1)
+        diff = (np.abs(totals - target) * weights).sum(axis=1)
+        penalty = (self.penalty[safe] * mask).sum(axis=1)
+        return penalty + diff, totals
+
+    def best_combo(self, target: Dict[str, float], n_combos: int = 4096,
+                   rng: Optional[np.random.Generator] = None, weights: Optional[Dict[str, float]] = None):
+        """
+        Sample and score n_combos combos at once and return the best one as
+        (list of food dicts or None per slot, totals dict, score), or None if there are no candidates.
+        """
+        if not self.foods:
+            return None
+        rng = rng or np.random.default_rng()
+        combos = self.sample(n_combos, rng)
+        scores, totals = self.score(combos, target, weights)
+        best = int(np.argmin(scores))
+        picked = [self.foods[i] if i >= 0 else None for i in combos[best]]
+        return picked, dict(zip(NUTRIENT_KEYS, totals[best].tolist())), float(scores[best])
@@ -0,0 +1,244 @@
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from services.meal_scoring import ComboScorer, MEAL_SLOTS, build_embedding_matrix, target_vector, weight_vector
+from services.meal_optimizer import MealOptimizer
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nutrient totals are balanced over blocks of this many days (a week)
+PLAN_BLOCK_DAYS = 7
+
+
+class VarietyPlanner:
+    """
+    Multi-day meal planner that optimizes the whole horizon at once.
+
+    Objective (lower is better), for a (days x 6) plan of food indices:
+      - per block of PLAN_BLOCK_DAYS days: weighted |block totals - days_in_block * target|, divided
+        by the block length so it is on the same scale as one day
+      - daily_weight * per day: weighted |day totals - target|
+      - diversity_weight * per (day, slot): max embedding similarity to the previous day's foods of
+        the same role
+    Hard constraint: a food is not repeated within repeat_window days (including the same day).
+
+    The plan is built greedily day by day and then improved by best-improvement moves on single
+    (day, slot) cells. Block/day totals are kept incrementally, so a move evaluates every candidate
+    of the slot in one NumPy pass using only the affected block, day and neighbouring days.
+    """
+
+    def __init__(self, scorer: ComboScorer, target: Dict[str, float], days: int,
+                 weights: Optional[Dict[str, float]] = None, repeat_window: int = 7,
+                 daily_weight: float = 0.25, diversity_weight: float = 0.1,
+                 max_candidates: Optional[int] = 300, vectors: Optional[np.ndarray] = None):
+        self.scorer = scorer
+        self.days = days
+        self.target = target_vector(target)
+        self.weights = weight_vector(weights)
+        self.repeat_window = max(int(repeat_window), 1)
+        self.daily_weight = daily_weight
+        self.diversity_weight = diversity_weight if vectors is not None and vectors.size else 0.0
+        self.vectors = vectors
+        self.nutrition = scorer.nutrition
+        self.slot_candidates = MealOptimizer(scorer, target, weights, max_candidates).slot_candidates
+        self.role_slots = [[t for t, r in enumerate(MEAL_SLOTS) if r == role] for role in MEAL_SLOTS]
+        # Per-slot candidate nutrition/vectors gathered once instead of on every move
+        self.cand_nutrition = [self.nutrition[c] for c in self.slot_candidates]
+        self.cand_vectors = [vectors[c] for c in self.slot_candidates] if self.diversity_weight else None
+        self._scratch = np.zeros(len(self.nutrition), dtype=bool)
+        # Typical share of a day's nutrients per slot (slot candidate means), used while the day is partly filled
+        means = np.array([n.mean(axis=0) if len(n) else np.zeros(len(self.target)) for n in self.cand_nutrition])
+        totals = means.sum(axis=0)
+        self._slot_share = means / np.where(totals > 0, totals, 1.0)
+
+        n_blocks = (days + PLAN_BLOCK_DAYS - 1) // PLAN_BLOCK_DAYS
+        self.block_len = np.array([min(PLAN_BLOCK_DAYS, days - b * PLAN_BLOCK_DAYS) for b in range(n_blocks)])
+        self.plan = np.full((days, len(MEAL_SLOTS)), -1, dtype=np.int64)
+        self.day_totals = np.zeros((days, len(self.target)))
+        self.block_totals = np.zeros((n_blocks, len(self.target)))
+        # During greedy construction targets are prorated to the filled part of the block
+        self._constructing = False
+
+    # -------------------------------------------------------------
+    # Move evaluation
+    # -------------------------------------------------------------
+    def _similarity(self, cand_vectors: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """(len(cand_vectors) x len(others)) cosine similarities; others may contain -1 (empty)."""
+        others = others[others >= 0]
+        if not self.diversity_weight or not len(others):
+            return np.zeros((len(cand_vectors), 0))
+        return cand_vectors @ self.vectors[others].T
+
+    def _move_costs(self, d: int, s: int, cands: Optional[np.ndarray] = None) -> np.ndarray:
+        """Objective terms that depend on cell (d, s), for every candidate of slot s (or for cands)."""
+        current = self.plan[d, s]
+        b = d // PLAN_BLOCK_DAYS
+        cur_nut = self.nutrition[current] if current >= 0 else 0.0
+        cand_nut = self.cand_nutrition[s] if cands is None else self.nutrition[cands]
+
+        if self._constructing:
+            # Compare with what the filled part of the plan should add up to so far
+            filled = self.plan[d] >= 0
+            filled[s] = True
+            day_target = self.target * self._slot_share[filled].sum(axis=0)
+            block_target = (d - b * PLAN_BLOCK_DAYS) * self.target + day_target
+        else:
+            day_target = self.target
+            block_target = self.block_len[b] * self.target
+
+        base_day = self.day_totals[d] - cur_nut
+        base_block = self.block_totals[b] - cur_nut
+        costs = (np.abs(base_block + cand_nut - block_target) * self.weights).sum(axis=1) / self.block_len[b]
+        costs += self.daily_weight * (np.abs(base_day + cand_nut - day_target) * self.weights).sum(axis=1)
+
+        if self.diversity_weight:
+            same_role = self.role_slots[s]
+            cand_vectors = self.cand_vectors[s] if cands is None else self.vectors[cands]
+            # Cell (d, s) against the previous day's foods of the same role
+            if d > 0:
+                sims = self._similarity(cand_vectors, self.plan[d - 1, same_role])
+                if sims.shape[1]:
+                    costs += self.diversity_weight * sims.max(axis=1)
+            # Next day's same-role cells, whose max may involve (d, s)
+            if d + 1 < self.days:
+                others_today = np.array([self.plan[d, t] for t in same_role if t != s], dtype=np.int64)
+                for t in same_role:
+                    nxt = self.plan[d + 1, t]
+                    if nxt < 0:
+                        continue
+                    rest = self._similarity(self.vectors[nxt][None, :], others_today)
+                    rest_max = rest.max() if rest.shape[1] else -np.inf
+                    costs += self.diversity_weight * np.maximum(cand_vectors @ self.vectors[nxt], rest_max)
+        return costs
+
+    def _blocked_mask(self, cands: np.ndarray, foods: np.ndarray) -> np.ndarray:
+        """Boolean mask over cands of the members of foods (a lookup table instead of np.isin)."""
+        foods = foods[foods >= 0]
+        self._scratch[foods] = True
+        mask = self._scratch[cands]
+        self._scratch[foods] = False
+        return mask
+
+    def _best_move(self, d: int, s: int):
+        """
+        Best allowed food for (d, s): returns (food, its cost, cost of the current food).
+        food is -1 (empty slot) when every food of the role is already on day d.
+        """
+        cands = self.slot_candidates[s]
+        current = self.plan[d, s]
+        costs = self._move_costs(d, s)
+        at_current = np.flatnonzero(cands == current)
+        current_cost = float(costs[at_current[0]]) if len(at_current) else np.inf
+
+        # Foods already used within the repeat window (the cell itself excluded)
+        lo = max(0, d - self.repeat_window + 1)
+        window = self.plan[lo:min(self.days, d + self.repeat_window)].copy()
+        window[d - lo, s] = -1
+        blocked = self._blocked_mask(cands, window.ravel())
+        if blocked.all():
+            # Catalog too small for the window: only forbid a repeat within the same day
+            today = np.delete(self.plan[d], s)
+            blocked = self._blocked_mask(cands, today)
+            if blocked.all():
+                # Every pruned candidate is already on the day (e.g. one side dish left for both side
+                # slots): try the role's full pool before leaving the slot empty
+                cands = self.scorer.slot_candidates[s]
+                blocked = self._blocked_mask(cands, today)
+                if blocked.all():
+                    return -1, np.inf, current_cost
+                costs = self._move_costs(d, s, cands)
+        costs = np.where(blocked, np.inf, costs)
+        best = int(np.argmin(costs))
+        return int(cands[best]), float(costs[best]), current_cost
+
+    def _assign(self, d: int, s: int, food: int):
+        current = self.plan[d, s]
+        b = d // PLAN_BLOCK_DAYS
+        if current >= 0:
+            self.day_totals[d] -= self.nutrition[current]
+            self.block_totals[b] -= self.nutrition[current]
+        if food >= 0:
+            self.day_totals[d] += self.nutrition[food]
+            self.block_totals[b] += self.nutrition[food]
+        self.plan[d, s] = food
+
+    # -------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------
+    def objective(self) -> float:
+        """Full objective of the current plan (for reporting and checks)."""
+        nutrition = (np.abs(self.block_totals - self.block_len[:, None] * self.target) * self.weights).sum(axis=1) \
+            / self.block_len
+        total = float(nutrition.sum())
+        total += self.daily_weight * float((np.abs(self.day_totals - self.target) * self.weights).sum())
+        if self.diversity_weight:
+            for d in range(1, self.days):
+                for s in range(len(MEAL_SLOTS)):
+                    if self.plan[d, s] >= 0:
+                        sims = self._similarity(self.vectors[self.plan[d, s]][None, :],
+                                                self.plan[d - 1, self.role_slots[s]])
+                        if sims.shape[1]:
+                            total += self.diversity_weight * float(sims.max())
+        return total
+
+    def solve(self, time_budget: float = 0.2, rng: Optional[np.random.Generator] = None):
+        """
+        Build and improve the plan within time_budget seconds.
+        Returns (plan as a (days x 6) index array with -1 for empty slots, stats dict).
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget
+        rng = rng or np.random.default_rng()
+        slots = [s for s, c in enumerate(self.slot_candidates) if len(c)]
+
+        # Greedy construction, day by day (slots in random order so roles don't always go first)
+        self._constructing = True
+        for d in range(self.days):
+            for s in rng.permutation(slots):
+                food, _, _ = self._best_move(d, s)
+                self._assign(d, s, food)
+        self._constructing = False
+
+        # Best-improvement sweeps over all cells in random order
+        sweeps = moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            sweeps += 1
+            cells = [(d, s) for d in range(self.days) for s in slots]
+            for i in rng.permutation(len(cells)):
+                if time.perf_counter() >= deadline:
+                    break
+                d, s = cells[i]
+                food, cost, current_cost = self._best_move(d, s)
+                if food != self.plan[d, s] and cost < current_cost - 1e-9:
+                    self._assign(d, s, food)
+                    moves += 1
+                    improved = True
+
+        stats = {
+            'sweeps': sweeps,
+            'moves': moves,
+            'objective': round(self.objective(), 6),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+        return self.plan.copy(), stats
+
+
+def plan_variety(scorer: ComboScorer, target: Dict[str, float], days: int,
+                 weights: Optional[Dict[str, float]] = None, embeddings=None,
+                 repeat_window: int = 7, time_budget: float = 0.2,
+                 rng: Optional[np.random.Generator] = None, **options) -> List[list]:
+    """
+    Plan `days` meals over the scorer's candidates.
+    Returns one list per day of 6 food dicts (None for an empty slot), in MEAL_SLOTS order.
+    """
+    if not scorer.foods or days <= 0:
+        return []
+    vectors = build_embedding_matrix(scorer.food_ids, embeddings) if embeddings is not None and len(embeddings) \
+        else None
+    planner = VarietyPlanner(scorer, target, days, weights, repeat_window, vectors=vectors, **options)
+    plan, stats = planner.solve(time_budget, rng)
+    logger.debug(f"{days}일 식단 계획: {stats}")
+    return [[scorer.foods[i] if i >= 0 else None for i in row] for row in plan]
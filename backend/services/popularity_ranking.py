@@ -0,0 +1,233 @@
+# 조회수 순위 캐시 모듈
+# 목록 API가 요청마다 전체 테이블을 ORDER BY view_count DESC로 다시 정렬하지 않도록
+# 조회수 순위(ID, 조회수, 알레르기 마스크)를 메모리에 유지하고 목록 순서를 여기서 제공
+# - 상품: 조회수 상위 RANKING_TOP_N개 (그 뒤 페이지는 기존처럼 DB 키셋 조회)
+# - 레시피: 카탈로그 스냅샷에 있는 전체 음식 (목록 자체가 카탈로그에서 나오므로 전체를 유지)
+# - 알레르기 조합(비트마스크)별로 걸러낸 순위는 LRU(RANKING_FILTER_CACHE_SIZE)에 보관 → 같은 조합의 페이지는 O(페이지 크기)
+# - 이 프로세스의 조회수 반영(services.view_counter)은 바로 순위에 더하고, 다른 워커의 조회수는 RANKING_TTL마다 다시 읽어 반영
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from config import get_db_connection, RANKING_TOP_N, RANKING_TTL, RANKING_FILTER_CACHE_SIZE
+from models.food_catalog import get_food_catalog
+from services.allergen_index import ensure_allergen_mask_tables
+from services.view_counter import add_flush_listener
+from utils.allergy import compute_allergen_mask
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RANKING_KINDS = ('food', 'products')
+
+_rankings = {}
+_load_lock = threading.Lock()
+
+
+class PopularityRanking:
+    """
+    한 종류(food/products)의 조회수 순위.
+    정렬 키는 (-조회수, ID)로 목록 API의 after 커서와 같음 (음식은 Food_id 문자열, 상품은 product_id 정수)
+    complete가 False이면 상위 N개만 담고 있으므로 그 뒤는 DB에서 조회해야 함
+    """
+
+    def __init__(self, kind, counts, masks, complete, source_version=None):
+        self.kind = kind
+        self.counts = counts
+        self.masks = masks
+        self.complete = complete
+        self.source_version = source_version
+        self.loaded_at = time.time()
+        self._lock = threading.Lock()
+        self._order = None
+        self._filtered = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _sorted_ids(self):
+        if self._order is None:
+            counts = self.counts
+            self._order = sorted(counts, key=lambda item_id: (-counts[item_id], item_id))
+        return self._order
+
+    def filtered(self, allergy_mask=0):
+        """알레르기 마스크와 겹치지 않는 항목의 (ID 리스트, 정렬 키 리스트)를 순위 순으로 반환합니다."""
+        with self._lock:
+            cached = self._filtered.get(allergy_mask)
+            if cached is not None:
+                self._filtered.move_to_end(allergy_mask)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            ids = self._sorted_ids()
+            if allergy_mask:
+                masks = self.masks
+                ids = [item_id for item_id in ids if masks[item_id] & allergy_mask == 0]
+            keys = [(-self.counts[item_id], item_id) for item_id in ids]
+            self._filtered[allergy_mask] = (ids, keys)
+            if len(self._filtered) > RANKING_FILTER_CACHE_SIZE:
+                self._filtered.popitem(last=False)
+            return ids, keys
+
+    def page(self, allergy_mask, after_key, limit):
+        """
+        after_key(-조회수, ID) 다음부터 limit개를 반환합니다: ([(ID, 조회수)], 다음 페이지 여부, 전체 개수 또는 None)
+        상위 N개 범위를 벗어나는 페이지면 None (호출자가 DB에서 조회)
+        """
+        ids, keys = self.filtered(allergy_mask)
+        start = bisect.bisect_right(keys, after_key) if after_key is not None else 0
+        end = start + limit
+        if end > len(ids) and not self.complete:
+            return None
+        counts = [-key[0] for key in keys[start:end]]
+        items = list(zip(ids[start:end], counts))
+        has_more = end < len(ids) or not self.complete
+        return items, has_more, len(ids) if self.complete else None
+
+    def apply_views(self, deltas):
+        """반영된 조회수 증가분을 순위에 더합니다. (순위에 없는 항목은 다음 로드 때 반영)"""
+        with self._lock:
+            changed = False
+            for item_id, n in deltas.items():
+                if item_id in self.counts:
+                    self.counts[item_id] += n
+                    changed = True
+            if changed:
+                self._order = None
+                self._filtered.clear()
+
+
+def _load_food_ranking(catalog):
+    # 카탈로그의 조회수는 스냅샷 시점 값이므로 조회수만 DB에서 새로 읽음 (실패하면 카탈로그 값 사용)
+    counts = {str(food['Food_id']): food['view_count'] or 0 for food in catalog.foods}
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT Food_id, COALESCE(view_count, 0) AS view_count FROM food")
+            for row in cursor.fetchall():
+                key = str(row['Food_id'])
+                if key in counts:
+                    counts[key] = int(row['view_count'])
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        logger.warning(f"음식 조회수 조회 실패, 카탈로그 v{catalog.version} 조회수 사용: {e}")
+    masks = {str(food['Food_id']): food['allergen_mask'] for food in catalog.foods}
+    return PopularityRanking('food', counts, masks, complete=True, source_version=catalog.version)
+
+
+def _load_product_ranking():
+    ensure_allergen_mask_tables()
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT p.product_id, COALESCE(p.view_count, 0) AS view_count, pm.allergen_mask
+            FROM products p
+            LEFT JOIN product_allergen_mask pm ON pm.product_id = p.product_id
+            ORDER BY COALESCE(p.view_count, 0) DESC, p.product_id ASC
+            LIMIT %s
+        """, (RANKING_TOP_N + 1,))
+        rows = cursor.fetchall()
+        complete = len(rows) <= RANKING_TOP_N
+        rows = rows[:RANKING_TOP_N]
+
+        counts = {int(row['product_id']): int(row['view_count']) for row in rows}
+        masks = {int(row['product_id']): row['allergen_mask'] for row in rows}
+
+        # 아직 색인되지 않은 상품은 원문으로 마스크 계산 (SQL의 LIKE 조건과 같은 결과)
+        unindexed = [product_id for product_id, mask in masks.items() if mask is None]
+        if unindexed:
+            placeholders = ', '.join(['%s'] * len(unindexed))
+            cursor.execute(
+                f"SELECT product_id, food_products, details_info FROM products WHERE product_id IN ({placeholders})",
+                tuple(unindexed)
+            )
+            for row in cursor.fetchall():
+                masks[int(row['product_id'])] = compute_allergen_mask(row['food_products'], row['details_info'])
+    finally:
+        cursor.close()
+        conn.close()
+    return PopularityRanking('products', counts, masks, complete=complete)
+
+
+def _is_fresh(ranking):
+    if ranking is None or time.time() - ranking.loaded_at >= RANKING_TTL:
+        return False
+    if ranking.kind == 'food':
+        return ranking.source_version == get_food_catalog().version
+    return True
+
+
+def get_ranking(kind):
+    """
+    조회수 순위를 반환합니다.
+    RANKING_TTL이 지났으면(음식은 카탈로그가 바뀌어도) 다시 읽으며, 다른 스레드가 갱신 중이면 기존 순위를 그대로 사용합니다.
+    """
+    if kind not in RANKING_KINDS:
+        raise ValueError(f'알 수 없는 순위 대상: {kind}')
+    ranking = _rankings.get(kind)
+    if _is_fresh(ranking):
+        return ranking
+
+    if not _load_lock.acquire(blocking=ranking is None):
+        return ranking
+    try:
+        current = _rankings.get(kind)
+        if current is not ranking and _is_fresh(current):
+            return current
+        loaded = _load_food_ranking(get_food_catalog()) if kind == 'food' else _load_product_ranking()
+        _rankings[kind] = loaded
+        logger.info(f"조회수 순위 로드: {kind} {len(loaded)}개")
+        return loaded
+    except Exception as e:
+        if ranking is not None:
+            # DB 오류 시 기존 순위로 계속 서비스 (다음 요청에서 다시 시도)
+            logger.warning(f"조회수 순위 갱신 실패, 기존 순위 유지: {kind}: {e}")
+            ranking.loaded_at = time.time()
+            return ranking
+        raise
+    finally:
+        _load_lock.release()
+
+
+def invalidate_rankings():
+    """상품/음식이 추가·삭제되었을 때 호출하면 다음 조회 시 순위를 다시 읽습니다."""
+    _rankings.clear()
+
+
+def _on_views_flushed(counts):
+    for kind, items in counts.items():
+        ranking = _rankings.get(kind)
+        if ranking is None or not items:
+            continue
+        if kind == 'products':
+            deltas = {}
+            for key, n in items.items():
+                if key.isdigit():
+                    deltas[int(key)] = n
+        else:
+            deltas = items
+        ranking.apply_views(deltas)
+
+
+add_flush_listener(_on_views_flushed)
+
+
+def get_ranking_stats():
+    """종류별 순위 크기와 필터 LRU 적중 통계"""
+    stats = {}
+    for kind, ranking in list(_rankings.items()):
+        stats[kind] = {
+            'items': len(ranking),
+            'complete': ranking.complete,
+            'loaded_at': ranking.loaded_at,
+            'filtered_cached': len(ranking._filtered),
+            'hits': ranking.hits,
+            'misses': ranking.misses,
+        }
+    return stats
@@ -0,0 +1,116 @@
+# 상품 상세 조회 모듈
+# 상품 행과 이미지 목록을 한 번의 쿼리(JSON_ARRAYAGG 상관 서브쿼리)로 읽고, 상품별 응답 문서를 LRU 캐시에 보관
+# - 캐시: PRODUCT_DETAIL_CACHE_SIZE개, PRODUCT_DETAIL_CACHE_TTL초 (TTL은 가격/이미지처럼 감지하지 못하는 수정의 최대 지연)
+# - 무효화: invalidate_product_detail() 직접 호출, 상품 검색 색인의 증분 갱신이 찾아낸 상품명/상세정보 수정·삭제 상품
+# - 조회수: 캐시에는 DB에서 읽은 값만 두고, 응답할 때 아직 커밋되지 않은 증가분을 더함.
+#   조회수 반영이 커밋되면 해당 상품을 캐시에서 지우고(view_count_lock 안), 반영과 겹친 DB 조회는 캐시하지 않고 다시 읽음
+import json
+import threading
+import time
+from collections import OrderedDict
+from config import get_db_connection, PRODUCT_DETAIL_CACHE_TTL, PRODUCT_DETAIL_CACHE_SIZE
+from services.product_search import add_change_listener
+from services.view_counter import add_flush_listener, view_count_lock, flush_state, unflushed_views
+
+_lock = threading.Lock()
+_cache = OrderedDict()     # product_id → (로드 시각, 상품 문서)
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_LOAD_ATTEMPTS = 3   # 조회수 반영과 겹쳐 다시 읽는 최대 횟수
+
+
+def _load_product_detail(product_id):
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT p.*,
+                   (SELECT JSON_ARRAYAGG(pi.image_url)
+                    FROM product_images pi
+                    WHERE pi.product_id = p.product_id) AS images
+            FROM products p
+            WHERE p.product_id = %s
+        """, (product_id,))
+        product = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if not product:
+        return None
+    images = product.get('images')
+    product['images'] = json.loads(images) if images else []
+    product['view_count'] = product.get('view_count') or 0
+    return product
+
+
+def _with_views(product, product_id):
+    # 캐시된 문서는 그대로 두고 복사본에 미반영 조회수를 더함 (view_count_lock을 잡은 채로 호출)
+    return {**product, 'images': list(product['images']),
+            'view_count': product['view_count'] + unflushed_views('products', product_id)}
+
+
+def get_product_detail(product_id):
+    """상품 상세(이미지 목록 포함, 조회수는 미반영 증가분까지 포함)를 반환합니다. 없는 상품이면 None"""
+    product_id = int(product_id)
+    use_cache = PRODUCT_DETAIL_CACHE_TTL > 0
+    if use_cache:
+        with view_count_lock, _lock:
+            cached = _cache.get(product_id)
+            if cached is not None and time.time() - cached[0] < PRODUCT_DETAIL_CACHE_TTL:
+                _cache.move_to_end(product_id)
+                _stats['hits'] += 1
+                return _with_views(cached[1], product_id)
+            _stats['misses'] += 1
+
+    for _ in range(_LOAD_ATTEMPTS):
+        with view_count_lock:
+            before = flush_state('products', product_id)
+        product = _load_product_detail(product_id)
+        if product is None:
+            return None
+        with view_count_lock:
+            # 조회 전후로 이 상품의 반영이 진행 중이거나 커밋되었으면 DB 값에 포함됐는지 알 수 없으므로 다시 읽음
+            if before[1] or flush_state('products', product_id) != before:
+                continue
+            if use_cache:
+                with _lock:
+                    _cache[product_id] = (time.time(), product)
+                    _cache.move_to_end(product_id)
+                    while len(_cache) > PRODUCT_DETAIL_CACHE_SIZE:
+                        _cache.popitem(last=False)
+            return _with_views(product, product_id)
+
+    # 반영이 계속 겹치면 캐시하지 않고 DB 값에 대기 중인 증가분만 더함
+    with view_count_lock:
+        product['view_count'] += unflushed_views('products', product_id, include_inflight=False)
+    return product
+
+
+def invalidate_product_detail(product_ids=None):
+    """상품 정보/이미지를 수정한 뒤 호출하면 다음 조회 때 DB에서 다시 읽습니다. (None이면 전체)"""
+    with _lock:
+        if product_ids is None:
+            _cache.clear()
+        else:
+            for product_id in product_ids:
+                _cache.pop(int(product_id), None)
+        _stats['invalidations'] += 1
+
+
+def _on_views_flushed(counts):
+    # 커밋 직후 view_count_lock 안에서 호출됨 → 반영된 상품의 캐시(반영 전 DB 값)를 지움
+    items = counts.get('products')
+    if not items:
+        return
+    with _lock:
+        for key in items:
+            if key.isdigit():
+                _cache.pop(int(key), None)
+
+
+add_flush_listener(_on_views_flushed)
+add_change_listener(invalidate_product_detail)
+
+
+def get_product_detail_cache_stats():
+    with _lock:
+        return {**_stats, 'size': len(_cache), 'ttl': PRODUCT_DETAIL_CACHE_TTL}
@@ -0,0 +1,277 @@
+# 상품 n-gram 검색 색인 모듈
+# products.food_products(상품명)/details_info(상세정보)를 글자 단위 1-gram/2-gram 역색인으로 메모리에 유지
+# 띄어쓰기가 일정하지 않은 한국어 상품명도 부분 문자열로 찾을 수 있음 ("돼지고기" → "국내산돼지고기앞다리", "돼지 고기 앞다리")
+# - 검색: 키워드마다 모든 n-gram을 가진 상품을 찾아 일치한 키워드 수 → 상품명 일치 수 → 조회수 순으로 정렬
+# - 갱신: PRODUCT_SEARCH_REFRESH초마다 원문 해시를 비교해 바뀐/추가된 상품만 다시 색인하고 삭제된 상품은 제거 (증분)
+# - 상품별 알레르기 마스크도 함께 계산해 두므로 알레르기 필터는 비트 연산 한 번
+import re
+import threading
+import time
+import unicodedata
+from config import get_db_connection, PRODUCT_SEARCH_REFRESH
+from utils.allergy import compute_allergen_mask
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_BATCH_SIZE = 500
+_TOKEN_PATTERN = re.compile(r'\w+')
+_SOURCE_HASH_SQL = (
+    "MD5(CONCAT_WS(CHAR(31), ISNULL(food_products), COALESCE(food_products, ''), "
+    "ISNULL(details_info), COALESCE(details_info, '')))"
+)
+
+_index = None
+_refresh_lock = threading.Lock()
+_stale = False
+_change_listeners = []
+
+
+def add_change_listener(callback):
+    """증분 갱신에서 추가/수정/삭제된 상품이 발견될 때마다 callback([product_id, ...])을 호출합니다."""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+def _tokens(text):
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', str(text)).lower())
+
+
+def document_grams(text):
+    """
+    색인할 n-gram 집합 (모든 글자와 공백을 뺀 원문에서 인접한 두 글자)
+    공백을 건너뛴 2-gram도 색인하므로 "돼지고기"가 "돼지 고기 앞다리"와도 일치
+    """
+    tokens = _tokens(text)
+    compact = ''.join(tokens)
+    grams = set(compact)
+    grams.update(compact[i:i + 2] for i in range(len(compact) - 1))
+    return grams
+
+
+def query_grams(keyword):
+    """키워드가 일치하려면 상품이 모두 가지고 있어야 하는 n-gram 집합 (한 글자 토큰은 1-gram, 나머지는 2-gram)"""
+    grams = set()
+    for token in _tokens(keyword):
+        if len(token) == 1:
+            grams.add(token)
+        else:
+            grams.update(token[i:i + 2] for i in range(len(token) - 1))
+    return grams
+
+
+def normalize_keywords(keywords):
+    """공백/쉼표로 나눈 검색어 리스트 (중복 제거, 순서 유지)"""
+    if isinstance(keywords, str):
+        keywords = re.split(r'[\s,]+', keywords)
+    seen = {}
+    for keyword in keywords:
+        keyword = unicodedata.normalize('NFKC', str(keyword or '')).strip().lower()
+        if keyword and query_grams(keyword):
+            seen.setdefault(keyword, None)
+    return list(seen)
+
+
+class ProductSearchIndex:
+    """상품 역색인: n-gram → 상품 ID 집합 (전체 텍스트 / 상품명만)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._name_postings = {}
+        self._docs = {}          # product_id → (source_hash, 전체 n-gram, 상품명 n-gram)
+        self.masks = {}          # product_id → 알레르기 마스크
+        self.view_counts = {}    # product_id → 조회수 (동점 정렬용, 갱신 때마다 새로 읽음)
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def source_hash(self, product_id):
+        doc = self._docs.get(product_id)
+        return doc[0] if doc else None
+
+    def product_ids(self):
+        return list(self._docs)
+
+    @staticmethod
+    def _add(postings, product_id, grams):
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {product_id}
+            else:
+                ids.add(product_id)
+
+    @staticmethod
+    def _discard(postings, product_id, grams):
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del postings[gram]
+
+    def apply(self, docs, removed, view_counts):
+        """
+        docs: [(product_id, source_hash, food_products, details_info)] 새로 색인할 상품
+        removed: 색인에서 뺄 상품 ID
+        """
+        prepared = []
+        for product_id, source_hash, name, details in docs:
+            name_grams = frozenset(document_grams(name))
+            all_grams = frozenset(name_grams | document_grams(details))
+            prepared.append((product_id, source_hash, all_grams, name_grams, compute_allergen_mask(name, details)))
+
+        with self._lock:
+            for product_id in list(removed) + [doc[0] for doc in prepared]:
+                old = self._docs.pop(product_id, None)
+                if old is not None:
+                    self._discard(self._postings, product_id, old[1])
+                    self._discard(self._name_postings, product_id, old[2])
+                    self.masks.pop(product_id, None)
+            for product_id, source_hash, all_grams, name_grams, mask in prepared:
+                self._docs[product_id] = (source_hash, all_grams, name_grams)
+                self._add(self._postings, product_id, all_grams)
+                self._add(self._name_postings, product_id, name_grams)
+                self.masks[product_id] = mask
+            self.view_counts = view_counts
+            self.refreshed_at = time.time()
+
+    @staticmethod
+    def _match(postings, grams):
+        # 작은 집합부터 교집합 (하나라도 없으면 바로 종료)
+        sets = []
+        for gram in grams:
+            ids = postings.get(gram)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def search(self, keywords, allergy_mask=0):
+        """
+        키워드별로 일치하는 상품을 찾아 [(product_id, 일치한 키워드 수)]를
+        (일치 수, 상품명 일치 수, 조회수) 내림차순, product_id 오름차순으로 반환합니다.
+        """
+        matched = {}
+        with self._lock:
+            for keyword in normalize_keywords(keywords):
+                grams = query_grams(keyword)
+                hits = self._match(self._postings, grams)
+                if not hits:
+                    continue
+                name_hits = self._match(self._name_postings, grams)
+                for product_id in hits:
+                    counts = matched.get(product_id)
+                    if counts is None:
+                        counts = matched[product_id] = [0, 0]
+                    counts[0] += 1
+                    counts[1] += product_id in name_hits
+            if allergy_mask:
+                masks = self.masks
+                matched = {pid: c for pid, c in matched.items() if masks.get(pid, 0) & allergy_mask == 0}
+            view_counts = self.view_counts
+
+        ranked = sorted(
+            matched.items(),
+            key=lambda item: (-item[1][0], -item[1][1], -view_counts.get(item[0], 0), item[0])
+        )
+        return [(product_id, counts[0]) for product_id, counts in ranked]
+
+
+def _refresh(index):
+    """원문 해시를 비교해 바뀐 상품만 다시 색인하고, 갱신/삭제한 상품 수를 반환합니다."""
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT product_id, COALESCE(view_count, 0) AS view_count, {_SOURCE_HASH_SQL} AS source_hash
+            FROM products
+        """)
+        current = {int(row['product_id']): (row['source_hash'], int(row['view_count'])) for row in cursor.fetchall()}
+
+        changed = [pid for pid, (source_hash, _) in current.items() if index.source_hash(pid) != source_hash]
+        removed = [pid for pid in index.product_ids() if pid not in current]
+
+        docs = []
+        for start in range(0, len(changed), _BATCH_SIZE):
+            chunk = changed[start:start + _BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"SELECT product_id, food_products, details_info FROM products WHERE product_id IN ({placeholders})",
+                tuple(chunk)
+            )
+            for row in cursor.fetchall():
+                product_id = int(row['product_id'])
+                docs.append((product_id, current[product_id][0], row['food_products'], row['details_info']))
+    finally:
+        cursor.close()
+        conn.close()
+
+    initial = not len(index)
+    index.apply(docs, removed, {pid: view_count for pid, (_, view_count) in current.items()})
+    # 첫 색인이 아니면 바뀐 상품을 알림 (상품 상세 캐시 무효화 등)
+    if not initial and (docs or removed):
+        changed_ids = [doc[0] for doc in docs] + removed
+        for callback in list(_change_listeners):
+            try:
+                callback(changed_ids)
+            except Exception:
+                logger.exception("상품 변경 리스너 오류")
+    return len(docs), len(removed)
+
+
+def get_product_search_index():
+    """
+    상품 검색 색인을 반환합니다.
+    PRODUCT_SEARCH_REFRESH가 지났거나 무효화된 경우 증분 갱신하며, 다른 스레드가 갱신 중이면 기존 색인을 그대로 사용합니다.
+    """
+    global _index, _stale
+    index = _index
+    if index is not None and not _stale and time.time() - index.refreshed_at < PRODUCT_SEARCH_REFRESH:
+        return index
+
+    if not _refresh_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is not None and _index is not index:
+            return _index
+        target = index if index is not None else ProductSearchIndex()
+        _stale = False
+        started = time.perf_counter()
+        updated, removed = _refresh(target)
+        _index = target
+        if updated or removed:
+            logger.info(f"상품 검색 색인 갱신: 상품 {len(target)}개 (색인 {updated}, 삭제 {removed}) "
+                        f"{time.perf_counter() - started:.2f}초")
+        return target
+    except Exception as e:
+        if index is not None:
+            # DB 오류 시 기존 색인으로 계속 서비스
+            index.refreshed_at = time.time()
+            logger.warning(f"상품 검색 색인 갱신 실패, 기존 색인 유지: {e}")
+            return index
+        raise
+    finally:
+        _refresh_lock.release()
+
+
+def invalidate_product_search():
+    """상품 정보가 바뀌었을 때 호출하면 다음 검색 때 바뀐 상품을 다시 색인합니다."""
+    global _stale
+    _stale = True
+
+
+def search_products(keywords, limit=20, allergy_mask=0):
+    """검색어(문자열 또는 리스트)로 상품을 찾아 ([(product_id, 일치한 키워드 수)] 상위 limit개, 전체 일치 수)를 반환합니다."""
+    matches = get_product_search_index().search(keywords, allergy_mask=allergy_mask)
+    return matches[:limit], len(matches)
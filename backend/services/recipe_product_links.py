@@ -0,0 +1,304 @@
+# 레시피 → 관련 상품 연결 모듈
+# 음식 상세 API가 요청마다 재료를 나눠 상품을 검색하지 않도록, 레시피별 재료 키워드를 상품 검색 색인(services.product_search)에
+# 한 번 맞춰 보고 순위가 매겨진 (Food_id, product_id, score) 행을 food_product_link 테이블에 저장
+# - 레시피: 재료 원문 해시가 바뀐 레시피만 다시 연결
+# - 상품: 지난 연결 이후 추가/수정/삭제된 상품이 있으면, 그 상품과 연결되어 있었거나 새로 일치하는 레시피만 다시 연결
+# - 알레르기 마스크를 연결 행에 함께 저장해 상세 조회는 인덱스 조회 한 번으로 끝남
+# - 서버: start_recipe_link_refresh()가 띄운 스레드가 RECIPE_LINK_REFRESH초마다, 상품 검색 색인이 바뀐 상품을 찾으면 바로
+#   증분 연결 (여러 워커 프로세스 중 MySQL 이름 잠금을 얻은 한 곳만 실행)
+#
+# 수동 실행: python -m services.recipe_product_links [--full]
+import sys
+import threading
+import time
+from config import get_db_connection, RECIPE_LINK_REFRESH
+from services.product_search import ProductSearchIndex, get_product_search_index, add_change_listener
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LINKS_PER_FOOD = 20          # 레시피당 저장할 상품 수 (알레르기로 걸러도 상세 화면에 6개가 남도록 넉넉히)
+LINKER_VERSION = '2'         # 키워드 추출/순위 방식이 바뀌면 올려서 전체 다시 연결
+_BATCH_SIZE = 500
+_LOCK_NAME = 'recipe_product_links'   # 프로세스 간 동시 연결 방지용 GET_LOCK 이름
+_tables_ready = False
+_worker = None
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def extract_material_keywords(materials):
+    """Food_materials('돼지고기 200g, 양파 1개, ...')에서 재료 이름 키워드만 추출합니다."""
+    if not materials:
+        return []
+    return [m.strip().split(' ')[0] for m in materials.split(',') if m.strip()]
+
+
+def ensure_recipe_product_link_tables():
+    """연결 테이블이 없으면 생성합니다. (프로세스당 한 번만 실행)"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `food_product_link` (
+              `Food_id` VARCHAR(50) NOT NULL,
+              `product_id` INT NOT NULL,
+              `rank_no` SMALLINT NOT NULL,
+              `score` DOUBLE NOT NULL,
+              `allergen_mask` INT UNSIGNED NOT NULL DEFAULT 0,
+              PRIMARY KEY (`Food_id`, `product_id`),
+              KEY `idx_food_product_link_rank` (`Food_id`, `rank_no`),
+              KEY `idx_food_product_link_product` (`product_id`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        # 레시피별 마지막으로 연결한 재료 원문 해시 (행이 있으면 연결이 끝난 레시피)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `food_product_link_state` (
+              `Food_id` VARCHAR(50) PRIMARY KEY,
+              `source_hash` CHAR(32) NOT NULL,
+              `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        # 마지막 연결 때 사용한 상품 원문 해시 (상품 변경 감지용)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS `product_link_source` (
+              `product_id` INT PRIMARY KEY,
+              `source_hash` CHAR(32) NOT NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """
+        )
+        conn.commit()
+        _tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _in_chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _BATCH_SIZE):
+        chunk = values[start:start + _BATCH_SIZE]
+        yield chunk, ', '.join(['%s'] * len(chunk))
+
+
+def _changed_products(cursor, index):
+    """지난 연결 이후 추가/수정된 상품 ID와 삭제된 상품 ID"""
+    cursor.execute("SELECT product_id, source_hash FROM product_link_source")
+    linked = {int(row['product_id']): row['source_hash'] for row in cursor.fetchall()}
+    current = {pid: index.source_hash(pid) for pid in index.product_ids()}
+    changed = [pid for pid, source_hash in current.items() if linked.get(pid) != source_hash]
+    removed = [pid for pid in linked if pid not in current]
+    return changed, removed, current
+
+
+def _foods_affected_by_products(cursor, foods, changed, removed):
+    """바뀐 상품과 연결되어 있던 레시피 + 바뀐 상품에 새로 일치하는 레시피"""
+    affected = set()
+    for chunk, placeholders in _in_chunks(changed + removed):
+        cursor.execute(f"SELECT DISTINCT Food_id FROM food_product_link WHERE product_id IN ({placeholders})", tuple(chunk))
+        affected.update(row['Food_id'] for row in cursor.fetchall())
+
+    if changed:
+        # 바뀐 상품만으로 작은 색인을 만들어 레시피 키워드를 맞춰 봄
+        subset = ProductSearchIndex()
+        docs = []
+        for chunk, placeholders in _in_chunks(changed):
+            cursor.execute(
+                f"SELECT product_id, food_products, details_info FROM products WHERE product_id IN ({placeholders})",
+                tuple(chunk)
+            )
+            docs.extend((int(row['product_id']), None, row['food_products'], row['details_info'])
+                        for row in cursor.fetchall())
+        subset.apply(docs, [], {})
+        for food_id, materials in foods.items():
+            if food_id not in affected and subset.search(extract_material_keywords(materials)):
+                affected.add(food_id)
+    return affected
+
+
+def link_recipe_products(full=False):
+    """
+    레시피별 관련 상품을 계산해 food_product_link에 저장합니다.
+    full=False면 재료가 바뀐 레시피와 바뀐 상품의 영향을 받는 레시피만 다시 연결합니다.
+    반환값: {'foods': 다시 연결한 레시피 수, 'products': 변경 감지된 상품 수}
+    """
+    ensure_recipe_product_link_tables()
+    index = get_product_search_index()
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """
+            SELECT f.Food_id, f.Food_materials,
+                   MD5(CONCAT_WS(CHAR(31), %s, ISNULL(f.Food_materials), COALESCE(f.Food_materials, ''))) AS source_hash,
+                   s.source_hash AS linked_hash
+            FROM food f
+            LEFT JOIN food_product_link_state s ON s.Food_id = f.Food_id
+            """,
+            (LINKER_VERSION,)
+        )
+        rows = cursor.fetchall()
+        foods = {str(row['Food_id']): row['Food_materials'] for row in rows}
+        hashes = {str(row['Food_id']): row['source_hash'] for row in rows}
+
+        changed_products, removed_products, product_hashes = _changed_products(cursor, index)
+        if full:
+            targets = set(foods)
+        else:
+            targets = {str(row['Food_id']) for row in rows if row['linked_hash'] != row['source_hash']}
+            targets |= _foods_affected_by_products(cursor, foods, changed_products, removed_products)
+            targets &= set(foods)
+
+        insert_sql = """
+            INSERT INTO food_product_link (Food_id, product_id, rank_no, score, allergen_mask)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        state_sql = """
+            INSERT INTO food_product_link_state (Food_id, source_hash)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE source_hash = VALUES(source_hash)
+        """
+        for chunk, placeholders in _in_chunks(sorted(targets)):
+            links = []
+            for food_id in chunk:
+                matches = index.search(extract_material_keywords(foods[food_id]))[:LINKS_PER_FOOD]
+                links.extend((food_id, product_id, rank_no, match_count, index.masks.get(product_id, 0))
+                             for rank_no, (product_id, match_count) in enumerate(matches, 1))
+            cursor.execute(f"DELETE FROM food_product_link WHERE Food_id IN ({placeholders})", tuple(chunk))
+            if links:
+                cursor.executemany(insert_sql, links)
+            cursor.executemany(state_sql, [(food_id, hashes[food_id]) for food_id in chunk])
+
+        # 이번에 반영한 상품 해시 기록, 삭제된 상품/레시피의 연결 정리
+        if full:
+            cursor.execute("DELETE FROM product_link_source")
+            changed_products = list(product_hashes)
+        else:
+            for chunk, placeholders in _in_chunks(removed_products):
+                cursor.execute(f"DELETE FROM product_link_source WHERE product_id IN ({placeholders})", tuple(chunk))
+        for chunk, placeholders in _in_chunks(removed_products):
+            cursor.execute(f"DELETE FROM food_product_link WHERE product_id IN ({placeholders})", tuple(chunk))
+        for chunk, _ in _in_chunks(changed_products):
+            cursor.executemany(
+                """
+                INSERT INTO product_link_source (product_id, source_hash) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE source_hash = VALUES(source_hash)
+                """,
+                [(pid, product_hashes[pid]) for pid in chunk]
+            )
+        cursor.execute("""
+            DELETE s FROM food_product_link_state s
+            LEFT JOIN food f ON f.Food_id = s.Food_id
+            WHERE f.Food_id IS NULL
+        """)
+        cursor.execute("""
+            DELETE l FROM food_product_link l
+            LEFT JOIN food f ON f.Food_id = l.Food_id
+            WHERE f.Food_id IS NULL
+        """)
+        conn.commit()
+        return {'foods': len(targets), 'products': len(changed_products) + len(removed_products)}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def refresh_recipe_product_links():
+    """
+    다른 프로세스가 연결 중이 아니면 증분 연결을 실행하고 link_recipe_products()의 결과를 반환합니다. (연결 중이면 None)
+    여러 워커가 같은 레시피의 연결을 동시에 지우고 다시 넣지 않도록 MySQL 이름 잠금(GET_LOCK)을 잡은 곳에서만 실행합니다.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (_LOCK_NAME,))
+        row = cursor.fetchone()
+        if not row or row['acquired'] != 1:
+            return None
+        try:
+            return link_recipe_products()
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s) AS released", (_LOCK_NAME,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _on_products_changed(product_ids):
+    # 상품 검색 색인이 추가/수정/삭제된 상품을 찾으면 주기를 기다리지 않고 다시 연결
+    _wakeup.set()
+
+
+def _run():
+    while True:
+        try:
+            counts = refresh_recipe_product_links()
+            if counts and (counts['foods'] or counts['products']):
+                logger.info(f"레시피-상품 연결 갱신: {counts}")
+        except Exception as e:
+            logger.warning(f"레시피-상품 연결 갱신 실패 (다음 주기에 다시 시도, 연결되지 않은 레시피는 검색 색인으로 찾습니다): {e}")
+        _wakeup.wait(RECIPE_LINK_REFRESH)
+        _wakeup.clear()
+
+
+def start_recipe_link_refresh():
+    """
+    레시피-상품 연결을 바로 한 번, 이후 RECIPE_LINK_REFRESH초마다(상품 변경이 감지되면 즉시) 증분 갱신하는
+    백그라운드 스레드를 띄웁니다. (프로세스당 한 번, RECIPE_LINK_REFRESH가 0이면 실행하지 않음)
+    """
+    global _worker
+    if RECIPE_LINK_REFRESH <= 0 or _worker is not None:
+        return
+    with _worker_lock:
+        if _worker is not None:
+            return
+        add_change_listener(_on_products_changed)
+        _worker = threading.Thread(target=_run, name='recipe-link-refresh', daemon=True)
+        _worker.start()
+
+
+def get_linked_products(cursor, food_id, allergy_mask=0, limit=6):
+    """
+    미리 연결해 둔 관련 상품을 순위대로 반환합니다. (알레르기 마스크와 겹치는 상품 제외)
+    아직 연결되지 않은 레시피면 None (호출자가 검색 색인으로 직접 찾음)
+    cursor는 dictionary 커서여야 합니다.
+    """
+    ensure_recipe_product_link_tables()
+    cursor.execute(
+        """
+        SELECT p.product_id, p.food_products, p.category, p.price, p.img
+        FROM food_product_link_state s
+        LEFT JOIN food_product_link l
+               ON l.Food_id = s.Food_id AND (l.allergen_mask & %s) = 0
+        LEFT JOIN products p ON p.product_id = l.product_id
+        WHERE s.Food_id = %s
+        ORDER BY l.rank_no
+        LIMIT %s
+        """,
+        (allergy_mask, food_id, limit)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    return [row for row in rows if row['product_id'] is not None]
+
+
+if __name__ == '__main__':
+    full_rebuild = '--full' in sys.argv[1:]
+    started = time.perf_counter()
+    counts = link_recipe_products(full=full_rebuild)
+    elapsed = time.perf_counter() - started
+    print(f"레시피-상품 연결 완료 ({'전체' if full_rebuild else '증분'}): {counts} - {elapsed:.2f}초")
@@ -0,0 +1,216 @@
+# 조회수 write-behind 모듈
+# 상세 조회 때마다 food/products 행을 UPDATE + COMMIT 하면 인기 항목의 행 잠금이 몰리므로,
+# 조회수 증가분은 프로세스 메모리에 모아 두고 백그라운드 스레드가 주기적으로 한 번의 UPDATE ... CASE로 반영
+# - 반영 주기: VIEW_COUNT_FLUSH_INTERVAL초 (0이면 기록 즉시 반영)
+# - 대기 항목이 VIEW_COUNT_MAX_PENDING개를 넘으면 주기를 기다리지 않고 반영
+# - 프로세스 종료 시(atexit) 남은 증가분을 반영. 비정상 종료 시 잃을 수 있는 것은 최대 한 주기 분량
+# - 반영에 실패한 증가분은 버리지 않고 다음 주기에 다시 시도
+# - 반영 중인 증가분(in-flight)은 커밋이 끝나 리스너가 호출될 때까지 미반영분으로 계속 보이며,
+#   커밋 후 정리·리스너 호출은 view_count_lock 안에서 한 번에 일어남 (상세 캐시가 같은 락으로 일관된 값을 읽음)
+import atexit
+import threading
+import time
+from config import get_db_connection, VIEW_COUNT_FLUSH_INTERVAL, VIEW_COUNT_MAX_PENDING
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 조회수 대상: 종류 → (테이블, 키 컬럼)
+VIEW_TABLES = {
+    'food': ('food', 'Food_id'),
+    'products': ('products', 'product_id'),
+}
+
+_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_pending = {kind: {} for kind in VIEW_TABLES}
+_pending_count = 0
+_inflight = {kind: {} for kind in VIEW_TABLES}   # 버퍼에서 꺼내 DB에 반영 중인 증가분
+_epoch = 0                                       # 커밋이 끝난 반영 횟수
+view_count_lock = _lock
+_flush_lock = threading.Lock()   # 주기 반영과 종료 시 반영이 겹치지 않도록
+_wakeup = threading.Event()
+_worker = None
+_flush_listeners = []
+_stats = {'recorded': 0, 'flushed': 0, 'flushes': 0, 'failures': 0, 'last_flush_at': None}
+
+
+def add_flush_listener(callback):
+    """
+    반영이 커밋될 때마다 callback({종류: {id 문자열: 증가분}})을 호출합니다. (순위/상세 캐시 갱신용)
+    view_count_lock을 잡은 채로 호출하므로 callback은 이 락을 다시 잡거나 DB에 접근하면 안 됩니다.
+    """
+    if callback not in _flush_listeners:
+        _flush_listeners.append(callback)
+
+
+def record_view(kind, item_id, n=1):
+    """조회수 증가분을 버퍼에 기록합니다. (DB에는 다음 반영 때 적용)"""
+    global _pending_count
+    if kind not in VIEW_TABLES:
+        raise ValueError(f'알 수 없는 조회수 대상: {kind}')
+    key = str(item_id)
+    with _lock:
+        bucket = _pending[kind]
+        if key not in bucket:
+            _pending_count += 1
+        bucket[key] = bucket.get(key, 0) + n
+        _stats['recorded'] += n
+        pending = _pending_count
+
+    if VIEW_COUNT_FLUSH_INTERVAL <= 0:
+        flush_views()
+        return
+    _ensure_worker()
+    if pending >= VIEW_COUNT_MAX_PENDING:
+        _wakeup.set()
+
+
+def flush_state(kind, item_id):
+    """
+    (반영 횟수, 반영 중 여부). view_count_lock을 잡은 채로 호출합니다.
+    DB 조회 전후의 값이 같고 반영 중이 아니었다면 그 사이 이 항목의 커밋이 없었으므로
+    조회한 view_count + unflushed_views()가 정확한 조회수입니다.
+    """
+    return _epoch, str(item_id) in _inflight[kind]
+
+
+def unflushed_views(kind, item_id, include_inflight=True):
+    """아직 DB에 커밋되지 않은 증가분 (대기 + 반영 중). view_count_lock을 잡은 채로 호출합니다."""
+    key = str(item_id)
+    views = _pending[kind].get(key, 0)
+    if include_inflight:
+        views += _inflight[kind].get(key, 0)
+    return views
+
+
+def _take_pending():
+    """버퍼를 비우고 그 내용을 반영 중(in-flight)으로 옮깁니다."""
+    global _pending, _pending_count, _inflight
+    with _lock:
+        taken = _pending
+        _pending = {kind: {} for kind in VIEW_TABLES}
+        _pending_count = 0
+        _inflight = taken
+    return taken
+
+
+def _restore_pending(counts):
+    """반영하지 못한 증가분을 버퍼에 되돌립니다. (그 사이 새로 들어온 증가분과 합침)"""
+    global _pending_count, _inflight
+    with _lock:
+        for kind, items in counts.items():
+            bucket = _pending[kind]
+            for key, n in items.items():
+                if key not in bucket:
+                    _pending_count += 1
+                bucket[key] = bucket.get(key, 0) + n
+        _inflight = {kind: {} for kind in VIEW_TABLES}
+
+
+def _finish_flush(counts, total):
+    """커밋된 증가분을 반영 중에서 지우고 리스너를 호출합니다. (읽는 쪽이 중간 상태를 보지 않도록 한 락 안에서)"""
+    global _inflight, _epoch
+    with _lock:
+        _inflight = {kind: {} for kind in VIEW_TABLES}
+        _epoch += 1
+        _stats['flushed'] += total
+        _stats['flushes'] += 1
+        _stats['last_flush_at'] = time.time()
+        for callback in list(_flush_listeners):
+            try:
+                callback(counts)
+            except Exception:
+                logger.exception("조회수 반영 리스너 오류")
+
+
+def _apply_counts(cursor, kind, items):
+    table, key_column = VIEW_TABLES[kind]
+    for start in range(0, len(items), _BATCH_SIZE):
+        chunk = items[start:start + _BATCH_SIZE]
+        cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+        placeholders = ', '.join(['%s'] * len(chunk))
+        params = [v for key, n in chunk for v in (key, n)] + [key for key, _ in chunk]
+        cursor.execute(f"""
+            UPDATE {table}
+            SET view_count = COALESCE(view_count, 0) + CASE {key_column} {cases} ELSE 0 END
+            WHERE {key_column} IN ({placeholders})
+        """, params)
+
+
+def flush_views():
+    """버퍼에 모인 조회수 증가분을 DB에 반영하고 반영한 증가분 합계를 반환합니다."""
+    with _flush_lock:
+        counts = _take_pending()
+        total = sum(n for items in counts.values() for n in items.values())
+        if not total:
+            return 0
+
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                for kind, items in counts.items():
+                    if items:
+                        # 키 순서로 정렬해 여러 워커가 동시에 반영해도 행 잠금 순서가 같도록
+                        _apply_counts(cursor, kind, sorted(items.items()))
+                conn.commit()
+            finally:
+                cursor.close()
+        except Exception as e:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            _restore_pending(counts)
+            with _lock:
+                _stats['failures'] += 1
+            logger.warning(f"조회수 반영 실패 (다음 주기에 다시 시도): {e}")
+            return 0
+        finally:
+            if conn is not None:
+                conn.close()
+
+        _finish_flush(counts, total)
+        logger.debug('조회수 반영', extra={'fields': {kind: len(items) for kind, items in counts.items()}})
+        return total
+
+
+def _run():
+    while True:
+        _wakeup.wait(VIEW_COUNT_FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            flush_views()
+        except Exception:
+            logger.exception("조회수 반영 스레드 오류")
+
+
+def _ensure_worker():
+    """첫 기록 때 반영 스레드를 띄우고 종료 시 반영을 등록합니다. (프로세스당 한 번)"""
+    global _worker
+    if _worker is not None:
+        return
+    with _lock:
+        if _worker is not None:
+            return
+        _worker = threading.Thread(target=_run, name='view-counter-flush', daemon=True)
+        _worker.start()
+    # atexit는 역순으로 실행되므로 앱 시작 시 등록한 풀 정리보다 먼저 실행됨
+    atexit.register(flush_views)
+
+
+def get_view_counter_stats():
+    """버퍼 상태와 누적 반영 통계"""
+    with _lock:
+        return {
+            **_stats,
+            'pending_items': _pending_count,
+            'pending_views': sum(n for items in _pending.values() for n in items.values()),
+            'inflight_views': sum(n for items in _inflight.values() for n in items.values()),
+            'epoch': _epoch,
+            'flush_interval': VIEW_COUNT_FLUSH_INTERVAL,
+        }
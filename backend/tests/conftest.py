@@ -0,0 +1,117 @@
+# 백엔드 테스트 공용 설정
+# - backend 디렉터리를 import 경로에 추가 (python -m pytest를 backend에서 실행)
+# - 백그라운드 갱신 스레드 끄기 (RECIPE_LINK_REFRESH=0)
+# - DB 대신 실행한 SQL을 기록하고 미리 정한 결과를 돌려주는 FakeDB
+import os
+import sys
+from importlib.metadata import version
+
+import pytest
+import werkzeug
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 앱을 import해도 레시피-상품 연결 스레드가 실제 DB에 접속하지 않도록
+os.environ.setdefault('RECIPE_LINK_REFRESH', '0')
+
+# Flask 2.3의 테스트 클라이언트는 Werkzeug 3.1에서 제거된 werkzeug.__version__을 읽음
+if not hasattr(werkzeug, '__version__'):
+    werkzeug.__version__ = version('werkzeug')
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self._rows = []
+        self.lastrowid = None
+        self.description = None
+
+    def execute(self, sql, params=()):
+        sql = ' '.join(str(sql).split())
+        self.db.executed.append((sql, params))
+        self._rows = [dict(row) for row in self.db.respond(sql, params)]
+        self.lastrowid = self.db.lastrowid
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeDB:
+    """on(SQL 조각, 결과)로 응답을 등록. 결과는 행 리스트 또는 (sql, params)를 받는 함수"""
+
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+        self.lastrowid = 1
+        self._handlers = []
+
+    def on(self, fragment, result):
+        self._handlers.append((fragment, result))
+        return self
+
+    def respond(self, sql, params):
+        for fragment, result in self._handlers:
+            if fragment in sql:
+                return result(sql, params) if callable(result) else result
+        return []
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def queries(self, fragment=''):
+        return [sql for sql, _ in self.executed if fragment in sql]
+
+
+@pytest.fixture
+def fake_db():
+    return FakeDB()
+
+
+@pytest.fixture
+def client():
+    from app import app
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_header(monkeypatch):
+    """auth_header(user_id) → 그 사용자로 로그인한 Authorization 헤더 (DB 대신 User_id만 있는 사용자 정보 사용)"""
+    import utils.auth as auth
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda user_id: {'User_id': int(user_id), 'Kid_birth': None}))
+    monkeypatch.setattr(auth, '_principal_cache', {})
+    monkeypatch.setattr(auth, '_tokens_by_user', {})
+    return lambda user_id: {'Authorization': f'Bearer {auth.generate_token(user_id)}'}
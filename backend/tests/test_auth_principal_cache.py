@@ -0,0 +1,66 @@
+# 사용자 정보 무효화와 인증 캐시 저장이 겹쳐도 옛 사용자 정보가 캐시에 남지 않는지 확인
+import pytest
+from flask import Flask, jsonify
+
+import utils.auth as auth
+from utils.auth import generate_token, invalidate_user_principal, token_required
+
+
+@pytest.fixture
+def whoami(monkeypatch):
+    monkeypatch.setattr(auth, '_principal_cache', {})
+    monkeypatch.setattr(auth, '_tokens_by_user', {})
+    monkeypatch.setattr(auth, '_user_generations', {})
+    app = Flask(__name__)
+
+    @app.route('/whoami')
+    @token_required
+    def whoami_route(current_user):
+        return jsonify(current_user)
+
+    client = app.test_client()
+    return lambda token: client.get('/whoami', headers={'Authorization': f'Bearer {token}'}).get_json()
+
+
+def test_principal_is_cached(whoami, monkeypatch):
+    lookups = []
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda uid: lookups.append(uid) or {'User_id': 1}))
+    token = generate_token(1)
+
+    whoami(token)
+    whoami(token)
+
+    assert len(lookups) == 1
+
+
+def test_invalidation_during_lookup_is_not_overwritten(whoami, monkeypatch):
+    rows = [{'User_id': 1, 'name': 'old'}]
+
+    def get_by_id(uid):
+        row = rows[0]
+        # 옛 행을 읽은 직후 다른 요청이 프로필을 바꾸고 캐시를 무효화
+        rows[0] = {'User_id': 1, 'name': 'new'}
+        invalidate_user_principal(1)
+        return row
+
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(get_by_id))
+    token = generate_token(1)
+
+    assert whoami(token)['name'] == 'old'
+    assert token not in auth._principal_cache
+
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda uid: rows[0]))
+    assert whoami(token)['name'] == 'new'
+    assert token in auth._principal_cache
+
+
+def test_invalidation_drops_cached_principal(whoami, monkeypatch):
+    rows = [{'User_id': 1, 'name': 'old'}]
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda uid: rows[0]))
+    token = generate_token(1)
+    whoami(token)
+
+    rows[0] = {'User_id': 1, 'name': 'new'}
+    invalidate_user_principal(1)
+
+    assert whoami(token)['name'] == 'new'
@@ -0,0 +1,100 @@
+# 식단일지 저장/수정/삭제가 사용자 선호도에 증분 반영되는지 확인
+import pytest
+
+import models.food_preference as food_preference
+import routes.food_diary as food_diary
+
+USER_ID = 1
+MEAL = {'Meal_id': 7, 'Rice_id': 'FD1', 'Soup_id': 'FD2', 'SideDish1_id': 'FD3',
+        'SideDish2_id': 'FD4', 'MainDish_id': 'FD5', 'Dessert_id': 'FD6'}
+NO_RATINGS = {key: None for key in food_preference.RATING_SLOTS}
+
+
+class _Catalog:
+    embeddings = ()   # 임베딩이 없으면 취향 벡터는 건너뜀
+
+    def get_food(self, food_id):
+        return {'Food_id': food_id}
+
+
+@pytest.fixture
+def preference(monkeypatch, fake_db):
+    monkeypatch.setattr(food_diary, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(food_preference, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(food_preference, 'get_food_catalog', lambda: _Catalog())
+    monkeypatch.setattr(food_preference, '_table_ready', True)
+    monkeypatch.setattr(food_preference, '_cache', {})
+    monkeypatch.setattr(food_preference, '_load_preference', lambda uid: food_preference.UserPreference(uid))
+    fake_db.on('FROM Meal', [MEAL])
+    # 캐시에 올라간 모델이 변화량을 더한 새 모델로 바뀌므로 저장 전에 한 번 읽어 둠
+    food_preference.get_user_preference(USER_ID)
+    return lambda: food_preference.get_user_preference(USER_ID)
+
+
+def test_post_diary_updates_preference(client, fake_db, preference, auth_header):
+    fake_db.on('FROM food_diary', [])
+    response = client.post('/api/food-diary', json={
+        'user_id': USER_ID, 'date': '2026-10-18', 'meal_id': 7,
+        'rice_rating': 5, 'soup_rating': 1,
+    }, headers=auth_header(USER_ID))
+
+    assert response.status_code == 200
+    assert preference().food_score('FD1') > 0
+    assert preference().food_score('FD2') < 0
+    assert preference().food_score('FD3') == 0
+    assert fake_db.queries('INSERT INTO user_food_preference')
+
+
+def test_put_diary_replaces_old_ratings(client, fake_db, preference, auth_header):
+    old = {'diary_id': 3, 'meal_id': 7, **NO_RATINGS, 'rice_rating': 5}
+    fake_db.on('FROM food_diary', [old])
+    food_preference.record_diary_ratings(USER_ID, MEAL, old, None, None)
+    assert preference().food_score('FD1') > 0
+
+    response = client.put('/api/food-diary/3', json={'rice_rating': 1}, headers=auth_header(USER_ID))
+
+    assert response.status_code == 200
+    assert preference().food_stats['FD1'] == [-2.0, 1]
+
+
+def test_delete_diary_removes_its_contribution(client, fake_db, preference, auth_header):
+    old = {'diary_id': 3, 'meal_id': 7, **NO_RATINGS, 'rice_rating': 5, 'main_dish_rating': 2}
+    fake_db.on('FROM food_diary', [old])
+    food_preference.record_diary_ratings(USER_ID, MEAL, old, None, None)
+
+    response = client.delete('/api/food-diary/3', headers=auth_header(USER_ID))
+
+    assert response.status_code == 200
+    assert preference().food_score('FD1') == 0
+    assert preference().food_score('FD5') == 0
+    assert preference().food_stats['FD1'] == [0.0, 0]
+
+
+def test_diary_routes_require_token(client, fake_db, preference):
+    assert client.post('/api/food-diary', json={'user_id': USER_ID, 'date': '2026-10-18'}).status_code == 401
+    assert client.get('/api/food-diary/1?year=2026&month=10').status_code == 401
+    assert client.put('/api/food-diary/3', json={'user_id': USER_ID}).status_code == 401
+    assert client.delete('/api/food-diary/3', json={'user_id': USER_ID}).status_code == 401
+    assert fake_db.executed == []
+
+
+def test_body_user_id_is_ignored(client, fake_db, preference, auth_header):
+    fake_db.on('FROM food_diary', [])
+    response = client.post('/api/food-diary', json={'user_id': 99, 'date': '2026-10-18', 'meal_id': 7},
+                           headers=auth_header(USER_ID))
+
+    assert response.status_code == 200
+    insert_sql, params = next(q for q in fake_db.executed if 'INSERT INTO food_diary' in q[0])
+    assert params[0] == USER_ID
+
+
+@pytest.mark.parametrize('path', [
+    '/api/food-diary/2?year=2026&month=10',
+    '/api/food-diary/2/2026-10-18',
+    '/api/food-diary/stats/2?year=2026&month=10',
+])
+def test_other_users_diary_is_forbidden(client, fake_db, preference, auth_header, path):
+    response = client.get(path, headers=auth_header(USER_ID))
+
+    assert response.status_code == 403
+    assert fake_db.executed == []
@@ -0,0 +1,99 @@
+# 평점 반영과 선호도 캐시 재로드가 겹쳐도 변화량이 두 번 더해지거나 빠지지 않는지 확인
+import pytest
+
+import models.food_preference as food_preference
+
+USER_ID = 1
+MEAL = {'Rice_id': 'FD1', 'Soup_id': 'FD2'}
+RICE_5 = {'rice_rating': 5}
+
+
+class _Catalog:
+    embeddings = ()
+
+    def get_food(self, food_id):
+        return {'Food_id': food_id}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """user_food_preference 대신 쓰는 메모리 저장소 (after_commit: 커밋 직후 실행할 함수)"""
+    state = {'rows': {}, 'after_commit': None, 'loads': 0}
+
+    def write_deltas(user_id, deltas, taste_delta, weight_delta):
+        for food_id, (d_sum, d_count) in deltas.items():
+            row = state['rows'].setdefault(food_id, [0.0, 0])
+            row[0] += d_sum
+            row[1] += d_count
+        hook, state['after_commit'] = state['after_commit'], None
+        if hook:
+            hook()
+
+    def load_preference(user_id):
+        state['loads'] += 1
+        return food_preference.UserPreference(user_id, {fid: list(row) for fid, row in state['rows'].items()})
+
+    monkeypatch.setattr(food_preference, '_write_deltas', write_deltas)
+    monkeypatch.setattr(food_preference, '_load_preference', load_preference)
+    monkeypatch.setattr(food_preference, 'get_food_catalog', lambda: _Catalog())
+    monkeypatch.setattr(food_preference, '_table_ready', True)
+    monkeypatch.setattr(food_preference, '_cache', {})
+    monkeypatch.setattr(food_preference, '_writes', {})
+    return state
+
+
+def test_cached_model_gets_delta_without_reload(store):
+    before = food_preference.get_user_preference(USER_ID)
+
+    food_preference.record_diary_ratings(USER_ID, MEAL, RICE_5)
+
+    after = food_preference.get_user_preference(USER_ID)
+    assert after.food_stats['FD1'] == [2.0, 1]
+    assert store['loads'] == 1
+    # 다른 스레드가 읽고 있던 모델은 바뀌지 않음
+    assert before.food_stats == {}
+
+
+def test_reload_between_commit_and_apply_is_not_double_counted(store):
+    cached = food_preference.get_user_preference(USER_ID)
+
+    def expire_and_reload():
+        cached.loaded_at = 0
+        reloaded = food_preference.get_user_preference(USER_ID)
+        assert reloaded.food_stats['FD1'] == [2.0, 1]
+
+    store['after_commit'] = expire_and_reload
+    food_preference.record_diary_ratings(USER_ID, MEAL, RICE_5)
+
+    assert food_preference.get_user_preference(USER_ID).food_stats['FD1'] == [2.0, 1]
+
+
+def test_load_overlapping_a_write_is_not_cached(store, monkeypatch):
+    load = food_preference._load_preference
+
+    def load_after_write(user_id):
+        # 로드 시작 후, DB를 읽기 전에 다른 요청의 평점 반영이 커밋됨
+        monkeypatch.setattr(food_preference, '_load_preference', load)
+        food_preference.record_diary_ratings(USER_ID, MEAL, RICE_5)
+        return load(user_id)
+
+    monkeypatch.setattr(food_preference, '_load_preference', load_after_write)
+    first = food_preference.get_user_preference(USER_ID)
+
+    assert first.food_stats['FD1'] == [2.0, 1]
+    assert USER_ID not in food_preference._cache
+    assert food_preference.get_user_preference(USER_ID).food_stats['FD1'] == [2.0, 1]
+
+
+def test_failed_write_leaves_cache_unchanged(store, monkeypatch):
+    food_preference.get_user_preference(USER_ID)
+
+    def fail(*args):
+        raise RuntimeError('db down')
+
+    monkeypatch.setattr(food_preference, '_write_deltas', fail)
+    with pytest.raises(RuntimeError):
+        food_preference.record_diary_ratings(USER_ID, MEAL, RICE_5)
+
+    assert food_preference.get_user_preference(USER_ID).food_stats == {}
+    assert food_preference._writes[USER_ID] == [0, 0]
@@ -0,0 +1,44 @@
+import pytest
+
+import routes.meal as meal
+import utils.auth as auth
+from utils.auth import generate_token
+
+
+@pytest.fixture
+def refresh_env(monkeypatch):
+    calls = []
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda user_id: {'User_id': int(user_id), 'Kid_birth': None}))
+    monkeypatch.setattr(auth, '_principal_cache', {})
+    monkeypatch.setattr(auth, '_tokens_by_user', {})
+    monkeypatch.setattr(meal, 'meal_target_for', lambda birth, date: None)
+    monkeypatch.setattr(meal, 'refresh_daily_meal', lambda *args, **kwargs: calls.append(kwargs) or {'nutrition': {}})
+    monkeypatch.setattr(meal.Meal, 'get_by_user_and_date', staticmethod(lambda user_id, date: {'meal_id': 1}))
+    return calls
+
+
+def _refresh(client, body):
+    return client.post('/api/meals/refresh/2024-05-01', json=body,
+                       headers={'Authorization': f'Bearer {generate_token(1)}'})
+
+
+@pytest.mark.parametrize('value', ['fast', '', {}, [], 0, -1, 'nan', 'inf', True])
+def test_invalid_time_budget_is_bad_request(client, refresh_env, value):
+    response = _refresh(client, {'time_budget': value})
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert response.get_json()['message']
+    assert refresh_env == []
+
+
+@pytest.mark.parametrize('body, expected', [
+    ({}, 0.05),
+    ({'time_budget': '0.2'}, 0.2),
+    ({'time_budget': 30}, 1.0),
+])
+def test_valid_time_budget_is_clamped(client, refresh_env, body, expected):
+    response = _refresh(client, body)
+
+    assert response.status_code == 200
+    assert refresh_env[0]['time_budget'] == expected
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from services.meal_optimizer import SIDE_SLOTS
+from services.meal_scoring import ComboScorer
+from services.meal_variety import VarietyPlanner, plan_variety
+
+TARGET = {'calories': 600, 'carbohydrate': 75, 'protein': 20, 'fat': 20, 'sodium': 700}
+ROLES = {'밥': 2, '국&찌개': 2, '일품': 2, '후식': 2}
+
+
+def _scorer(n_sides):
+    foods, nutrition = [], {}
+    for role, count in list(ROLES.items()) + [('반찬', n_sides)]:
+        for i in range(count):
+            food_id = f'{role}-{i}'
+            foods.append({'Food_id': food_id, 'Food_role': role})
+            nutrition[food_id] = {'calories': 100 + 10 * i, 'carbohydrate': 12, 'protein': 3 + i, 'fat': 3, 'sodium': 110}
+    return ComboScorer(foods, nutrition, {})
+
+
+def _side_ids(day):
+    return [day[s]['Food_id'] if day[s] else None for s in SIDE_SLOTS]
+
+
+def test_single_side_dish_is_not_repeated_within_a_day():
+    plan = plan_variety(_scorer(1), TARGET, 5, rng=np.random.default_rng(0), time_budget=0.05)
+
+    for day in plan:
+        assert set(_side_ids(day)) == {None, '반찬-0'}
+
+
+def test_second_side_dish_falls_back_to_full_role_pool():
+    # max_candidates=1 leaves one pruned side dish, the second slot must come from the role's full pool
+    planner = VarietyPlanner(_scorer(3), TARGET, 4, max_candidates=1)
+    assert all(len(planner.slot_candidates[s]) == 1 for s in SIDE_SLOTS)
+
+    plan, _ = planner.solve(0.05, np.random.default_rng(0))
+
+    for row in plan:
+        sides = row[SIDE_SLOTS]
+        assert (sides >= 0).all()
+        assert sides[0] != sides[1]
+
+
+@pytest.mark.parametrize('n_sides', [1, 2, 3, 8])
+def test_no_food_repeats_within_a_day(n_sides):
+    plan = plan_variety(_scorer(n_sides), TARGET, 14, rng=np.random.default_rng(1), time_budget=0.05)
+
+    for day in plan:
+        ids = [f['Food_id'] for f in day if f]
+        assert len(ids) == len(set(ids))
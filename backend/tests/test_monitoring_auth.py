@@ -0,0 +1,57 @@
+import pytest
+
+import routes.monitoring as monitoring
+import utils.auth as auth
+from utils.auth import generate_token
+
+ADMIN_POSTS = [
+    '/api/monitoring/food-catalog/invalidate',
+    '/api/monitoring/view-counter/flush',
+    '/api/monitoring/ranking/invalidate',
+    '/api/monitoring/product-cache/invalidate',
+]
+
+
+@pytest.fixture
+def admin_env(monkeypatch):
+    calls = []
+    monkeypatch.setattr(monitoring, 'MONITORING_ADMIN_USER_IDS', frozenset({'1'}))
+    monkeypatch.setattr(auth.User, 'get_by_id', staticmethod(lambda user_id: {'User_id': int(user_id)}))
+    monkeypatch.setattr(auth, '_principal_cache', {})
+    monkeypatch.setattr(auth, '_tokens_by_user', {})
+    monkeypatch.setattr(monitoring, 'invalidate_food_catalog', lambda: calls.append('catalog'))
+    monkeypatch.setattr(monitoring, 'flush_views', lambda: calls.append('flush') or 0)
+    monkeypatch.setattr(monitoring, 'invalidate_rankings', lambda: calls.append('ranking'))
+    monkeypatch.setattr(monitoring, 'invalidate_product_detail', lambda ids: calls.append('product'))
+    return calls
+
+
+@pytest.mark.parametrize('path', ADMIN_POSTS)
+def test_admin_post_requires_token(client, admin_env, path):
+    response = client.post(path)
+
+    assert response.status_code == 401
+    assert response.get_json()['success'] is False
+    assert admin_env == []
+
+
+@pytest.mark.parametrize('path', ADMIN_POSTS)
+def test_admin_post_rejects_non_admin(client, admin_env, path):
+    response = client.post(path, headers={'Authorization': f'Bearer {generate_token(2)}'})
+
+    assert response.status_code == 403
+    assert response.get_json()['success'] is False
+    assert admin_env == []
+
+
+@pytest.mark.parametrize('path', ADMIN_POSTS)
+def test_admin_post_allows_admin(client, admin_env, path):
+    response = client.post(path, headers={'Authorization': f'Bearer {generate_token(1)}'})
+
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+    assert len(admin_env) == 1
+
+
+def test_stats_stay_readable_without_token(client, admin_env):
+    assert client.get('/api/monitoring/view-counter').status_code == 200
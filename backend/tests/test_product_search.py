@@ -0,0 +1,39 @@
+# 상품 n-gram 색인: 띄어쓰기와 관계없이 부분 문자열로 일치하는지 확인
+import pytest
+
+from services.product_search import ProductSearchIndex
+
+PRODUCTS = [
+    (1, None, '국내산돼지고기앞다리', '냉장'),
+    (2, None, '돼지 고기 앞다리', '냉장'),
+    (3, None, '한우 소고기', '냉장'),
+    (4, None, '양념 소스', '돼지고기 요리용'),
+]
+
+
+@pytest.fixture
+def index():
+    index = ProductSearchIndex()
+    index.apply(PRODUCTS, [], {1: 10, 2: 5, 3: 1, 4: 0})
+    return index
+
+
+@pytest.mark.parametrize('keyword', ['돼지고기', '돼지고기앞다리', '고기앞'])
+def test_unspaced_query_matches_spaced_and_unspaced_names(index, keyword):
+    ids = [product_id for product_id, _ in index.search([keyword])]
+
+    assert 1 in ids and 2 in ids
+    assert 3 not in ids
+
+
+def test_details_match_ranks_after_name_matches(index):
+    ids = [product_id for product_id, _ in index.search(['돼지고기'])]
+
+    # 상품명 일치(1, 2)가 상세정보만 일치(4)보다 앞, 상품명 일치끼리는 조회수 순
+    assert ids == [1, 2, 4]
+
+
+def test_spaced_query_still_matches(index):
+    ids = [product_id for product_id, _ in index.search(['돼지 고기'])]
+
+    assert ids[:2] == [1, 2]
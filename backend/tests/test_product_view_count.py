@@ -0,0 +1,76 @@
+# 상품 상세 캐시와 조회수 write-behind 반영이 어떤 순서로 겹쳐도 조회수가 이중으로 세어지거나 빠지지 않는지 확인
+import pytest
+
+import services.product_detail as product_detail
+import services.view_counter as view_counter
+
+PRODUCT_ID = 42
+
+
+@pytest.fixture
+def products_table(monkeypatch, fake_db):
+    state = {'view_count': 10, 'flush_during_read': None}
+
+    def select_product(sql, params):
+        hook = state['flush_during_read']
+        state['flush_during_read'] = None
+        if hook == 'before_read':
+            view_counter.flush_views()
+        row = {'product_id': PRODUCT_ID, 'food_products': '상품', 'view_count': state['view_count'], 'images': None}
+        if hook == 'after_read':
+            view_counter.flush_views()
+        return [row]
+
+    def update_counts(sql, params):
+        # UPDATE ... CASE product_id WHEN %s THEN %s ... 의 증가분을 적용
+        state['view_count'] += sum(params[1:len(params) // 3 * 2:2])
+        return []
+
+    fake_db.on('UPDATE products', update_counts)
+    fake_db.on('FROM products p', select_product)
+    monkeypatch.setattr(product_detail, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(view_counter, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(view_counter, '_ensure_worker', lambda: None)
+    monkeypatch.setattr(product_detail, '_cache', product_detail.OrderedDict())
+    view_counter.flush_views()   # 이전 테스트에서 남은 증가분 정리
+    state['view_count'] = 10
+    return state
+
+
+def _displayed():
+    return product_detail.get_product_detail(PRODUCT_ID)['view_count']
+
+
+def _record(n):
+    for _ in range(n):
+        view_counter.record_view('products', PRODUCT_ID)
+
+
+def test_cache_load_then_flush(products_table):
+    _record(3)
+    assert _displayed() == 13          # DB 10 + 미반영 3, 이 값이 캐시에 올라감
+
+    view_counter.flush_views()
+    assert products_table['view_count'] == 13
+    assert _displayed() == 13          # 커밋 후 캐시가 지워져 다시 읽음 (이중 계산 없음)
+    _record(1)
+    assert _displayed() == 14
+
+
+@pytest.mark.parametrize('hook', ['before_read', 'after_read'])
+def test_flush_commits_during_cache_load(products_table, hook):
+    _record(3)
+    products_table['flush_during_read'] = hook
+
+    assert _displayed() == 13          # 겹친 조회는 버리고 커밋 후 값으로 다시 읽음
+    assert products_table['view_count'] == 13
+    assert _displayed() == 13          # 캐시에 반영 전 값이 남지 않음
+
+
+def test_flush_before_cache_load(products_table):
+    _record(2)
+    view_counter.flush_views()
+    assert _displayed() == 12
+    _record(1)
+    view_counter.flush_views()
+    assert _displayed() == 13
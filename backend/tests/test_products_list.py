@@ -0,0 +1,68 @@
+# 페이지네이션 없는 상품 목록: 전체 순위가 메모리에 있으면 DB 정렬 없이 순위 순서로 반환
+import pytest
+
+import routes.products as products
+from services.popularity_ranking import PopularityRanking
+
+EGG = 1 << 0   # 테스트용 알레르기 비트
+
+
+def _rows():
+    return [
+        {'product_id': 1, 'food_products': '두부', 'view_count': 5},
+        {'product_id': 2, 'food_products': '계란', 'view_count': 9},
+        {'product_id': 3, 'food_products': '우유', 'view_count': 5},
+    ]
+
+
+@pytest.fixture
+def product_list(monkeypatch, fake_db):
+    monkeypatch.setattr(products, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(products, 'ensure_allergen_mask_tables', lambda: None)
+    # 알레르기 필터가 붙으면 계란 상품(2)은 DB에서 걸러짐
+    fake_db.on('FROM products p', lambda sql, params: [
+        row for row in _rows() if 'product_allergen_mask' not in sql or row['product_id'] != 2
+    ])
+
+    def use_ranking(counts, complete=True):
+        ranking = PopularityRanking('products', counts, {1: 0, 2: EGG, 3: 0}, complete=complete)
+        monkeypatch.setattr(products, 'get_ranking', lambda kind: ranking)
+        return ranking
+    return use_ranking
+
+
+def test_complete_ranking_orders_without_sql_sort(client, fake_db, product_list):
+    product_list({1: 5, 2: 12, 3: 5})
+
+    response = client.get('/api/products')
+
+    assert [row['product_id'] for row in response.get_json()] == [2, 1, 3]
+    # 순위의 조회수(이 프로세스에서 반영된 증가분 포함)를 사용
+    assert response.get_json()[0]['view_count'] == 12
+    assert not fake_db.queries('ORDER BY')
+
+
+def test_allergy_filter_uses_ranking_mask_order(client, fake_db, product_list, monkeypatch):
+    product_list({1: 5, 2: 12, 3: 5})
+    monkeypatch.setattr(products, 'allergy_ids_to_mask', lambda ids: EGG if ids else 0)
+
+    response = client.get('/api/products?checked_allergies=1')
+
+    assert [row['product_id'] for row in response.get_json()] == [1, 3]
+    assert not fake_db.queries('ORDER BY')
+
+
+def test_products_added_after_ranking_load_come_last(client, fake_db, product_list):
+    product_list({1: 5, 2: 12})
+
+    response = client.get('/api/products')
+
+    assert [row['product_id'] for row in response.get_json()] == [2, 1, 3]
+
+
+def test_partial_ranking_falls_back_to_sql_order(client, fake_db, product_list):
+    product_list({2: 12}, complete=False)
+
+    client.get('/api/products')
+
+    assert fake_db.queries('ORDER BY p.view_count DESC')
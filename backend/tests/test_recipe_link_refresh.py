@@ -0,0 +1,79 @@
+# 레시피-상품 연결 백그라운드 갱신: 프로세스 간 이름 잠금과 상품 변경 알림 확인
+import pytest
+
+import services.product_search as product_search
+import services.recipe_product_links as links
+
+
+@pytest.fixture
+def linker(monkeypatch, fake_db):
+    runs = []
+    monkeypatch.setattr(links, 'get_db_connection', fake_db.connect)
+    monkeypatch.setattr(links, 'link_recipe_products', lambda full=False: runs.append(full) or {'foods': 1, 'products': 0})
+    return runs
+
+
+def test_refresh_runs_linker_under_named_lock(linker, fake_db):
+    fake_db.on('GET_LOCK', [{'acquired': 1}])
+
+    assert links.refresh_recipe_product_links() == {'foods': 1, 'products': 0}
+    assert linker == [False]
+    assert fake_db.queries('RELEASE_LOCK')
+
+
+def test_refresh_skips_when_another_process_is_linking(linker, fake_db):
+    fake_db.on('GET_LOCK', [{'acquired': 0}])
+
+    assert links.refresh_recipe_product_links() is None
+    assert linker == []
+    assert not fake_db.queries('RELEASE_LOCK')
+
+
+def test_lock_is_released_when_linking_fails(monkeypatch, fake_db):
+    monkeypatch.setattr(links, 'get_db_connection', fake_db.connect)
+
+    def fail(full=False):
+        raise RuntimeError('db down')
+
+    monkeypatch.setattr(links, 'link_recipe_products', fail)
+    fake_db.on('GET_LOCK', [{'acquired': 1}])
+
+    with pytest.raises(RuntimeError):
+        links.refresh_recipe_product_links()
+    assert fake_db.queries('RELEASE_LOCK')
+
+
+class _Thread:
+    started = []
+
+    def __init__(self, target, name, daemon):
+        self.name = name
+
+    def start(self):
+        self.started.append(self.name)
+
+
+def test_product_changes_wake_the_worker(monkeypatch):
+    started = _Thread.started = []
+    monkeypatch.setattr(links, 'RECIPE_LINK_REFRESH', 300)
+    monkeypatch.setattr(links, '_worker', None)
+    monkeypatch.setattr(links, '_wakeup', links.threading.Event())
+    monkeypatch.setattr(product_search, '_change_listeners', [])
+    monkeypatch.setattr(links.threading, 'Thread', _Thread)
+
+    links.start_recipe_link_refresh()
+    links.start_recipe_link_refresh()
+
+    assert started == ['recipe-link-refresh']
+    for callback in product_search._change_listeners:
+        callback([42])
+    assert links._wakeup.is_set()
+
+
+def test_refresh_disabled_when_interval_is_zero(monkeypatch):
+    monkeypatch.setattr(links, 'RECIPE_LINK_REFRESH', 0)
+    monkeypatch.setattr(links, '_worker', None)
+
+    links.start_recipe_link_refresh()
+
+    assert links._worker is None
@@ -0,0 +1,58 @@
+# /api/recipes의 쿼리 수가 레시피 수와 무관하게 일정한지 확인 (N+1 회귀 방지)
+import pytest
+
+import routes.recipes as recipes
+from services.popularity_ranking import PopularityRanking
+
+
+def _install_catalog(monkeypatch, fake_db, n):
+    foods = [{'Food_id': f'FD{i}', 'Food_name': f'음식{i}', 'Food_role': '반찬', 'Food_img': '',
+              'Food_materials': '', 'view_count': n - i, 'allergen_mask': 0} for i in range(n)]
+    by_id = {food['Food_id']: food for food in foods}
+
+    class Catalog:
+        version = 1
+
+        def get_food(self, food_id):
+            return by_id.get(str(food_id))
+
+    ranking = PopularityRanking('food', {fid: f['view_count'] for fid, f in by_id.items()},
+                                {fid: 0 for fid in by_id}, complete=True)
+    monkeypatch.setattr(recipes, 'get_food_catalog', lambda: Catalog())
+    monkeypatch.setattr(recipes, 'get_ranking', lambda kind: ranking)
+    monkeypatch.setattr(recipes, 'get_db_connection', fake_db.connect)
+    fake_db.on('FROM food_cooking', lambda sql, params: [
+        {'Food_id': fid, 'Food_cooking_method': f'{fid} 첫 단계'} for fid in by_id
+    ])
+
+
+@pytest.mark.parametrize('n', [1, 500, recipes._FIRST_STEP_IN_LIMIT + 500])
+def test_recipe_list_query_count_is_constant(client, monkeypatch, fake_db, n):
+    _install_catalog(monkeypatch, fake_db, n)
+
+    response = client.get('/api/recipes')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body) == n
+    assert body[0]['Food_cooking_method'] == f"{body[0]['Food_id']} 첫 단계"
+    assert len(fake_db.executed) == 1
+
+
+def test_first_step_query_uses_in_list_up_to_limit(fake_db):
+    cursor = fake_db.connect().cursor()
+    recipes._first_cooking_steps(cursor, [f'FD{i}' for i in range(recipes._FIRST_STEP_IN_LIMIT)])
+    recipes._first_cooking_steps(cursor, [f'FD{i}' for i in range(recipes._FIRST_STEP_IN_LIMIT + 1)])
+
+    in_list, full_scan = fake_db.executed
+    assert 'Food_id IN (' in in_list[0] and len(in_list[1]) == recipes._FIRST_STEP_IN_LIMIT
+    assert 'Food_id IN (' not in full_scan[0] and full_scan[1] == ()
+
+
+def test_full_scan_returns_only_requested_recipes(fake_db):
+    fake_db.on('FROM food_cooking', [{'Food_id': 'FD1', 'Food_cooking_method': 'a'},
+                                     {'Food_id': 'FD2', 'Food_cooking_method': 'b'}])
+    cursor = fake_db.connect().cursor()
+    ids = ['FD1'] + [f'X{i}' for i in range(recipes._FIRST_STEP_IN_LIMIT)]
+
+    assert recipes._first_cooking_steps(cursor, ids) == {'FD1': 'a'}
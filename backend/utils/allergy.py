@@ -1,5 +1,8 @@
 # 알레르기 관련 동의어 및 필터링 기능을 제공하는 모듈
 # 사용자의 알레르기 정보를 기반으로 상품 및 레시피에서 알레르기 성분을 제외하는 SQL 조건을 생성
+import hashlib
+import json
+
 allergy_synonyms = {
     # 각 알레르기 이름별로 포함될 수 있는 다양한 동의어/관련어 리스트
     "난류": ["난류", "계란", "달걀", "유정란", "특란", "초란", "계란흰자", "계란노른자", "계란말이", "스크램블에그", "오믈렛"],
@@ -30,6 +33,14 @@ allergy_id_name_map = {
     13: "잣", 14: "대두", 15: "복숭아", 16: "토마토", 17: "밀", 18: "메밀", 19: "아황산류"
 }
 
+# 알레르기 비트마스크: 알레르기 ID n → (n-1)번째 비트
+ALL_ALLERGEN_MASK = (1 << len(allergy_id_name_map)) - 1
+
+# 동의어 목록이 바뀌면 값이 바뀌는 버전 문자열 (저장된 마스크 재계산 여부 판단용)
+ALLERGY_SYNONYMS_VERSION = hashlib.md5(
+    json.dumps([allergy_id_name_map, allergy_synonyms], sort_keys=True, ensure_ascii=False).encode('utf-8')
+).hexdigest()[:12]
+
 def generate_product_allergy_filter_sql(user_allergy_ids, table_alias='p'):
     """
     상품 테이블(products)에서 알레르기 성분이 포함된 상품을 제외하는 SQL WHERE 조건을 생성합니다.
@@ -74,4 +85,56 @@ def generate_recipe_allergy_filter_sql(user_allergy_ids, table_alias='r'):
             )
             filter_conditions.append(condition)
     # 모든 조건을 AND로 연결
-    return " AND ".join(filter_conditions)
\ No newline at end of file
+    return " AND ".join(filter_conditions)
+
+def allergy_ids_to_mask(user_allergy_ids):
+    """알레르기 ID 리스트를 비트마스크로 변환합니다. (알 수 없는 ID는 무시)"""
+    mask = 0
+    for allerg_id in user_allergy_ids:
+        if allerg_id in allergy_id_name_map:
+            mask |= 1 << (allerg_id - 1)
+    return mask
+
+def mask_to_allergy_ids(mask):
+    """비트마스크를 알레르기 ID 리스트로 변환합니다."""
+    return [allerg_id for allerg_id in allergy_id_name_map if mask & (1 << (allerg_id - 1))]
+
+def compute_allergen_mask(*texts):
+    """
+    텍스트(음식명/재료, 상품명/상세정보 등)에 포함된 알레르기 성분을 비트마스크로 반환합니다.
+    SQL의 NOT LIKE 필터와 같이 NULL 값이 있으면 모든 알레르기 필터에서 제외되도록 전체 비트를 세웁니다.
+    모든 동의어를 한 번에 찾는 Aho-Corasick 매처(utils.allergy_matcher)를 사용합니다.
+    """
+    from utils.allergy_matcher import get_allergen_matcher  # 순환 import 방지
+    return get_allergen_matcher().match_mask(*texts)
+
+def generate_product_allergy_mask_sql(user_allergy_ids, table_alias='p', mask_alias='pm'):
+    """
+    product_allergen_mask 테이블을 LEFT JOIN한 상품 목록에서 알레르기 상품을 제외하는 SQL WHERE 조건을 생성합니다.
+    색인된 상품은 비트 연산 한 번으로 걸러내고, 아직 색인되지 않은 상품만 기존 LIKE 조건으로 검사합니다.
+    """
+    mask = allergy_ids_to_mask(user_allergy_ids)
+    if not mask:
+        return ""
+    like_filter = generate_product_allergy_filter_sql(user_allergy_ids, table_alias=table_alias)
+    return (
+        f"(({mask_alias}.allergen_mask IS NOT NULL AND ({mask_alias}.allergen_mask & {mask}) = 0) "
+        f"OR ({mask_alias}.allergen_mask IS NULL AND {like_filter}))"
+    )
+
+def filter_recipes_by_allergy(foods, user_allergy_ids):
+    """
+    메모리에 올라온 레시피(음식) 리스트에서 알레르기 성분이 포함된 항목을 제외합니다.
+    카탈로그 스냅샷이 미리 계산한 allergen_mask가 있으면 비트 연산으로, 없으면 직접 계산해 검사합니다.
+    """
+    user_mask = allergy_ids_to_mask(user_allergy_ids)
+    if not user_mask:
+        return list(foods)
+    result = []
+    for food in foods:
+        food_mask = food.get('allergen_mask')
+        if food_mask is None:
+            food_mask = compute_allergen_mask(food.get('Food_name'), food.get('Food_materials'))
+        if food_mask & user_mask == 0:
+            result.append(food)
+    return result
@@ -0,0 +1,112 @@
+# 알레르기 동의어 다중 패턴 매처 (Aho-Corasick)
+# allergy_synonyms의 모든 동의어를 하나의 오토마톤으로 컴파일해,
+# 텍스트를 한 번만 훑으면서 포함된 알레르기 ID를 모두 찾음 (동의어 수와 무관하게 텍스트 길이에 비례)
+from utils.allergy import allergy_synonyms, allergy_id_name_map, ALL_ALLERGEN_MASK
+
+
+class AllergenMatcher:
+    """
+    동의어 → 알레르기 비트마스크 사전을 Aho-Corasick 오토마톤으로 컴파일한 매처.
+    - match_mask(*texts): 텍스트들에 포함된 알레르기 비트마스크
+    - match_ids(*texts): 텍스트들에 포함된 알레르기 ID 집합
+    """
+    def __init__(self, keyword_masks):
+        # 상태 i의 전이 / 실패 링크 / 출력(해당 상태에서 끝나는 모든 패턴의 마스크 합)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]
+
+        for keyword, mask in keyword_masks.items():
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(0)
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] |= mask
+
+        # BFS로 실패 링크를 만들고, 실패 링크를 따라가며 만나는 출력을 미리 합쳐 둠
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+        self._root = self._goto[0]
+
+    def _scan(self, text, mask):
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        root = self._root
+        state = 0
+        for ch in text:
+            if state == 0:
+                # 대부분의 글자는 어떤 동의어의 첫 글자도 아니므로 루트에서 바로 건너뜀
+                state = root.get(ch, 0)
+            else:
+                trans = goto[state]
+                while ch not in trans:
+                    state = fail[state]
+                    if state == 0:
+                        break
+                    trans = goto[state]
+                state = goto[state].get(ch, 0)
+            if out[state]:
+                mask |= out[state]
+                if mask == ALL_ALLERGEN_MASK:
+                    break
+        return mask
+
+    def match_mask(self, *texts):
+        """
+        텍스트들에 포함된 알레르기 비트마스크를 반환합니다.
+        SQL의 NOT LIKE 필터와 같이 NULL 값이 있으면 전체 비트를 반환합니다.
+        """
+        mask = 0
+        for text in texts:
+            if text is None:
+                return ALL_ALLERGEN_MASK
+            mask = self._scan(text.lower(), mask)
+        return mask
+
+    def match_ids(self, *texts):
+        """텍스트들에 포함된 알레르기 ID 집합을 반환합니다."""
+        mask = self.match_mask(*texts)
+        return {allerg_id for allerg_id in allergy_id_name_map if mask & (1 << (allerg_id - 1))}
+
+
+def build_allergen_matcher():
+    """allergy_synonyms로부터 매처를 생성합니다. (여러 알레르기에 속한 동의어는 마스크를 합침)"""
+    keyword_masks = {}
+    for allerg_id, allerg_name in allergy_id_name_map.items():
+        for word in allergy_synonyms.get(allerg_name, [allerg_name]):
+            word_lower = word.lower()
+            keyword_masks[word_lower] = keyword_masks.get(word_lower, 0) | (1 << (allerg_id - 1))
+    return AllergenMatcher(keyword_masks)
+
+
+_matcher = None
+
+
+def get_allergen_matcher():
+    """프로세스 공용 매처를 반환합니다. (최초 호출 시 한 번만 컴파일)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = build_allergen_matcher()
+    return _matcher
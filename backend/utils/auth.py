@@ -2,9 +2,22 @@ from functools import wraps
 from flask import request, jsonify
 import jwt
 import datetime
-import traceback
-from config import get_jwt_secret_key
+import threading
+import time
+from config import get_jwt_secret_key, AUTH_PRINCIPAL_CACHE_TTL
 from models.user import User
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 검증된 토큰 → (만료 시각, User_id, 사용자 정보) 캐시
+# 만료 시각은 min(지금 + AUTH_PRINCIPAL_CACHE_TTL, 토큰 exp)이라 토큰보다 오래 살아남지 않음
+_principal_cache = {}
+_tokens_by_user = {}
+# User_id → 무효화 횟수. 사용자 조회 전에 읽어 두고, 그 사이 무효화되었으면 조회한 (옛) 정보를 캐시하지 않음
+_user_generations = {}
+_principal_lock = threading.Lock()
+_PRINCIPAL_CACHE_MAX = 10000
 
 def generate_token(user_id):
     """JWT 토큰을 생성합니다."""
@@ -19,71 +32,117 @@ def generate_token(user_id):
         token = token.decode('utf-8')
     return token
 
+def _get_cached_principal(token):
+    entry = _principal_cache.get(token)
+    if entry is None:
+        return None
+    if entry[0] <= time.time():
+        with _principal_lock:
+            _drop_token(token)
+        return None
+    return entry[2]
+
+def _drop_token(token):
+    entry = _principal_cache.pop(token, None)
+    if entry is not None:
+        tokens = _tokens_by_user.get(entry[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del _tokens_by_user[entry[1]]
+
+def _user_generation(user_key):
+    with _principal_lock:
+        return _user_generations.get(user_key, 0)
+
+def _cache_principal(token, payload, user, generation):
+    if AUTH_PRINCIPAL_CACHE_TTL <= 0:
+        return
+    now = time.time()
+    expires_at = min(now + AUTH_PRINCIPAL_CACHE_TTL, float(payload.get('exp', now)))
+    if expires_at <= now:
+        return
+    user_key = str(payload['sub'])
+    with _principal_lock:
+        if _user_generations.get(user_key, 0) != generation:
+            # 조회 후 사용자 정보가 바뀜 → 이번 요청만 조회한 정보로 처리하고 캐시하지 않음
+            return
+        if len(_principal_cache) >= _PRINCIPAL_CACHE_MAX:
+            # 만료된 항목부터 정리하고, 그래도 가득 차면 가장 오래된 항목 제거
+            for stale in [t for t, e in _principal_cache.items() if e[0] <= now]:
+                _drop_token(stale)
+            if len(_principal_cache) >= _PRINCIPAL_CACHE_MAX:
+                _drop_token(next(iter(_principal_cache)))
+        _principal_cache[token] = (expires_at, user_key, user)
+        _tokens_by_user.setdefault(user_key, set()).add(token)
+
+def invalidate_user_principal(user_id):
+    """사용자 정보(프로필/비밀번호)가 바뀌면 호출: 해당 사용자의 캐시된 인증 정보를 모두 지웁니다."""
+    user_key = str(user_id)
+    with _principal_lock:
+        _user_generations[user_key] = _user_generations.get(user_key, 0) + 1
+        for token in list(_tokens_by_user.get(user_key, ())):
+            _drop_token(token)
+
 def token_required(f):
-    """JWT 토큰 검증 데코레이터"""
+    """JWT 토큰 검증 데코레이터 (검증된 토큰은 AUTH_PRINCIPAL_CACHE_TTL 동안 DB 조회 없이 통과)"""
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
-        
-        print(f"요청 헤더: {request.headers}")
-        
+
         # Authorization 헤더에서 토큰 가져오기
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            print(f"인증 헤더: {auth_header}")
-            if auth_header.startswith('Bearer '):
-                token = auth_header[7:]  # 'Bearer ' 제거
-                print(f"추출된 토큰: {token[:10]}...")
-        else:
-            print("Authorization 헤더가 없습니다.")
-        
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            token = auth_header[7:]  # 'Bearer ' 제거
+
         if not token:
-            print("토큰이 제공되지 않았습니다.")
             return jsonify({
                 'success': False,
                 'message': '토큰이 필요합니다.'
             }), 401
-        
+
+        # 캐시된 토큰이면 디코딩/사용자 조회 생략 (캐시 항목은 토큰 만료 전에 사라짐)
+        current_user = _get_cached_principal(token)
+        if current_user is not None:
+            return f(dict(current_user), *args, **kwargs)
+
         try:
             # 토큰 디코딩
-            print(f"JWT 시크릿 키: {get_jwt_secret_key()[:5]}...")
             payload = jwt.decode(token, get_jwt_secret_key(), algorithms=['HS256'])
             user_id = payload['sub']
-            print(f"토큰에서 추출한 사용자 ID: {user_id}")
-            
-            # 사용자 정보 가져오기
+
+            # 사용자 정보 가져오기 (조회 전 무효화 횟수를 기억해 조회 중 바뀐 정보는 캐시하지 않음)
+            generation = _user_generation(str(user_id))
             current_user = User.get_by_id(user_id)
-            
+
             if not current_user:
-                print(f"ID {user_id}에 해당하는 사용자를 찾을 수 없습니다.")
+                logger.warning(f"ID {user_id}에 해당하는 사용자를 찾을 수 없습니다.")
                 return jsonify({
                     'success': False,
                     'message': '유효하지 않은 사용자입니다.'
                 }), 401
-            
-            print(f"사용자 인증 성공: {current_user['id']}")
-                
+
+            _cache_principal(token, payload, current_user, generation)
+
         except jwt.ExpiredSignatureError:
-            print("토큰이 만료되었습니다.")
             return jsonify({
                 'success': False,
                 'message': '토큰이 만료되었습니다. 다시 로그인해주세요.'
             }), 401
         except jwt.InvalidTokenError as e:
-            print(f"유효하지 않은 토큰: {str(e)}")
+            logger.warning(f"유효하지 않은 토큰: {str(e)}")
             return jsonify({
                 'success': False,
                 'message': '유효하지 않은 토큰입니다.'
             }), 401
         except Exception as e:
-            print(f"토큰 검증 중 예외 발생: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"토큰 검증 중 예외 발생: {str(e)}")
             return jsonify({
                 'success': False,
                 'message': f'인증 처리 중 오류가 발생했습니다: {str(e)}'
             }), 500
         
         # 원래 함수 호출 시 현재 사용자 정보 전달
-        return f(current_user, *args, **kwargs)
+        return f(dict(current_user), *args, **kwargs)
     
-    return decorated
\ No newline at end of file
+    return decorated
@@ -0,0 +1,301 @@
+# 데이터베이스 커넥션 풀 모듈
+# 요청마다 새 TCP 연결 + 인증 핸드셰이크를 맺지 않도록, 드라이버(mysql-connector / PyMySQL)에
+# 상관없이 연결을 재사용하는 공용 풀을 제공
+import threading
+import time
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 제한 시간 안에 연결을 빌리지 못했을 때 발생하는 예외."""
+
+
+# 계측 훅 (utils.request_metrics가 등록). 등록되지 않으면 커서/연결을 그대로 반환
+_cursor_hook = None      # cursor -> 감싼 cursor
+_checkout_hook = None    # (pool 이름, 대기 시간 초) -> None
+
+
+def set_instrumentation(cursor_hook=None, checkout_hook=None):
+    """커서 생성/연결 대여 시 호출할 계측 훅을 등록합니다. (None이면 해제)"""
+    global _cursor_hook, _checkout_hook
+    _cursor_hook = cursor_hook
+    _checkout_hook = checkout_hook
+
+
+class PooledConnection:
+    """
+    풀에서 빌려준 연결을 감싸는 프록시.
+    close()를 호출하면 실제 연결을 닫지 않고 풀에 반납하며, 그 외 속성은 원래 연결로 위임합니다.
+    """
+    def __init__(self, pool, raw_conn, created_at):
+        self._pool = pool
+        self._raw = raw_conn
+        self._created_at = created_at
+        self._released = False
+
+    def close(self):
+        """연결을 풀에 반납합니다. 여러 번 호출해도 한 번만 반납됩니다."""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        return _cursor_hook(cursor) if _cursor_hook is not None else cursor
+
+    def __getattr__(self, name):
+        if name in ('_pool', '_raw', '_created_at', '_released'):
+            raise AttributeError(name)
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # close()를 빠뜨린 호출부가 있어도 연결이 풀에서 새지 않도록 반납
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    크기가 제한된 스레드 안전 커넥션 풀.
+    - min_size: 처음 사용할 때 미리 열어두는 연결 수
+    - max_size: 동시에 열 수 있는 최대 연결 수
+    - timeout: 연결이 모두 사용 중일 때 기다리는 최대 시간(초)
+    - recycle: 생성 후 이 시간(초)이 지난 연결은 닫고 새로 연결
+    - ping: 빌려주기 전에 연결 상태를 확인하는 함수 (실패 시 새 연결로 교체)
+    - reset: 반납 시 트랜잭션 상태를 정리하는 함수 (실패 시 연결 폐기)
+    """
+    def __init__(self, name, connect, ping=None, reset=None,
+                 min_size=1, max_size=10, timeout=10.0, recycle=3600):
+        self.name = name
+        self._connect = connect
+        self._ping = ping
+        self._reset = reset
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.recycle = recycle
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = []          # [(raw_conn, created_at), ...]
+        self._size = 0           # 열려 있는 연결 수 (사용 중 + 유휴)
+        self._in_use = 0
+        self._waiters = 0
+        self._initialized = False
+
+        # 통계
+        self._checkouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._health_failures = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # ============================================
+    # [1] 연결 빌리기 / 반납
+    # ============================================
+    def get_connection(self):
+        """풀에서 연결을 빌려 PooledConnection으로 반환합니다."""
+        self._warm_up()
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout is not None else None
+
+        with self._lock:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # 자리를 먼저 확보한 뒤 락 밖에서 연결 생성
+                    self._size += 1
+                    raw, created_at = None, None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"[{self.name}] {self.timeout}초 안에 DB 연결을 얻지 못했습니다 "
+                        f"(사용 중 {self._in_use}/{self.max_size})"
+                    )
+                self._waiters += 1
+                try:
+                    self._available.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+
+        try:
+            if raw is None:
+                raw, created_at = self._open()
+            else:
+                raw, created_at = self._validate(raw, created_at)
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._size -= 1
+                self._available.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._checkouts += 1
+            self._total_wait += waited
+            if waited > self._max_wait:
+                self._max_wait = waited
+        if _checkout_hook is not None:
+            _checkout_hook(self.name, waited)
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        """반납된 연결을 정리해 유휴 목록에 되돌립니다."""
+        healthy = True
+        if self._reset:
+            try:
+                self._reset(raw)
+            except Exception:
+                healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((raw, created_at))
+            else:
+                self._size -= 1
+            self._available.notify()
+
+        if not healthy:
+            self._close_quietly(raw)
+
+    # ============================================
+    # [2] 연결 생성 / 상태 확인
+    # ============================================
+    def _open(self):
+        raw = self._connect()
+        with self._lock:
+            self._created += 1
+        return raw, time.monotonic()
+
+    def _validate(self, raw, created_at):
+        """오래된 연결은 재생성하고, 끊어진 연결은 새 연결로 교체합니다."""
+        if self.recycle is not None and time.monotonic() - created_at > self.recycle:
+            self._close_quietly(raw)
+            with self._lock:
+                self._recycled += 1
+            return self._open()
+
+        if self._ping:
+            try:
+                if self._ping(raw) is False:
+                    raise ConnectionError("ping failed")
+            except Exception:
+                self._close_quietly(raw)
+                with self._lock:
+                    self._health_failures += 1
+                return self._open()
+        return raw, created_at
+
+    def _warm_up(self):
+        """처음 사용할 때 min_size만큼 연결을 미리 열어 둡니다."""
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            self._initialized = True
+            to_open = max(0, min(self.min_size, self.max_size) - self._size)
+            self._size += to_open
+
+        for _ in range(to_open):
+            try:
+                conn = self._open()
+            except Exception as e:
+                print(f"[{self.name}] 커넥션 풀 초기 연결 실패: {e}")
+                with self._lock:
+                    self._size -= 1
+                continue
+            with self._lock:
+                self._idle.append(conn)
+                self._available.notify()
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    # ============================================
+    # [3] 종료 / 통계
+    # ============================================
+    def close_all(self):
+        """유휴 연결을 모두 닫습니다. (사용 중인 연결은 반납 시 유휴 목록으로 돌아옵니다)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._initialized = False
+        for raw, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        """풀 크기 조정을 위한 현재 상태와 누적 통계를 dict로 반환합니다."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                'name': self.name,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiters': self._waiters,
+                'checkouts': checkouts,
+                'created': self._created,
+                'recycled': self._recycled,
+                'health_check_failures': self._health_failures,
+                'timeouts': self._timeouts,
+                'total_wait_seconds': round(self._total_wait, 6),
+                'avg_wait_ms': round(self._total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+            }
+
+
+# ============================================
+# 프로세스 전역 풀 레지스트리
+# ============================================
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, factory):
+    """
+    이름으로 풀을 조회하고, 없으면 factory()로 생성해 등록합니다.
+    """
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = factory()
+            _pools[name] = pool
+        return pool
+
+
+def get_all_pool_stats():
+    """등록된 모든 풀의 통계를 반환합니다."""
+    return {name: pool.stats() for name, pool in list(_pools.items())}
+
+
+def close_all_pools():
+    """등록된 모든 풀의 유휴 연결을 닫습니다."""
+    for pool in list(_pools.values()):
+        pool.close_all()
@@ -2,6 +2,9 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import EMAIL_CONFIG, SMTP_SETTINGS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 def send_email(receiver_email, subject, html_content):
     """이메일 전송 함수"""
@@ -32,5 +35,5 @@ def send_email(receiver_email, subject, html_content):
         server.quit()
         return True
     except Exception as e:
-        print(f"이메일 전송 오류: {str(e)}")
+        logger.error(f"이메일 전송 오류: {str(e)}")
         return False 
\ No newline at end of file
@@ -0,0 +1,125 @@
+# 애플리케이션 로깅 모듈
+# - 레벨: LOG_LEVEL (DEBUG/INFO/WARNING/ERROR, 기본 INFO)
+# - 출력: 호출 스레드는 큐에 넣기만 하고, 별도 리스너 스레드가 stdout에 씀 (요청 처리가 출력에 막히지 않음)
+# - 형식: LOG_FORMAT=json이면 한 줄 JSON, 아니면 key=value 텍스트
+# - 요청마다 상관관계 ID(X-Request-ID)를 붙여 한 요청의 로그를 묶어 볼 수 있음
+# - 음식별 영양소 같은 상세 로그는 LOG_SAMPLE_RATE 비율만 남김 (sampled())
+#
+# 사용: logger = get_logger(__name__); logger.info('식단 생성', extra={'fields': {'user_id': 1}})
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import uuid
+from config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_ROOT_NAME = 'app'
+
+_listener = None
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def _current_request_id():
+    try:
+        from flask import g, has_request_context
+        if has_request_context():
+            return g.get('request_id', '-')
+    except Exception:
+        pass
+    return '-'
+
+
+class _RequestIdFilter(logging.Filter):
+    """로그 레코드에 현재 요청의 상관관계 ID를 붙입니다. (호출 스레드에서 실행되어야 함)"""
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = _current_request_id()
+        return True
+
+
+class _StructuredFormatter(logging.Formatter):
+    def __init__(self, as_json=False):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record):
+        # 예외 추적은 QueueHandler가 호출 스레드에서 이미 메시지에 합쳐 둠
+        fields = getattr(record, 'fields', None) or {}
+        if self.as_json:
+            data = {
+                'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                'level': record.levelname,
+                'logger': record.name,
+                'request_id': record.request_id,
+                'msg': record.getMessage(),
+            }
+            data.update(fields)
+            return json.dumps(data, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')} {record.levelname:<7} " \
+               f"[{record.name}] rid={record.request_id} {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f'{k}={v}' for k, v in fields.items())
+        return line
+
+
+def setup_logging():
+    """루트 'app' 로거에 큐 기반 핸들러를 한 번만 연결합니다."""
+    global _listener
+    root = logging.getLogger(_ROOT_NAME)
+    if _listener is not None:
+        return root
+
+    level = getattr(logging, str(LOG_LEVEL).upper(), logging.INFO)
+    root.setLevel(level)
+    root.propagate = False
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_StructuredFormatter(as_json=LOG_FORMAT == 'json'))
+
+    log_queue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(_RequestIdFilter())
+    root.handlers = [handler]
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return root
+
+
+def get_logger(name):
+    """모듈별 로거 ('app.<모듈 이름>')"""
+    setup_logging()
+    return logging.getLogger(f'{_ROOT_NAME}.{name}')
+
+
+def sampled(rate=None):
+    """상세 로그를 남길지 표본 추출 (rate: 0~1, 기본 LOG_SAMPLE_RATE)"""
+    rate = LOG_SAMPLE_RATE if rate is None else rate
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def init_request_logging(app):
+    """요청마다 상관관계 ID를 정하고 (클라이언트가 보낸 X-Request-ID 우선) 응답 헤더로 돌려줍니다."""
+    from flask import g, request
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex[:16]
+
+    @app.after_request
+    def _echo_request_id(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    setup_logging()
+    return app
@@ -0,0 +1,68 @@
+# 목록 API 공용 페이지네이션 유틸
+# 조회수 내림차순 목록을 (view_count, id) 키셋 커서로 나눠 반환:
+#   ?limit=20                 → 첫 페이지
+#   ?after=<view_count>,<id>  → 이전 페이지 마지막 항목 다음부터
+#   ?fields=a,b,c             → 필요한 필드만 반환
+# 세 파라미터가 모두 없으면 기존처럼 전체 목록(배열)을 반환하는 것은 각 라우트의 몫
+import re
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+PAGINATION_ARGS = ('limit', 'after', 'fields')
+
+_FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def wants_pagination(args):
+    """요청에 페이지네이션 파라미터가 하나라도 있는지"""
+    return any(key in args for key in PAGINATION_ARGS)
+
+
+def parse_page_args(args, allowed_fields=None):
+    """
+    limit / after / fields 쿼리 파라미터를 검사해 (limit, after, fields)를 반환합니다.
+    - after: (view_count, id 문자열) 또는 None
+    - fields: 필드 이름 리스트 또는 None (전체)
+    잘못된 값이면 ValueError
+    """
+    limit = args.get('limit', DEFAULT_PAGE_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('limit은 정수여야 합니다.')
+    if limit < 1:
+        raise ValueError('limit은 1 이상이어야 합니다.')
+    limit = min(limit, MAX_PAGE_LIMIT)
+
+    after = None
+    raw_after = args.get('after')
+    if raw_after:
+        view_count, sep, item_id = raw_after.partition(',')
+        try:
+            after = (int(view_count), item_id)
+        except ValueError:
+            raise ValueError('after는 "<view_count>,<id>" 형식이어야 합니다.')
+        if not sep or not item_id:
+            raise ValueError('after는 "<view_count>,<id>" 형식이어야 합니다.')
+
+    fields = None
+    raw_fields = args.get('fields')
+    if raw_fields:
+        fields = list(dict.fromkeys(f.strip() for f in raw_fields.split(',') if f.strip()))
+        invalid = [f for f in fields if not _FIELD_PATTERN.match(f)
+                   or (allowed_fields is not None and f not in allowed_fields)]
+        if invalid:
+            raise ValueError(f'알 수 없는 필드: {", ".join(invalid)}')
+    return limit, after, fields
+
+
+def make_cursor(view_count, item_id):
+    """다음 페이지 요청에 쓸 after 값"""
+    return f'{int(view_count or 0)},{item_id}'
+
+
+def project(row, fields):
+    """fields에 있는 키만 남깁니다. (fields가 None이면 그대로)"""
+    if not fields:
+        return row
+    return {key: row[key] for key in fields if key in row}
@@ -0,0 +1,267 @@
+# 요청별 처리 시간 / SQL 계측 모듈
+# - Flask before/after_request로 요청마다 벽시계 시간을 재고
+# - utils.db_pool 훅으로 커서를 감싸 쿼리 수, DB 시간, 읽은 행 수, 빌린 연결 수를 요청에 누적
+# - 라우트별 집계(요청 수, 합계, 최근 METRICS_SAMPLE_SIZE개의 p50/p95/p99)를 Prometheus 텍스트 형식으로 제공
+# - SLOW_REQUEST_MS보다 느린 요청은 실행한 쿼리 목록과 함께 경고 로그
+# 요청 밖(비동기 작업 스레드, CLI)에서는 커서를 감싸지 않으므로 추가 비용이 없음
+import contextvars
+import threading
+import time
+from collections import deque
+from config import METRICS_ENABLED, SLOW_REQUEST_MS, METRICS_SAMPLE_SIZE
+from utils.db_pool import set_instrumentation, get_all_pool_stats
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+_MAX_TRACED_QUERIES = 100   # 느린 요청 로그에 남길 최대 쿼리 수
+_SQL_PREVIEW = 200
+
+_current_trace = contextvars.ContextVar('request_trace', default=None)
+
+
+class RequestTrace:
+    """한 요청 동안의 DB 사용량"""
+    __slots__ = ('started', 'queries', 'query_count', 'db_time', 'rows', 'connections')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.query_count = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.connections = 0
+
+    def add_query(self, sql, seconds):
+        self.query_count += 1
+        self.db_time += seconds
+        if len(self.queries) < _MAX_TRACED_QUERIES:
+            self.queries.append((' '.join(str(sql).split())[:_SQL_PREVIEW], seconds))
+
+
+class TracedCursor:
+    """execute/fetch 시간을 현재 요청의 RequestTrace에 누적하는 커서 프록시"""
+
+    def __init__(self, cursor, trace):
+        self._cursor = cursor
+        self._trace = trace
+
+    def execute(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            self._trace.add_query(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            self._trace.add_query(sql, time.perf_counter() - start)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = getattr(self._cursor, method)(*args)
+        self._trace.db_time += time.perf_counter() - start
+        if method == 'fetchone':
+            self._trace.rows += result is not None
+        elif result:
+            self._trace.rows += len(result)
+        return result
+
+    def fetchone(self):
+        return self._fetch('fetchone')
+
+    def fetchall(self):
+        return self._fetch('fetchall')
+
+    def fetchmany(self, *args):
+        return self._fetch('fetchmany', *args)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._trace.rows += 1
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _wrap_cursor(cursor):
+    trace = _current_trace.get()
+    return TracedCursor(cursor, trace) if trace is not None else cursor
+
+
+def _on_checkout(pool_name, waited):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.connections += 1
+
+
+class _RouteStats:
+    __slots__ = ('count', 'errors', 'seconds', 'queries', 'db_seconds', 'rows', 'connections', 'samples')
+
+    def __init__(self):
+        self.count = self.errors = self.queries = self.rows = self.connections = 0
+        self.seconds = self.db_seconds = 0.0
+        self.samples = deque(maxlen=METRICS_SAMPLE_SIZE)
+
+
+class MetricsRegistry:
+    """라우트(메서드, URL 규칙)별 누적 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, method, route, status, seconds, trace):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.count += 1
+            stats.errors += status >= 500
+            stats.seconds += seconds
+            stats.samples.append(seconds)
+            stats.queries += trace.query_count
+            stats.db_seconds += trace.db_time
+            stats.rows += trace.rows
+            stats.connections += trace.connections
+
+    def snapshot(self):
+        """[(method, route, 통계 dict)] (백분위는 최근 표본 기준)"""
+        with self._lock:
+            items = [(key, stats, sorted(stats.samples)) for key, stats in self._routes.items()]
+        result = []
+        for (method, route), stats, samples in items:
+            result.append((method, route, {
+                'count': stats.count,
+                'errors': stats.errors,
+                'seconds': stats.seconds,
+                'queries': stats.queries,
+                'db_seconds': stats.db_seconds,
+                'rows': stats.rows,
+                'connections': stats.connections,
+                'quantiles': {q: _quantile(samples, q) for q in QUANTILES},
+            }))
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def _quantile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return sorted_samples[index]
+
+
+registry = MetricsRegistry()
+
+
+def init_request_metrics(app):
+    """요청 계측 미들웨어와 DB 커서 훅을 등록합니다. (METRICS_ENABLED=0이면 아무것도 하지 않음)"""
+    if not METRICS_ENABLED:
+        return app
+    from flask import request, g
+
+    set_instrumentation(_wrap_cursor, _on_checkout)
+
+    @app.before_request
+    def _start_trace():
+        g.request_trace_token = _current_trace.set(RequestTrace())
+
+    @app.after_request
+    def _finish_trace(response):
+        trace = _current_trace.get()
+        token = g.pop('request_trace_token', None)
+        if trace is None:
+            return response
+        if token is not None:
+            _current_trace.reset(token)
+
+        elapsed = time.perf_counter() - trace.started
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        registry.record(request.method, route, response.status_code, elapsed, trace)
+
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(f"느린 요청: {request.method} {route} {elapsed * 1000:.1f}ms", extra={'fields': {
+                'status': response.status_code,
+                'queries': trace.query_count,
+                'db_ms': round(trace.db_time * 1000, 1),
+                'rows': trace.rows,
+                'connections': trace.connections,
+                'query_list': [f"{ms * 1000:.1f}ms {sql}" for sql, ms in trace.queries],
+            }})
+        return response
+
+    @app.teardown_request
+    def _clear_trace(exc=None):
+        # 처리되지 않은 예외로 after_request가 건너뛰어져도 다음 요청에 계측이 섞이지 않도록 정리
+        token = g.pop('request_trace_token', None)
+        if token is not None:
+            _current_trace.reset(token)
+
+    return app
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name, labels, value):
+    label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}'
+
+
+def render_prometheus():
+    """라우트별 집계와 커넥션 풀 상태를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+    routes = registry.snapshot()
+    lines = [
+        '# HELP app_request_duration_seconds Request wall time per route (quantiles over recent requests)',
+        '# TYPE app_request_duration_seconds summary',
+    ]
+    for method, route, s in routes:
+        labels = {'method': method, 'route': route}
+        for q, value in s['quantiles'].items():
+            lines.append(_sample('app_request_duration_seconds', {**labels, 'quantile': q}, round(value, 6)))
+        lines.append(_sample('app_request_duration_seconds_sum', labels, round(s['seconds'], 6)))
+        lines.append(_sample('app_request_duration_seconds_count', labels, s['count']))
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(_sample(name, labels, value) for labels, value in samples)
+
+    for name, help_text, key in (
+        ('app_request_errors_total', 'Requests that returned 5xx', 'errors'),
+        ('app_db_queries_total', 'SQL statements executed while handling requests', 'queries'),
+        ('app_db_seconds_total', 'Time spent in execute/fetch while handling requests', 'db_seconds'),
+        ('app_db_rows_fetched_total', 'Rows fetched while handling requests', 'rows'),
+        ('app_db_connections_total', 'Pool connections borrowed while handling requests', 'connections'),
+    ):
+        metric(name, 'counter', help_text, [
+            ({'method': method, 'route': route}, round(s[key], 6)) for method, route, s in routes
+        ])
+
+    pools = get_all_pool_stats()
+    for key, name, kind, help_text in (
+        ('in_use', 'app_db_pool_in_use', 'gauge', 'Connections currently borrowed'),
+        ('idle', 'app_db_pool_idle', 'gauge', 'Idle pooled connections'),
+        ('waiters', 'app_db_pool_waiters', 'gauge', 'Threads waiting for a connection'),
+        ('checkouts', 'app_db_pool_checkouts_total', 'counter', 'Connections handed out by the pool'),
+        ('timeouts', 'app_db_pool_timeouts_total', 'counter', 'Checkouts that timed out'),
+    ):
+        metric(name, kind, help_text, [({'pool': pool}, stats[key]) for pool, stats in pools.items()])
+
+    return '\n'.join(lines) + '\n'
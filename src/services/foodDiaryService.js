@@ -1,5 +1,21 @@
 import { API_URL } from './apiConfig';
 
+// JWT 토큰을 포함한 요청 헤더 (userInfo에 토큰이 없으면 localStorage의 userInfo 사용)
+const getAuthHeaders = (userInfo = null) => {
+  let token = userInfo?.token;
+  if (!token) {
+    try {
+      token = JSON.parse(localStorage.getItem('userInfo') || '{}').token;
+    } catch (parseError) {
+      token = null;
+    }
+  }
+  return {
+    'Content-Type': 'application/json',
+    'Authorization': `Bearer ${token || ''}`,
+  };
+};
+
 // 식단일지 저장
 export const saveFoodDiary = async (diaryData, userInfoParam = null) => {
   try {
@@ -30,9 +46,7 @@ export const saveFoodDiary = async (diaryData, userInfoParam = null) => {
 
     const response = await fetch(`${API_URL}/food-diary`, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: getAuthHeaders(userInfo),
       body: JSON.stringify(requestData),
     });
     
@@ -73,9 +87,7 @@ export const getFoodDiary = async (year, month, userInfoParam = null) => {
 
     const response = await fetch(`${API_URL}/food-diary/${userId}?year=${year}&month=${month}`, {
       method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: getAuthHeaders(userInfo),
     });
     
     const data = await response.json();
@@ -100,9 +112,7 @@ export const getFoodDiaryByDate = async (date) => {
 
     const response = await fetch(`${API_URL}/food-diary/${userInfo.user_id}/${date}`, {
       method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: getAuthHeaders(userInfo),
     });
 
     const data = await response.json();
@@ -127,9 +137,7 @@ export const updateFoodDiary = async (diaryId, diaryData) => {
 
     const response = await fetch(`${API_URL}/food-diary/${diaryId}`, {
       method: 'PUT',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: getAuthHeaders(userInfo),
       body: JSON.stringify({
         user_id: userInfo.user_id,
         ...diaryData
@@ -158,9 +166,7 @@ export const deleteFoodDiary = async (diaryId) => {
 
     const response = await fetch(`${API_URL}/food-diary/${diaryId}`, {
       method: 'DELETE',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers: getAuthHeaders(userInfo),
       body: JSON.stringify({
         user_id: userInfo.user_id
       }),